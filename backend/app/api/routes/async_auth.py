@@ -0,0 +1,148 @@
+from typing import Tuple
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.routes.auth import (
+    claim_refresh_token_statement,
+    invalid_refresh_token,
+    issue_refresh_token,
+    oauth2_scheme,
+    refresh_token_expired,
+    refresh_token_statement,
+    revoke_refresh_tokens_statement,
+    token_payload,
+    token_response,
+    user_etag,
+    user_not_found,
+    user_version_statement,
+)
+from app.core.config import settings
+from app.core.principal_cache import Principal, principal_cache
+from app.core.tenancy import current_tenant
+from app.core.security import verify_password_async
+from app.db.async_session import get_async_db
+from app.db.replicas import get_async_read_db
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.schemas.token_schema import RefreshRequest
+from app.schemas.user_schema import UserRead
+from app.utils.etags import etag_matches, not_modified, set_etag
+
+# Async (AsyncSession) versions of the routes in auth.py, used when DB_ASYNC is on
+router = APIRouter()
+
+
+@router.post("/login")
+async def login(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Login endpoint to get access token."""
+    username_lower = form_data.username.lower()
+    user = (
+        await db.execute(select(User).where(User.user_email == username_lower))
+    ).scalar_one_or_none()
+    if not user or not await verify_password_async(form_data.password, user.pwd):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    refresh_token, _ = issue_refresh_token(db, user.id)
+    await db.commit()
+    return token_response(user.id, refresh_token)
+
+
+@router.post("/refresh")
+async def refresh(
+    body: RefreshRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Exchange a refresh token for a new access token and a rotated refresh token."""
+    stored = (await db.execute(refresh_token_statement(body.refresh_token))).scalar_one_or_none()
+    if not stored or refresh_token_expired(stored):
+        raise invalid_refresh_token()
+    user_id, family_id = stored.user_id, stored.family_id
+
+    new_token, new_row = issue_refresh_token(db, user_id, family_id)
+    if not (await db.execute(claim_refresh_token_statement(stored, new_row.id))).rowcount:
+        # The token was already used or revoked: treat it as stolen and revoke the family
+        await db.rollback()
+        await db.execute(revoke_refresh_tokens_statement(RefreshToken.family_id == family_id))
+        await db.commit()
+        raise invalid_refresh_token()
+
+    await db.commit()
+    return token_response(user_id, new_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    body: RefreshRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Revoke a refresh token together with every token rotated from the same login."""
+    stored = (await db.execute(refresh_token_statement(body.refresh_token))).scalar_one_or_none()
+    if stored:
+        await db.execute(revoke_refresh_tokens_statement(RefreshToken.family_id == stored.family_id))
+        await db.commit()
+    return None
+
+
+async def _authenticate(db: AsyncSession, token: str) -> Tuple[User, dict]:
+    payload = token_payload(token)
+    user = await db.get(User, payload["sub"])
+    if not user:
+        raise user_not_found()
+    return user, payload
+
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    """Dependency to get current authenticated user from token."""
+    user, payload = await _authenticate(db, token)
+    if settings.PRINCIPAL_CACHE_ENABLED:
+        principal_cache.put(token, Principal.from_user(user), payload.get("exp"))
+    return user
+
+
+async def get_current_principal(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme)
+) -> Principal:
+    """Dependency to get the id, email and role of the current user, cached when possible."""
+    if settings.PRINCIPAL_CACHE_ENABLED:
+        principal = principal_cache.get(token)
+        # A token is only valid for the tenant whose users table issued it
+        if principal is not None and principal.tenant == current_tenant.get():
+            return principal
+
+    user, payload = await _authenticate(db, token)
+    principal = Principal.from_user(user)
+    if settings.PRINCIPAL_CACHE_ENABLED:
+        principal_cache.put(token, principal, payload.get("exp"))
+    return principal
+
+
+@router.get("/me", response_model=UserRead)
+async def read_current_user(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Get current authenticated user information (see auth.read_current_user)."""
+    marker = (await db.execute(user_version_statement(current_user.id))).first()
+    if not marker:
+        raise user_not_found()
+    etag = user_etag(marker)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    user = await db.get(User, current_user.id)
+    if not user:
+        raise user_not_found()
+    return user
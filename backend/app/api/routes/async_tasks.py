@@ -0,0 +1,376 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.routes.async_auth import get_current_principal
+from app.api.routes.auth import oauth2_scheme
+from app.api.routes.tasks import (
+    EXPORT_COLUMNS,
+    TaskFilterParams,
+    TaskListParams,
+    apply_task_update,
+    assigned_user_not_found,
+    assignee_emails,
+    assignee_id_statement,
+    assignee_ids_statement,
+    bulk_result,
+    bulk_should_write,
+    bulk_tasks_by_id,
+    bulk_write_failed,
+    changed_tasks_statement,
+    check_sync_position,
+    check_task_access,
+    counter_key,
+    csv_chunk,
+    decode_sync_token,
+    export_response,
+    ndjson_chunk,
+    new_task,
+    plan_batch_read,
+    overdue_count_statement,
+    paginate_tasks,
+    plan_bulk_create,
+    plan_bulk_delete,
+    plan_bulk_update,
+    search_page,
+    publish_task_changes,
+    record_task_changes_async,
+    stats_from_counters,
+    stats_from_row,
+    task_changes,
+    task_etag,
+    task_events_response,
+    task_export_statement,
+    task_fields,
+    task_list_etag,
+    task_list_statement,
+    task_read_statement,
+    task_search_statement,
+    task_stats_statement,
+    task_version_statement,
+    tasks_by_id_statement,
+    tombstones_statement,
+)
+from app.core.config import settings
+from app.core.principal_cache import Principal
+from app.db import task_counters, task_versions
+from app.db.async_session import get_async_db
+from app.db.replicas import get_async_read_db
+from app.models.task import Task
+from app.models.user import User
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_BATCH_IDS, MAX_PAGE_SIZE
+from app.utils.row_json import row_response, rows_response
+from app.utils.etags import etag_matches, not_modified, set_etag
+from app.schemas.task_schema import (
+    TaskBulkCreate,
+    TaskBulkDelete,
+    TaskBulkResult,
+    TaskBulkUpdate,
+    TaskChanges,
+    TaskCreate,
+    TaskRead,
+    TaskStats,
+    TaskUpdate,
+)
+
+# Async (AsyncSession) versions of the routes in tasks.py, used when DB_ASYNC is on
+router = APIRouter()
+
+
+@router.get("/", response_model=List[TaskRead])
+async def list_tasks(
+    request: Request,
+    response: Response,
+    params: TaskListParams = Depends(),
+    fields: List[str] = Depends(task_fields),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """List tasks one page at a time (see tasks.list_tasks)."""
+    version_stmt = task_versions.list_version_statement(counter_key(current_user))
+    etag = task_list_etag((await db.execute(version_stmt)).scalar(), current_user, request)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    rows = (await db.execute(task_list_statement(params, current_user, fields))).all()
+    return rows_response(fields, paginate_tasks(rows, params, response), response)
+
+
+@router.get("/stats", response_model=TaskStats)
+async def get_task_stats(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Get task statistics over the tasks the current user can list."""
+    now = datetime.now(timezone.utc)
+    if settings.USE_TASK_COUNTERS:
+        counters = await task_counters.read_counters_async(db, counter_key(current_user))
+        overdue = (await db.execute(overdue_count_statement(current_user, now))).scalar_one()
+        return stats_from_counters(counters, overdue)
+
+    return stats_from_row((await db.execute(task_stats_statement(current_user, now))).one())
+
+
+@router.get("/export")
+async def export_tasks(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    filters: TaskFilterParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Stream every task the current user can list (see tasks.export_tasks)."""
+    result = await db.stream(task_export_statement(filters, current_user))
+
+    async def chunks():
+        if export_format == "csv":
+            yield csv_chunk([EXPORT_COLUMNS])
+        serialise = csv_chunk if export_format == "csv" else ndjson_chunk
+        async for rows in result.partitions():
+            yield serialise(rows)
+
+    return export_response(export_format, chunks())
+
+
+@router.get("/changes", response_model=TaskChanges)
+async def get_task_changes(
+    since: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Tasks changed and removed since a sync token (see tasks.get_task_changes)."""
+    if since:
+        position = decode_sync_token(since)
+        check_sync_position((await db.execute(task_versions.pruned_seq_statement())).scalar() or 0, position)
+    else:
+        position = [0, "", (await db.execute(task_versions.current_seq_statement())).scalar() or 0, ""]
+
+    tasks_stmt = changed_tasks_statement(current_user, position[0], position[1], limit)
+    tombstones_stmt = tombstones_statement(current_user, position[2], position[3], limit)
+    tasks = (await db.execute(tasks_stmt)).scalars().all()
+    tombstones = (await db.execute(tombstones_stmt)).all()
+    return task_changes(tasks, tombstones, position, limit)
+
+
+@router.get("/search", response_model=List[TaskRead])
+async def search_tasks(
+    response: Response,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Full-text search over the tasks the user can list (see tasks.search_tasks)."""
+    stmt = task_search_statement(db.bind.dialect.name, q, current_user, limit, cursor)
+    if stmt is None:
+        return []
+    return search_page((await db.execute(stmt)).all(), q, limit, response)
+
+
+async def get_events_principal(
+    db: AsyncSession = Depends(get_async_db, scope="function"),
+    token: str = Depends(oauth2_scheme)
+) -> Principal:
+    """get_current_principal with a session that is closed before the event stream starts."""
+    return await get_current_principal(db, token)
+
+
+@router.get("/events")
+async def stream_task_events(current_user: Principal = Depends(get_events_principal)):
+    """Stream task changes the current user can see (see tasks.stream_task_events)."""
+    return task_events_response(current_user)
+
+
+@router.post("/", response_model=TaskRead, status_code=status.HTTP_201_CREATED)
+async def add_task(
+    task_in: TaskCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Create a new task."""
+    assignee_id = (await db.execute(assignee_id_statement(task_in.assigned_to.lower()))).scalar()
+    if assignee_id is None:
+        raise assigned_user_not_found()
+
+    task = new_task(task_in, assignee_id)
+    try:
+        change = (None, task_counters.task_snapshot(task))
+        task.change_seq = await record_task_changes_async(db, [task.id], [change])
+        db.add(task)
+        await db.commit()
+        await db.refresh(task)
+        publish_task_changes([task.id], [change], task.change_seq, {task.id: TaskRead.model_validate(task)})
+        return task
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error creating task: {str(e)}"
+        )
+
+
+@router.post("/bulk/create", response_model=TaskBulkResult)
+async def bulk_create_tasks(
+    body: TaskBulkCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Create many tasks with one multi-row INSERT (see tasks.bulk_create_tasks)."""
+    emails = assignee_emails(body.tasks)
+    assignee_ids = dict((await db.execute(assignee_ids_statement(emails))).all())
+
+    results, rows, changes = plan_bulk_create(body.tasks, assignee_ids)
+    if bulk_should_write(results, body.atomic, response) and rows:
+        try:
+            seq = await record_task_changes_async(db, [row["id"] for row in rows], changes)
+            await db.execute(insert(Task), [{**row, "change_seq": seq} for row in rows])
+            await db.commit()
+            publish_task_changes([row["id"] for row in rows], changes, seq, bulk_tasks_by_id(results))
+        except Exception as e:
+            await db.rollback()
+            raise bulk_write_failed("creating", e)
+    return bulk_result(results)
+
+
+@router.post("/bulk/update", response_model=TaskBulkResult)
+async def bulk_update_tasks(
+    body: TaskBulkUpdate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Update many tasks in a single transaction (see tasks.bulk_update_tasks)."""
+    tasks = (await db.execute(tasks_by_id_statement([item.id for item in body.tasks]))).scalars()
+    emails = assignee_emails(body.tasks)
+    assignee_ids = dict((await db.execute(assignee_ids_statement(emails))).all()) if emails else {}
+
+    results, rows, changes = plan_bulk_update(
+        body.tasks, {task.id: task for task in tasks}, assignee_ids, current_user
+    )
+    if bulk_should_write(results, body.atomic, response) and rows:
+        try:
+            seq = await record_task_changes_async(db, [row["id"] for row in rows], changes)
+            await db.execute(update(Task), [{**row, "change_seq": seq} for row in rows])
+            await db.commit()
+            publish_task_changes([row["id"] for row in rows], changes, seq, bulk_tasks_by_id(results))
+        except Exception as e:
+            await db.rollback()
+            raise bulk_write_failed("updating", e)
+    return bulk_result(results)
+
+
+@router.post("/bulk/delete", response_model=TaskBulkResult)
+async def bulk_delete_tasks(
+    body: TaskBulkDelete,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Delete many tasks with one DELETE in a single transaction (see tasks.bulk_update_tasks)."""
+    tasks = (await db.execute(tasks_by_id_statement(body.ids))).scalars()
+    results, ids, changes = plan_bulk_delete(body.ids, {task.id: task for task in tasks}, current_user)
+    if bulk_should_write(results, body.atomic, response) and ids:
+        try:
+            seq = await record_task_changes_async(db, ids, changes)
+            await db.execute(delete(Task).where(Task.id.in_(ids)))
+            await db.commit()
+            publish_task_changes(ids, changes, seq, {})
+        except Exception as e:
+            await db.rollback()
+            raise bulk_write_failed("deleting", e)
+    return bulk_result(results)
+
+
+@router.get("/batch", response_model=TaskBulkResult)
+async def get_tasks_batch(
+    ids: List[str] = Query(..., min_length=1, max_length=MAX_BATCH_IDS),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Get many tasks by id with one query (see tasks.get_tasks_batch)."""
+    tasks = (await db.execute(tasks_by_id_statement(ids))).scalars()
+    return bulk_result(plan_batch_read(ids, {task.id: task for task in tasks}, current_user))
+
+
+@router.get("/{task_id}", response_model=TaskRead)
+async def get_task(
+    task_id: str,
+    request: Request,
+    response: Response,
+    fields: List[str] = Depends(task_fields),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Get a task by ID. Admin can see any task, normal users can only see tasks created by them."""
+    marker = (await db.execute(task_version_statement(task_id))).first()
+    etag = task_etag(check_task_access(marker, current_user, "view"), fields)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    row = check_task_access((await db.execute(task_read_statement(task_id, fields))).first(), current_user, "view")
+    return row_response(fields, row, response)
+
+
+@router.put("/{task_id}", response_model=TaskRead)
+async def update_task(
+    task_id: str,
+    task_in: TaskUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Update a task. Admin can update any task, normal users can only update tasks created by them."""
+    task = check_task_access(await db.get(Task, task_id), current_user, "update")
+    counters_before = task_counters.task_snapshot(task)
+
+    if task_in.assigned_to is not None:
+        assigned_user = (
+            await db.execute(select(User.id).where(User.user_email == task_in.assigned_to.lower()))
+        ).first()
+        if not assigned_user:
+            raise assigned_user_not_found()
+
+    apply_task_update(task, task_in)
+    if task_in.assigned_to is not None:
+        task.assignee_id = assigned_user.id
+
+    try:
+        change = (counters_before, task_counters.task_snapshot(task))
+        task.change_seq = await record_task_changes_async(db, [task.id], [change])
+        await db.commit()
+        await db.refresh(task)
+        publish_task_changes([task.id], [change], task.change_seq, {task.id: TaskRead.model_validate(task)})
+        return task
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error updating task: {str(e)}"
+        )
+
+
+@router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_task(
+    task_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Delete a task. Admin can delete any task, normal users can only delete tasks created by them."""
+    task = check_task_access(await db.get(Task, task_id), current_user, "delete")
+
+    try:
+        change = (task_counters.task_snapshot(task), None)
+        seq = await record_task_changes_async(db, [task.id], [change])
+        await db.delete(task)
+        await db.commit()
+        publish_task_changes([task.id], [change], seq, {})
+        return None
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error deleting task: {str(e)}"
+        )
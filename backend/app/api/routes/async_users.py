@@ -0,0 +1,173 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.routes.async_auth import get_current_principal, get_current_user
+from app.api.routes.auth import (
+    get_optional_token,
+    revoke_refresh_tokens_statement,
+    user_etag,
+    user_version_statement,
+)
+from app.api.routes.users import (
+    batch_read_result,
+    check_user_access,
+    email_taken,
+    new_user,
+    paginate_users,
+    reject_existing_user,
+    user_list_statement,
+    users_by_id_statement,
+)
+from app.core.principal_cache import Principal, principal_cache
+from app.core.security import hash_password_async
+from app.db.async_session import get_async_db
+from app.db.replicas import get_async_read_db
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.schemas.user_schema import UserBatchResult, UserCreate, UserRead, UserUpdate
+from app.utils.etags import etag_matches, not_modified, set_etag
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_BATCH_IDS, MAX_PAGE_SIZE
+
+# Async (AsyncSession) versions of the routes in users.py, used when DB_ASYNC is on
+router = APIRouter()
+
+
+@router.get("/", response_model=List[UserRead])
+async def list_users(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List users one page at a time, ordered by id (see users.list_users)."""
+    if current_user.role != "admin":
+        # Normal users can only see themselves
+        return [current_user]
+
+    users = (await db.execute(user_list_statement(limit, cursor))).scalars().all()
+    return paginate_users(users, limit, response)
+
+
+@router.post("/", response_model=UserRead, status_code=status.HTTP_201_CREATED)
+async def add_user(
+    user_in: UserCreate,
+    db: AsyncSession = Depends(get_async_db),
+    token: Optional[str] = Depends(get_optional_token)
+):
+    """Create a new user. If user is new, allow creation without auth. If user exists, require auth."""
+    existing_user = (
+        await db.execute(select(User).where(User.user_email == user_in.user_email.lower()))
+    ).scalar_one_or_none()
+    if existing_user:
+        reject_existing_user(existing_user, token)
+
+    user = new_user(user_in, await hash_password_async(user_in.pwd))
+    try:
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        return user
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error creating user: {str(e)}"
+        )
+
+
+@router.get("/batch", response_model=UserBatchResult)
+async def get_users_batch(
+    ids: List[str] = Query(..., min_length=1, max_length=MAX_BATCH_IDS),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Get many users by id with one query (see users.get_users_batch)."""
+    users = (await db.execute(users_by_id_statement(ids))).scalars()
+    return batch_read_result(ids, {user.id: user for user in users}, current_user)
+
+
+@router.get("/{user_id}", response_model=UserRead)
+async def get_user(
+    user_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Get a user by ID. Admin can see any user, normal users can only see themselves."""
+    marker = (await db.execute(user_version_statement(user_id))).first()
+    etag = user_etag(check_user_access(marker, current_user, "view", allow_admin=True))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return check_user_access(await db.get(User, user_id), current_user, "view", allow_admin=True)
+
+
+@router.put("/{user_id}", response_model=UserRead)
+async def update_user(
+    user_id: str,
+    user_in: UserUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Update a user."""
+    # Only allow users to update their own account
+    user = check_user_access(await db.get(User, user_id), current_user, "update")
+
+    if user_in.user_email and user_in.user_email.lower() != user.user_email:
+        user_email_lower = user_in.user_email.lower()
+        existing_user = (
+            await db.execute(
+                select(User.id).where(User.user_email == user_email_lower, User.id != user_id)
+            )
+        ).first()
+        if existing_user:
+            raise email_taken()
+        user.user_email = user_email_lower
+
+    if user_in.user_name is not None:
+        user.user_name = user_in.user_name
+
+    if user_in.pwd is not None:
+        user.pwd = await hash_password_async(user_in.pwd)
+        # A new password signs out every existing session
+        await db.execute(revoke_refresh_tokens_statement(RefreshToken.user_id == user.id))
+
+    user.version += 1
+    try:
+        await db.commit()
+        await db.refresh(user)
+        principal_cache.invalidate_user(user.id)
+        return user
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error updating user: {str(e)}"
+        )
+
+
+@router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_user(
+    user_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Delete a user."""
+    # Only allow users to delete their own account
+    user = check_user_access(await db.get(User, user_id), current_user, "delete")
+
+    try:
+        await db.execute(delete(RefreshToken).where(RefreshToken.user_id == user.id))
+        await db.delete(user)
+        await db.commit()
+        principal_cache.invalidate_user(user_id)
+        return None
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error deleting user: {str(e)}"
+        )
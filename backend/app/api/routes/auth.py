@@ -1,29 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.security.utils import get_authorization_scheme_param
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from starlette.concurrency import run_in_threadpool
+from app.db.replicas import get_read_db
+from app.db.session import get_db
+from app.models.refresh_token import RefreshToken
 from app.models.user import User
-from app.core.security import verify_password, create_access_token, decode_access_token
+from app.core.config import settings
+from app.core.principal_cache import Principal, principal_cache
+from app.core.tenancy import current_tenant
+from app.core.security import (
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    create_access_token,
+    decode_access_token,
+    generate_refresh_token,
+    hash_refresh_token,
+    verify_password_async,
+)
+from app.schemas.token_schema import RefreshRequest
 from app.schemas.user_schema import UserRead
-from typing import Optional
+from app.utils.etags import etag_matches, make_etag, not_modified, set_etag
+from app.utils.ids import new_id
+from typing import Optional, Tuple
 from fastapi import Request
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_db():
-    """Get database session."""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.post("/login")
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
@@ -31,18 +40,125 @@ def login(
     # OAuth2PasswordRequestForm uses 'username' field, but we'll treat it as email
     # Convert to lowercase for comparison
     username_lower = form_data.username.lower()
-    user = db.query(User).filter(User.user_email == username_lower).first()
-    if not user or not verify_password(form_data.password, user.pwd):
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.user_email == username_lower).first()
+    )
+    # bcrypt runs on the password hashing pool so the event loop stays free
+    if not user or not await verify_password_async(form_data.password, user.pwd):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # Read before the commit: it expires `user`, and reloading it would query on the event loop
+    user_id = user.id
+    refresh_token, _ = issue_refresh_token(db, user_id)
+    await run_in_threadpool(db.commit)
     # Create JWT containing user ID
-    access_token = create_access_token(
-        data={"sub": str(user.id)}
+    return token_response(user_id, refresh_token)
+
+
+def issue_refresh_token(db: Session, user_id: str, family_id: Optional[str] = None) -> Tuple[str, RefreshToken]:
+    """Create a refresh token row (not yet committed). Returns the plain token and the row."""
+    token = generate_refresh_token()
+    row = RefreshToken(
+        id=new_id(),
+        user_id=user_id,
+        token_hash=hash_refresh_token(token),
+        family_id=family_id or new_id(),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    db.add(row)
+    return token, row
+
+
+def revoke_refresh_tokens_statement(*criteria):
+    """UPDATE revoking every still-active refresh token matching the criteria."""
+    return update(RefreshToken).where(
+        RefreshToken.revoked_at.is_(None), *criteria
+    ).values(revoked_at=datetime.now(timezone.utc))
+
+
+def revoke_refresh_tokens(db: Session, *criteria) -> None:
+    """Revoke every still-active refresh token matching the criteria (not yet committed)."""
+    db.execute(revoke_refresh_tokens_statement(*criteria))
+
+
+def refresh_token_statement(refresh_token: str):
+    """SELECT of the stored row for a presented refresh token."""
+    return select(RefreshToken).where(
+        RefreshToken.token_hash == hash_refresh_token(refresh_token)
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+
+
+def claim_refresh_token_statement(stored: RefreshToken, replaced_by: str):
+    """UPDATE marking a refresh token as rotated, matching only if it is still active."""
+    return update(RefreshToken).where(
+        RefreshToken.id == stored.id, RefreshToken.revoked_at.is_(None)
+    ).values(revoked_at=datetime.now(timezone.utc), replaced_by=replaced_by)
+
+
+def refresh_token_expired(stored: RefreshToken) -> bool:
+    expires_at = stored.expires_at
+    # SQLite hands back naive datetimes; they were stored as UTC
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return stored.revoked_at is None and expires_at <= datetime.now(timezone.utc)
+
+
+def invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def token_response(user_id: str, refresh_token: str) -> dict:
+    """Body returned by login and refresh."""
+    access_token = create_access_token(data={"sub": str(user_id)})
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+
+@router.post("/refresh")
+def refresh(
+    body: RefreshRequest,
+    db: Session = Depends(get_db)
+):
+    """Exchange a refresh token for a new access token and a rotated refresh token.
+
+    Each refresh token can be used once. Presenting an already rotated token means it
+    was copied, so every token descended from the same login is revoked.
+    """
+    stored = db.execute(refresh_token_statement(body.refresh_token)).scalar_one_or_none()
+    if not stored or refresh_token_expired(stored):
+        raise invalid_refresh_token()
+    user_id, family_id = stored.user_id, stored.family_id
+
+    new_token, new_row = issue_refresh_token(db, user_id, family_id)
+    # Claim the old token atomically so two concurrent refreshes can't both rotate it
+    if not db.execute(claim_refresh_token_statement(stored, new_row.id)).rowcount:
+        # The token was already used or revoked: treat it as stolen and revoke the family
+        db.rollback()
+        revoke_refresh_tokens(db, RefreshToken.family_id == family_id)
+        db.commit()
+        raise invalid_refresh_token()
+
+    db.commit()
+    return token_response(user_id, new_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    body: RefreshRequest,
+    db: Session = Depends(get_db)
+):
+    """Revoke a refresh token together with every token rotated from the same login."""
+    stored = db.execute(refresh_token_statement(body.refresh_token)).scalar_one_or_none()
+    if stored:
+        revoke_refresh_tokens(db, RefreshToken.family_id == stored.family_id)
+        db.commit()
+    return None
 
 
 def get_optional_token(request: Request) -> Optional[str]:
@@ -56,11 +172,8 @@ def get_optional_token(request: Request) -> Optional[str]:
     return token
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
-    """Dependency to get current authenticated user from token."""
+def token_payload(token: str) -> dict:
+    """Decode an access token, raising 401 if it is invalid or expired."""
     payload = decode_access_token(token)
     if not payload or "sub" not in payload:
         raise HTTPException(
@@ -68,20 +181,86 @@ def get_current_user(
             detail="Invalid or expired token",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return payload
 
-    user_id = payload["sub"]
-    user = db.query(User).filter(User.id == user_id).first()
+
+def user_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="User not found"
+    )
+
+
+def _authenticate(db: Session, token: str) -> Tuple[User, dict]:
+    """Decode the token and load its user, raising 401/404 like get_current_user."""
+    payload = token_payload(token)
+    user = db.query(User).filter(User.id == payload["sub"]).first()
     if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+        raise user_not_found()
+    return user, payload
+
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    """Dependency to get current authenticated user from token."""
+    user, payload = _authenticate(db, token)
+    if settings.PRINCIPAL_CACHE_ENABLED:
+        principal_cache.put(token, Principal.from_user(user), payload.get("exp"))
     return user
 
 
+def get_current_principal(
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+) -> Principal:
+    """Dependency to get the id, email and role of the current user.
+
+    Served from the principal cache when possible, so routes that only need identity
+    and role don't query the users table on every request.
+    """
+    if settings.PRINCIPAL_CACHE_ENABLED:
+        principal = principal_cache.get(token)
+        # A token is only valid for the tenant whose users table issued it
+        if principal is not None and principal.tenant == current_tenant.get():
+            return principal
+
+    user, payload = _authenticate(db, token)
+    principal = Principal.from_user(user)
+    if settings.PRINCIPAL_CACHE_ENABLED:
+        principal_cache.put(token, principal, payload.get("exp"))
+    return principal
+
+
+def user_version_statement(user_id: str):
+    """The columns needed for a user's ETag, without loading the user."""
+    return select(User.id, User.version).where(User.id == user_id)
+
+
+def user_etag(user) -> str:
+    return make_etag("user", user.id, user.version)
 
 
 @router.get("/me", response_model=UserRead)
-def read_current_user(current_user: User = Depends(get_current_user)):
-    """Get current authenticated user information."""
-    return current_user
\ No newline at end of file
+def read_current_user(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Get current authenticated user information.
+
+    A matching If-None-Match gets a 304 after reading only the user's version.
+    """
+    marker = db.execute(user_version_statement(current_user.id)).first()
+    if not marker:
+        raise user_not_found()
+    etag = user_etag(marker)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    user = db.get(User, current_user.id)
+    if not user:
+        raise user_not_found()
+    return user
\ No newline at end of file
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.api.routes.auth import get_current_principal
+from app.core.principal_cache import Principal
+from app.db import async_session, replicas, session
+from app.db.pool import pool_status
+from app.schemas.metrics_schema import DatabasePoolMetrics
+
+router = APIRouter()
+
+
+@router.get("/db-pool", response_model=DatabasePoolMetrics)
+def get_db_pool_metrics(current_user: Principal = Depends(get_current_principal)):
+    """Live connection pool statistics (admin only)."""
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view metrics"
+        )
+    async_engine = async_session.async_engine
+    return {
+        "database": pool_status(session.engine),
+        "async_database": pool_status(async_engine.sync_engine if async_engine else None),
+        "replicas": [pool_status(engine) for engine in replicas.replica_engines],
+    }
@@ -1,81 +1,894 @@
-from uuid import uuid4
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import or_
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, case, delete, func, insert, literal, or_, select, true, update
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from app.core.config import settings
+from app.db import bulk_import, task_counters, task_search, task_versions
+from app.db.replicas import get_read_db
+from app.db.session import get_db
 from app.models.task import Task
+from app.models.task_tombstone import TaskTombstone
 from app.models.user import User
-from app.schemas.task_schema import TaskCreate, TaskRead, TaskUpdate
-from app.api.routes.auth import get_current_user
-from typing import List
+from app.schemas.import_schema import ImportReport
+from app.schemas.task_schema import (
+    TaskBulkCreate,
+    TaskBulkDelete,
+    TaskBulkItemResult,
+    TaskBulkResult,
+    TaskBulkUpdate,
+    TaskBulkUpdateItem,
+    TaskChanges,
+    TaskCreate,
+    TaskPriority,
+    TaskRead,
+    TaskStats,
+    TaskStatus,
+    TaskUpdate,
+)
+from app.api.routes.auth import get_current_principal, oauth2_scheme
+from app.api.routes.users import import_upload
+from app.core import task_events
+from app.core.principal_cache import Principal
+from app.core.tenancy import current_tenant
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_BATCH_IDS,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+)
+from app.utils.etags import etag_matches, make_etag, not_modified, set_etag
+from app.utils.ids import new_id
+from app.utils.row_json import row_response, rows_response
+from typing import List, Optional
 
 router = APIRouter()
 
 
-def get_db():
-    """Get database session."""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Columns list_tasks can be sorted on; id is always the tie-breaker
+TASK_SORT_COLUMNS = {
+    "due_date": Task.due_date,
+    "start_date": Task.start_date,
+    "title": Task.title,
+}
+
+
+# The fields of TaskRead, and the columns they are read from
+TASK_READ_FIELDS = list(TaskRead.model_fields)
+TASK_READ_COLUMNS = [getattr(Task, field) for field in TASK_READ_FIELDS]
+_FIELD_NAME = "|".join(TASK_READ_FIELDS)
+
+
+def task_fields(
+    fields: Optional[str] = Query(None, pattern=rf"^({_FIELD_NAME})(,({_FIELD_NAME}))*$")
+) -> List[str]:
+    """The TaskRead fields a task read returns: all of them, or the comma-separated `fields`.
+
+    id is always returned. Fields come back in TaskRead order.
+    """
+    if fields is None:
+        return TASK_READ_FIELDS
+    requested = set(fields.split(","))
+    return [field for field in TASK_READ_FIELDS if field == "id" or field in requested]
+
+
+class TaskFilterParams:
+    """Filter query parameters shared by list_tasks and export_tasks."""
+
+    def __init__(
+        self,
+        status_filter: Optional[TaskStatus] = Query(None, alias="status"),
+        priority: Optional[TaskPriority] = None,
+        assigned_to: Optional[str] = None,
+        created_by: Optional[str] = None,
+        due_from: Optional[datetime] = None,
+        due_to: Optional[datetime] = None,
+        q: Optional[str] = Query(None, min_length=1),
+    ):
+        self.status = status_filter
+        self.priority = priority
+        self.assigned_to = assigned_to
+        self.created_by = created_by
+        self.due_from = due_from
+        self.due_to = due_to
+        self.q = q
+
+
+class TaskListParams:
+    """Filter, sort and paging query parameters of list_tasks."""
+
+    def __init__(
+        self,
+        filters: TaskFilterParams = Depends(),
+        sort: str = Query("due_date", pattern=r"^-?(due_date|start_date|title)$"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+    ):
+        self.filters = filters
+        self.sort = sort
+        self.limit = limit
+        self.cursor = cursor
+
+
+def visible_tasks_clause(current_user: Principal):
+    """SQL condition restricting tasks to the ones the current user is allowed to list."""
+    if current_user.role == "admin":
+        return true()
+    # Normal users can only see tasks created by or assigned to them
+    return (
+        (Task.created_by == current_user.user_email.lower()) |
+        (Task.assigned_to == current_user.user_email.lower())
+    )
+
+
+def visible_tasks(db: Session, current_user: Principal):
+    """Base task query restricted to the tasks the current user is allowed to list."""
+    return db.query(Task).filter(visible_tasks_clause(current_user))
+
+
+def filtered_tasks_statement(filters: TaskFilterParams, current_user: Principal):
+    """SELECT of the visible tasks matching the filter parameters."""
+    stmt = select(Task).where(visible_tasks_clause(current_user))
+
+    if filters.status is not None:
+        stmt = stmt.where(Task.status == filters.status)
+    if filters.priority is not None:
+        stmt = stmt.where(Task.priority == filters.priority)
+    if filters.assigned_to is not None:
+        stmt = stmt.where(Task.assigned_to == filters.assigned_to.lower())
+    if filters.created_by is not None:
+        stmt = stmt.where(Task.created_by == filters.created_by.lower())
+    if filters.due_from is not None:
+        stmt = stmt.where(Task.due_date >= filters.due_from)
+    if filters.due_to is not None:
+        stmt = stmt.where(Task.due_date <= filters.due_to)
+    if filters.q is not None:
+        pattern = contains_pattern(filters.q)
+        stmt = stmt.where(or_(
+            Task.title.ilike(pattern, escape="\\"),
+            Task.description.ilike(pattern, escape="\\"),
+            Task.assigned_to.ilike(pattern, escape="\\"),
+        ))
+    return stmt
+
+
+def contains_pattern(text: str) -> str:
+    """LIKE pattern matching `text` anywhere, with its own %, _ and \\ matched literally."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def keyset_clause(sort_column, last_value, id_column, last_id, descending: bool = False):
+    """Rows after (last_value, last_id) in (sort_column, id_column) order.
+
+    Written as a range on the sort column plus the tie-break, so an index on the sort
+    column can seek straight to the position instead of scanning up to it.
+    """
+    if descending:
+        return and_(sort_column <= last_value, or_(sort_column < last_value, id_column < last_id))
+    return and_(sort_column >= last_value, or_(sort_column > last_value, id_column > last_id))
+
+
+def task_columns(fields: List[str], *extra: str) -> list:
+    """Columns of the TaskRead `fields`, then those of `extra` not among them (read, not returned)."""
+    return [getattr(Task, name) for name in fields + [name for name in extra if name not in fields]]
+
+
+def task_list_statement(params: TaskListParams, current_user: Principal, fields: List[str] = TASK_READ_FIELDS):
+    """SELECT of the `fields` of one page of list_tasks (plus one extra row to detect a next page).
+
+    The sort column is read too, for the next page cursor.
+    """
+    descending = params.sort.startswith("-")
+    sort_key = params.sort.lstrip("-")
+    sort_column = TASK_SORT_COLUMNS[sort_key]
+    stmt = filtered_tasks_statement(params.filters, current_user).with_only_columns(*task_columns(fields, sort_key))
+
+    if params.cursor:
+        try:
+            cursor_sort, last_value, last_id = decode_cursor(params.cursor, 3)
+            if cursor_sort != params.sort:
+                raise ValueError("Cursor does not match sort order")
+            if sort_key != "title":
+                last_value = datetime.fromisoformat(last_value)
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        stmt = stmt.where(keyset_clause(sort_column, last_value, Task.id, last_id, descending))
+
+    if descending:
+        stmt = stmt.order_by(sort_column.desc(), Task.id.desc())
+    else:
+        stmt = stmt.order_by(sort_column, Task.id)
+
+    # Fetch one extra row to find out whether there is a next page
+    return stmt.limit(params.limit + 1)
+
+
+def paginate_tasks(tasks: list, params: TaskListParams, response: Response) -> list:
+    """Trim the extra row fetched by task_list_statement and set the next page cursor."""
+    if len(tasks) > params.limit:
+        tasks = tasks[:params.limit]
+        sort_key = params.sort.lstrip("-")
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [params.sort, getattr(tasks[-1], sort_key), tasks[-1].id]
+        )
+    return tasks
+
+
+def task_list_etag(version: Optional[int], current_user: Principal, request: Request) -> str:
+    """ETag of a list_tasks page: the user's task list version plus the query string."""
+    return make_etag("tasks", counter_key(current_user), version or 0, request.url.query)
+
+
+def task_version_statement(task_id: str):
+    """The columns get_task needs to check access and build the ETag, without the task itself."""
+    return select(Task.id, Task.created_by, Task.version).where(Task.id == task_id)
+
+
+def task_read_statement(task_id: str, fields: List[str]):
+    """The `fields` of a task, plus created_by for the access check."""
+    return select(*task_columns(fields, "created_by")).where(Task.id == task_id)
+
+
+def task_etag(task, fields: List[str] = TASK_READ_FIELDS) -> str:
+    """ETag of a task, distinct for each set of returned fields."""
+    if fields == TASK_READ_FIELDS:
+        return make_etag("task", task.id, task.version)
+    return make_etag("task", task.id, task.version, ",".join(fields))
+
+
+def record_task_changes(db: Session, task_ids: List[str], changes) -> int:
+    """Update the task counters, task list versions and tombstones for (before, after) task snapshots.
+
+    Called before commit by every task write, so all of them change in the same transaction.
+    Returns the sync sequence number to store as the change_seq of the written tasks.
+    """
+    task_counters.apply_deltas(db, changes)
+    return task_versions.record(db, task_ids, changes)
+
+
+async def record_task_changes_async(db, task_ids: List[str], changes) -> int:
+    """record_task_changes for an AsyncSession."""
+    await task_counters.apply_deltas_async(db, changes)
+    return await task_versions.record_async(db, task_ids, changes)
+
+
+def publish_task_changes(task_ids: List[str], changes, seq: int, tasks_by_id) -> None:
+    """Push committed task changes to the task event streams of the users who can see them.
+
+    `tasks_by_id` holds the TaskRead of every task that still exists.
+    """
+    for task_id, (before, after) in zip(task_ids, changes):
+        task = tasks_by_id.get(task_id)
+        task_events.broker.publish(
+            task_id, before, after, seq, task.model_dump_json() if task is not None else None,
+            tenant=current_tenant.get(),
+        )
+
+
+def bulk_tasks_by_id(results: List[TaskBulkItemResult]):
+    return {result.id: result.task for result in results if result.task is not None}
 
 
 @router.get("/", response_model=List[TaskRead])
 def list_tasks(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    params: TaskListParams = Depends(),
+    fields: List[str] = Depends(task_fields),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    """List all tasks. Admin can see all tasks, normal users can only see tasks created by them."""
+    """List tasks one page at a time.
+
+    Admin can see all tasks, normal users can only see tasks created by or assigned to them.
+    Results can be filtered by status, priority, assignee, creator, due date range and a
+    search string matched against title and description. `sort` is one of due_date,
+    start_date or title, prefixed with "-" for descending order. When more tasks are
+    available, the cursor for the next page is returned in the X-Next-Cursor response header.
+    Responses carry an ETag; a matching If-None-Match gets a 304 without reading any task.
+    `fields` (comma-separated TaskRead fields) limits the columns read and returned.
+    The page is read as plain columns and rendered straight to JSON (see app.utils.row_json).
+    """
+    version = db.execute(task_versions.list_version_statement(counter_key(current_user))).scalar()
+    etag = task_list_etag(version, current_user, request)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    rows = db.execute(task_list_statement(params, current_user, fields)).all()
+    return rows_response(fields, paginate_tasks(rows, params, response), response)
+
+
+def _count_where(condition):
+    """SUM(CASE WHEN condition THEN 1 ELSE 0 END), coalesced to 0 for empty sets."""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _overdue_clause(now: datetime):
+    # The status code is rendered inline: the planner only picks the partial index
+    # ix_tasks_open_due_date when the query repeats its predicate literally
+    completed = literal("completed", Task.status.type, literal_execute=True)
+    return and_(Task.due_date < now, Task.status != completed)
+
+
+def task_stats_statement(current_user: Principal, now: datetime):
+    """Single conditional-aggregate SELECT over the tasks the user can list."""
+    return select(
+        func.count(Task.id),
+        _count_where(Task.status == "pending"),
+        _count_where(Task.status == "in_progress"),
+        _count_where(Task.status == "completed"),
+        _count_where(Task.priority == "high"),
+        _count_where(_overdue_clause(now)),
+    ).where(visible_tasks_clause(current_user))
+
+
+def overdue_count_statement(current_user: Principal, now: datetime):
+    return select(func.count(Task.id)).where(
+        visible_tasks_clause(current_user), _overdue_clause(now)
+    )
+
+
+def counter_key(current_user: Principal) -> str:
+    """task_counters row set holding the statistics of the current user."""
     if current_user.role == "admin":
-        tasks = db.query(Task).all()
+        return task_counters.ALL_USERS
+    return current_user.user_email.lower()
+
+
+def stats_from_row(row) -> TaskStats:
+    return TaskStats(
+        total=row[0],
+        pending=row[1],
+        in_progress=row[2],
+        completed=row[3],
+        high_priority=row[4],
+        overdue=row[5],
+    )
+
+
+def stats_from_counters(counters, overdue: int) -> TaskStats:
+    return TaskStats(
+        total=sum(c for (dimension, _), c in counters.items() if dimension == "status"),
+        pending=counters.get(("status", "pending"), 0),
+        in_progress=counters.get(("status", "in_progress"), 0),
+        completed=counters.get(("status", "completed"), 0),
+        high_priority=counters.get(("priority", "high"), 0),
+        overdue=overdue,
+    )
+
+
+@router.get("/stats", response_model=TaskStats)
+def get_task_stats(
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Get task statistics over the tasks the current user can list."""
+    now = datetime.now(timezone.utc)
+    if settings.USE_TASK_COUNTERS:
+        # Counts come from the maintained counter rows; only "overdue" depends on the
+        # current time, so it is still counted from the (due_date indexed) tasks table.
+        counters = task_counters.read_counters(db, counter_key(current_user))
+        overdue = db.execute(overdue_count_statement(current_user, now)).scalar_one()
+        return stats_from_counters(counters, overdue)
+
+    return stats_from_row(db.execute(task_stats_statement(current_user, now)).one())
+
+
+# Rows fetched per round trip (and per streamed chunk) by export_tasks
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = TASK_READ_FIELDS
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def task_export_statement(filters: TaskFilterParams, current_user: Principal):
+    """Plain-column SELECT of every visible task matching the filters, streamed in batches."""
+    return (
+        filtered_tasks_statement(filters, current_user)
+        .with_only_columns(*(getattr(Task, column) for column in EXPORT_COLUMNS))
+        .order_by(Task.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def ndjson_chunk(rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, map(_export_value, row)))) + "\n" for row in rows
+    )
+
+
+def csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_export_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def export_chunks(export_format: str, partitions):
+    """Serialise batches of exported rows, one string per batch (CSV starts with a header)."""
+    if export_format == "csv":
+        yield csv_chunk([EXPORT_COLUMNS])
+    serialise = csv_chunk if export_format == "csv" else ndjson_chunk
+    for rows in partitions:
+        yield serialise(rows)
+
+
+def export_response(export_format: str, chunks) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{export_format}"'},
+    )
+
+
+@router.get("/export")
+def export_tasks(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    filters: TaskFilterParams = Depends(),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Stream every task the current user can list as NDJSON or CSV.
+
+    Accepts the filters of list_tasks. Rows are read with a server-side cursor in batches
+    of EXPORT_BATCH_SIZE and written as they arrive, so memory use does not grow with
+    the number of tasks.
+    """
+    result = db.execute(task_export_statement(filters, current_user))
+    return export_response(export_format, export_chunks(export_format, result.partitions()))
+
+
+def decode_sync_token(since: str) -> List:
+    """[task change_seq, task id, tombstone change_seq, tombstone task id] of a sync token."""
+    try:
+        task_seq, task_id, tomb_seq, tomb_id = decode_cursor(since, 4)
+        if not (isinstance(task_seq, int) and isinstance(tomb_seq, int)):
+            raise ValueError("Invalid sync token")
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync token"
+        )
+    return [task_seq, str(task_id), tomb_seq, str(tomb_id)]
+
+
+def check_sync_position(pruned_seq: int, position: List) -> None:
+    """Refuse a sync token older than the pruned tombstones with 410: the client must sync again."""
+    if task_versions.sync_position_pruned(pruned_seq, position[2], position[3]):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync token expired; sync again without since"
+        )
+
+
+def changed_tasks_statement(current_user: Principal, after_seq: int, after_id: str, limit: int):
+    """Visible tasks written after the (change_seq, id) position, plus one extra row."""
+    return (
+        select(Task)
+        .where(
+            visible_tasks_clause(current_user),
+            keyset_clause(Task.change_seq, after_seq, Task.id, after_id),
+        )
+        .order_by(Task.change_seq, Task.id)
+        .limit(limit + 1)
+    )
+
+
+def tombstones_statement(current_user: Principal, after_seq: int, after_id: str, limit: int):
+    """The user's tombstones after the (change_seq, task_id) position, plus one extra row."""
+    return (
+        select(TaskTombstone.change_seq, TaskTombstone.task_id)
+        .where(
+            TaskTombstone.user_email == counter_key(current_user),
+            keyset_clause(TaskTombstone.change_seq, after_seq, TaskTombstone.task_id, after_id),
+        )
+        .order_by(TaskTombstone.change_seq, TaskTombstone.task_id)
+        .limit(limit + 1)
+    )
+
+
+def task_changes(tasks: List[Task], tombstones, position: List, limit: int) -> TaskChanges:
+    """Trim the extra rows of both change streams and build the token following them."""
+    task_seq, task_id, tomb_seq, tomb_id = position
+    has_more = len(tasks) > limit or len(tombstones) > limit
+    tasks, tombstones = tasks[:limit], tombstones[:limit]
+    if tasks:
+        task_seq, task_id = tasks[-1].change_seq, tasks[-1].id
+    if tombstones:
+        tomb_seq, tomb_id = tombstones[-1]
+    return TaskChanges(
+        tasks=[TaskRead.model_validate(task) for task in tasks],
+        deleted=[deleted_id for _, deleted_id in tombstones],
+        next_token=encode_cursor([task_seq, task_id, tomb_seq, tomb_id]),
+        has_more=has_more,
+    )
+
+
+@router.get("/changes", response_model=TaskChanges)
+def get_task_changes(
+    since: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Tasks created or modified since a sync token, and the ids of tasks removed since then.
+
+    Without `since` every visible task is returned (in pages) and only later removals are
+    reported. Tasks are ordered by their change_seq, so the cost of a call depends on how
+    much changed rather than on how many tasks there are. A task reassigned away from the
+    user is reported in `deleted`, like a deleted one. Tombstones are kept for
+    TASK_TOMBSTONE_RETENTION_DAYS; older tokens get a 410 and the client syncs again without `since`.
+    """
+    if since:
+        position = decode_sync_token(since)
+        check_sync_position(db.execute(task_versions.pruned_seq_statement()).scalar() or 0, position)
     else:
-        # Normal users can only see tasks created by them
-        tasks = db.query(Task).filter(
-            (Task.created_by == current_user.user_email.lower()) |
-            (Task.assigned_to == current_user.user_email.lower())
-        ).all()
-    return tasks
+        position = [0, "", db.execute(task_versions.current_seq_statement()).scalar() or 0, ""]
 
+    tasks = db.execute(changed_tasks_statement(current_user, position[0], position[1], limit)).scalars().all()
+    tombstones = db.execute(tombstones_statement(current_user, position[2], position[3], limit)).all()
+    return task_changes(tasks, tombstones, position, limit)
 
-@router.post("/", response_model=TaskRead, status_code=status.HTTP_201_CREATED)
-def add_task(
-    task_in: TaskCreate,
+
+def task_search_statement(dialect: str, q: str, current_user: Principal, limit: int,
+                          cursor: Optional[str]):
+    """SELECT for one page of search_tasks, best match first; None if q has no words."""
+    built = task_search.search_statement(dialect, q)
+    if built is None:
+        return None
+    stmt, score = built
+    stmt = stmt.where(visible_tasks_clause(current_user))
+    if cursor:
+        try:
+            cursor_q, last_score, last_id = decode_cursor(cursor, 3)
+            if cursor_q != q or not isinstance(last_score, (int, float)):
+                raise ValueError("Cursor does not match search")
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        stmt = stmt.where(keyset_clause(score, last_score, Task.id, last_id, descending=True))
+    return stmt.order_by(score.desc(), Task.id.desc()).limit(limit + 1)
+
+
+def search_page(rows, q: str, limit: int, response: Response) -> List[Task]:
+    """Trim the extra (Task, score) row and set the next page cursor."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([q, rows[-1].score, rows[-1].Task.id])
+    return [row.Task for row in rows]
+
+
+@router.get("/search", response_model=List[TaskRead])
+def search_tasks(
+    response: Response,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    """Create a new task."""
-    # # Verify assigned user exists
-    # assigned_user = db.query(User).filter(
-    #     User.id == task_in.assigned_to
-    # ).first()
-    # if not assigned_user:
-    #     raise HTTPException(
-    #         status_code=status.HTTP_404_NOT_FOUND,
-    #         detail="Assigned user not found"
-    #     )
-
-    # Convert created_by and assigned_to to lowercase
-    created_by_lower = task_in.created_by.lower()
-    assigned_to_lower = task_in.assigned_to.lower()
-    
-    new_task = Task(
-        id=str(uuid4()),
+    """Full-text search over the title and description of the tasks the user can list.
+
+    Every word of q must match (as a word prefix, after stemming). Results are ranked
+    best match first and paged like list_tasks, with the cursor in X-Next-Cursor.
+    """
+    stmt = task_search_statement(db.get_bind().dialect.name, q, current_user, limit, cursor)
+    if stmt is None:
+        return []
+    return search_page(db.execute(stmt).all(), q, limit, response)
+
+
+def get_events_principal(
+    db: Session = Depends(get_db, scope="function"),
+    token: str = Depends(oauth2_scheme)
+) -> Principal:
+    """get_current_principal with a session that is closed before the event stream starts.
+
+    Event streams stay open for hours; they must not hold a pooled connection.
+    """
+    return get_current_principal(db, token)
+
+
+def task_events_response(current_user: Principal) -> StreamingResponse:
+    """Subscribe the user to task events and stream them as Server-Sent Events."""
+    try:
+        subscription = task_events.broker.subscribe(current_user)
+    except task_events.TooManySubscribers:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many event streams, please retry shortly",
+            headers={"Retry-After": "5"},
+        )
+
+    async def frames():
+        try:
+            async for frame in task_events.event_stream(subscription):
+                yield frame
+        finally:
+            task_events.broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/events")
+async def stream_task_events(current_user: Principal = Depends(get_events_principal)):
+    """Stream task changes the current user can see as Server-Sent Events.
+
+    Each created, updated or deleted task is sent once its transaction commits, with the
+    task's change_seq as the event id; a task reassigned away from the user arrives as
+    "deleted". Idle streams get a heartbeat comment every TASK_EVENTS_HEARTBEAT_SECONDS.
+    A client that falls TASK_EVENTS_QUEUE_SIZE events behind gets a "resync" event and
+    the stream ends; it should catch up with GET /tasks/changes and reconnect.
+    """
+    return task_events_response(current_user)
+
+
+def check_task_access(task: Optional[Task], current_user: Principal, action: str) -> Task:
+    """Raise 404 for a missing task and 403 unless the user is admin or created it."""
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    # Normal users can only access tasks created by them
+    if current_user.role != "admin" and task.created_by != current_user.user_email.lower():
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not authorized to {action} this task"
+        )
+    return task
+
+
+def new_task(task_in: TaskCreate, assignee_id=None) -> Task:
+    """Build a Task from a TaskCreate, normalising emails to lowercase.
+
+    `assignee_id` is the id of the assigned user.
+    """
+    return Task(
+        id=new_id(),
         title=task_in.title,
         description=task_in.description,
         start_date=task_in.start_date,
         due_date=task_in.due_date,
         priority=task_in.priority,
         status=task_in.status,
-        created_by=created_by_lower,
-        assigned_to=assigned_to_lower,
+        created_by=task_in.created_by.lower(),
+        assigned_to=task_in.assigned_to.lower(),
+        assignee_id=assignee_id,
+        version=1,
+        updated_at=datetime.now(timezone.utc),
+    )
+
+
+def task_update_values(task_in: TaskUpdate) -> dict:
+    """Columns set in a TaskUpdate, with assigned_to normalised to lowercase."""
+    values = task_in.model_dump(exclude_none=True, exclude={"id"})
+    if "assigned_to" in values:
+        values["assigned_to"] = values["assigned_to"].lower()
+    return values
+
+
+def apply_task_update(task: Task, task_in: TaskUpdate) -> None:
+    """Copy the fields set in a TaskUpdate onto a task (assigned_to is checked by the caller)."""
+    for column, value in task_update_values(task_in).items():
+        setattr(task, column, value)
+    task.version += 1
+    task.updated_at = datetime.now(timezone.utc)
+
+
+def assigned_user_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Assigned user not found"
+    )
+
+
+def task_row(task: Task) -> dict:
+    """Column values of a task, as passed to a bulk INSERT or UPDATE."""
+    return {column.key: getattr(task, column.key) for column in Task.__table__.columns}
+
+
+def tasks_by_id_statement(task_ids: List[str]):
+    return select(Task).where(Task.id.in_(set(task_ids)))
+
+
+def assignee_emails(tasks_in) -> List[str]:
+    """Lowercased assigned_to of the bulk items that set one."""
+    return [task_in.assigned_to.lower() for task_in in tasks_in if task_in.assigned_to is not None]
+
+
+def assignee_ids_statement(emails: List[str]):
+    """(user_email, id) of the users among the given lowercased emails."""
+    return select(User.user_email, User.id).where(User.user_email.in_(set(emails)))
+
+
+def assignee_id_statement(email: str):
+    """The id of the user with the given lowercased email."""
+    return select(User.id).where(User.user_email == email)
+
+
+def bulk_item_failed(index: int, task_id: Optional[str], error: HTTPException) -> TaskBulkItemResult:
+    return TaskBulkItemResult(
+        index=index, id=task_id, status_code=error.status_code, detail=error.detail
+    )
+
+
+def duplicate_in_batch() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Task appears more than once in this batch"
+    )
+
+
+def plan_bulk_create(tasks_in: List[TaskCreate], assignee_ids):
+    """Build every task of a bulk create, rejecting assignees that are not users.
+
+    Returns (results, rows, changes): per-item results, the rows to INSERT and the
+    (before, after) counter snapshots of the passing items.
+    """
+    results, rows, changes = [], [], []
+    for index, task_in in enumerate(tasks_in):
+        assignee_id = assignee_ids.get(task_in.assigned_to.lower())
+        if assignee_id is None:
+            results.append(bulk_item_failed(index, None, assigned_user_not_found()))
+            continue
+        task = new_task(task_in, assignee_id)
+        rows.append(task_row(task))
+        changes.append((None, task_counters.task_snapshot(task)))
+        results.append(TaskBulkItemResult(
+            index=index, id=task.id, status_code=status.HTTP_201_CREATED,
+            task=TaskRead.model_validate(task),
+        ))
+    return results, rows, changes
+
+
+def plan_bulk_update(items: List[TaskBulkUpdateItem], tasks_by_id, assignee_ids,
+                     current_user: Principal):
+    """Check every item of a bulk update with the rules of update_task.
+
+    `tasks_by_id` holds the targeted tasks and `assignee_ids` the ids of the new assignees
+    by email. Returns (results, rows, changes) like plan_bulk_create, with one UPDATE row
+    (primary key plus changed columns) per passing item.
+    """
+    results, rows, changes = [], [], []
+    seen = set()
+    for index, item in enumerate(items):
+        try:
+            if item.id in seen:
+                raise duplicate_in_batch()
+            seen.add(item.id)
+            task = check_task_access(tasks_by_id.get(item.id), current_user, "update")
+            values = task_update_values(item)
+            if "assigned_to" in values:
+                if values["assigned_to"] not in assignee_ids:
+                    raise assigned_user_not_found()
+                values["assignee_id"] = assignee_ids[values["assigned_to"]]
+        except HTTPException as e:
+            results.append(bulk_item_failed(index, item.id, e))
+            continue
+
+        if values:
+            values["version"] = task.version + 1
+            values["updated_at"] = datetime.now(timezone.utc)
+        updated = Task(**{**task_row(task), **values})
+        if values:
+            rows.append({"id": task.id, **values})
+            changes.append((task_counters.task_snapshot(task), task_counters.task_snapshot(updated)))
+        results.append(TaskBulkItemResult(
+            index=index, id=task.id, status_code=status.HTTP_200_OK,
+            task=TaskRead.model_validate(updated),
+        ))
+    return results, rows, changes
+
+
+def plan_bulk_delete(task_ids: List[str], tasks_by_id, current_user: Principal):
+    """Check every id of a bulk delete with the rules of delete_task.
+
+    Returns (results, ids, changes), where ids are the tasks to DELETE.
+    """
+    results, ids, changes = [], [], []
+    seen = set()
+    for index, task_id in enumerate(task_ids):
+        try:
+            if task_id in seen:
+                raise duplicate_in_batch()
+            seen.add(task_id)
+            task = check_task_access(tasks_by_id.get(task_id), current_user, "delete")
+        except HTTPException as e:
+            results.append(bulk_item_failed(index, task_id, e))
+            continue
+        ids.append(task_id)
+        changes.append((task_counters.task_snapshot(task), None))
+        results.append(TaskBulkItemResult(
+            index=index, id=task_id, status_code=status.HTTP_204_NO_CONTENT
+        ))
+    return results, ids, changes
+
+
+def plan_batch_read(task_ids: List[str], tasks_by_id, current_user: Principal) -> List[TaskBulkItemResult]:
+    """Check every id of a batch read with the rules of get_task, in request order."""
+    results = []
+    for index, task_id in enumerate(task_ids):
+        try:
+            task = check_task_access(tasks_by_id.get(task_id), current_user, "view")
+        except HTTPException as e:
+            results.append(bulk_item_failed(index, task_id, e))
+            continue
+        results.append(TaskBulkItemResult(
+            index=index, id=task_id, status_code=status.HTTP_200_OK, task=TaskRead.model_validate(task)
+        ))
+    return results
+
+
+def bulk_should_write(results: List[TaskBulkItemResult], atomic: bool, response: Response) -> bool:
+    """Whether the passing items of a batch are written.
+
+    An atomic batch with a failed item writes nothing: the response becomes a 400 and
+    the items that passed are reported as 424 (not applied).
+    """
+    if not atomic or all(result.status_code < 400 for result in results):
+        return True
+    for result in results:
+        if result.status_code < 400:
+            result.status_code = status.HTTP_424_FAILED_DEPENDENCY
+            result.detail = "Not applied: another item in the batch failed"
+            result.task = None
+    response.status_code = status.HTTP_400_BAD_REQUEST
+    return False
+
+
+def bulk_result(results: List[TaskBulkItemResult]) -> TaskBulkResult:
+    failed = sum(1 for result in results if result.status_code >= 400)
+    return TaskBulkResult(succeeded=len(results) - failed, failed=failed, results=results)
+
+
+def bulk_write_failed(action: str, error: Exception) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"Error {action} tasks: {str(error)}"
     )
 
+
+@router.post("/", response_model=TaskRead, status_code=status.HTTP_201_CREATED)
+def add_task(
+    task_in: TaskCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Create a new task."""
+    # Verify assigned user exists, as bulk create, import and update do
+    assignee_id = db.execute(assignee_id_statement(task_in.assigned_to.lower())).scalar()
+    if assignee_id is None:
+        raise assigned_user_not_found()
+
+    task = new_task(task_in, assignee_id)
+
     try:
-        db.add(new_task)
+        change = (None, task_counters.task_snapshot(task))
+        task.change_seq = record_task_changes(db, [task.id], [change])
+        db.add(task)
         db.commit()
-        db.refresh(new_task)
-        return new_task
+        db.refresh(task)
+        publish_task_changes([task.id], [change], task.change_seq, {task.id: TaskRead.model_validate(task)})
+        return task
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -84,28 +897,134 @@ def add_task(
         )
 
 
+@router.post("/bulk/create", response_model=TaskBulkResult)
+def bulk_create_tasks(
+    body: TaskBulkCreate,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Create many tasks with one multi-row INSERT in a single transaction (see bulk_update_tasks)."""
+    emails = assignee_emails(body.tasks)
+    assignee_ids = dict(db.execute(assignee_ids_statement(emails)).all())
+
+    results, rows, changes = plan_bulk_create(body.tasks, assignee_ids)
+    if bulk_should_write(results, body.atomic, response) and rows:
+        try:
+            seq = record_task_changes(db, [row["id"] for row in rows], changes)
+            db.execute(insert(Task), [{**row, "change_seq": seq} for row in rows])
+            db.commit()
+            publish_task_changes([row["id"] for row in rows], changes, seq, bulk_tasks_by_id(results))
+        except Exception as e:
+            db.rollback()
+            raise bulk_write_failed("creating", e)
+    return bulk_result(results)
+
+
+@router.post("/bulk/update", response_model=TaskBulkResult)
+def bulk_update_tasks(
+    body: TaskBulkUpdate,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Update many tasks in a single transaction.
+
+    Every item is checked like update_task and gets its own result. With atomic=true
+    (the default) one failed item rejects the whole batch; otherwise the rest is applied.
+    """
+    tasks = db.execute(tasks_by_id_statement([item.id for item in body.tasks])).scalars()
+    emails = assignee_emails(body.tasks)
+    assignee_ids = dict(db.execute(assignee_ids_statement(emails)).all()) if emails else {}
+
+    results, rows, changes = plan_bulk_update(
+        body.tasks, {task.id: task for task in tasks}, assignee_ids, current_user
+    )
+    if bulk_should_write(results, body.atomic, response) and rows:
+        try:
+            seq = record_task_changes(db, [row["id"] for row in rows], changes)
+            db.execute(update(Task), [{**row, "change_seq": seq} for row in rows])
+            db.commit()
+            publish_task_changes([row["id"] for row in rows], changes, seq, bulk_tasks_by_id(results))
+        except Exception as e:
+            db.rollback()
+            raise bulk_write_failed("updating", e)
+    return bulk_result(results)
+
+
+@router.post("/bulk/delete", response_model=TaskBulkResult)
+def bulk_delete_tasks(
+    body: TaskBulkDelete,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Delete many tasks with one DELETE in a single transaction (see bulk_update_tasks)."""
+    tasks = db.execute(tasks_by_id_statement(body.ids)).scalars()
+    results, ids, changes = plan_bulk_delete(body.ids, {task.id: task for task in tasks}, current_user)
+    if bulk_should_write(results, body.atomic, response) and ids:
+        try:
+            seq = record_task_changes(db, ids, changes)
+            db.execute(delete(Task).where(Task.id.in_(ids)))
+            db.commit()
+            publish_task_changes(ids, changes, seq, {})
+        except Exception as e:
+            db.rollback()
+            raise bulk_write_failed("deleting", e)
+    return bulk_result(results)
+
+
+@router.post("/import", response_model=ImportReport)
+def import_tasks(
+    file: UploadFile = File(...),
+    requested_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Bulk import tasks from a CSV or NDJSON upload (admin only).
+
+    Rows are validated against TaskCreate and inserted in batches; see users.import_users.
+    """
+    fmt, lines = import_upload(file, requested_format, current_user, "tasks")
+    return bulk_import.import_tasks(db, lines, fmt)
+
+
+@router.get("/batch", response_model=TaskBulkResult)
+def get_tasks_batch(
+    ids: List[str] = Query(..., min_length=1, max_length=MAX_BATCH_IDS),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Get many tasks by id (repeat `ids`) with one query and one auth lookup.
+
+    Each id gets its own result, in request order, checked like get_task: 404 for a
+    missing task and 403 for one the user may not view.
+    """
+    tasks = db.execute(tasks_by_id_statement(ids)).scalars()
+    return bulk_result(plan_batch_read(ids, {task.id: task for task in tasks}, current_user))
+
+
 @router.get("/{task_id}", response_model=TaskRead)
 def get_task(
     task_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    fields: List[str] = Depends(task_fields),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    """Get a task by ID. Admin can see any task, normal users can only see tasks created by them."""
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
-        )
-    
-    # Normal users can only see tasks created by them
-    if current_user.role != "admin" and task.created_by != current_user.user_email.lower():
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view this task"
-        )
-    
-    return task
+    """Get a task by ID. Admin can see any task, normal users can only see tasks created by them.
+
+    A matching If-None-Match gets a 304 after reading only the task's version. `fields`
+    limits the columns read and returned, as in list_tasks.
+    """
+    marker = check_task_access(db.execute(task_version_statement(task_id)).first(), current_user, "view")
+    etag = task_etag(marker, fields)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    row = check_task_access(db.execute(task_read_statement(task_id, fields)).first(), current_user, "view")
+    return row_response(fields, row, response)
 
 
 @router.put("/{task_id}", response_model=TaskRead)
@@ -113,52 +1032,31 @@ def update_task(
     task_id: str,
     task_in: TaskUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Update a task. Admin can update any task, normal users can only update tasks created by them."""
     task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
-        )
-    
-    # Normal users can only update tasks created by them
-    if current_user.role != "admin" and task.created_by != current_user.user_email.lower():
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this task"
-        )
+    check_task_access(task, current_user, "update")
+    counters_before = task_counters.task_snapshot(task)
 
-    # If assigned_to is being updated, verify the user exists and convert to lowercase
+    # If assigned_to is being updated, verify the user exists
     if task_in.assigned_to is not None:
-        assigned_to_lower = task_in.assigned_to.lower()
         assigned_user = db.query(User).filter(
-            User.user_email == assigned_to_lower
+            User.user_email == task_in.assigned_to.lower()
         ).first()
         if not assigned_user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Assigned user not found"
-            )
-        task.assigned_to = assigned_to_lower
-
-    if task_in.title is not None:
-        task.title = task_in.title
-    if task_in.description is not None:
-        task.description = task_in.description
-    if task_in.start_date is not None:
-        task.start_date = task_in.start_date
-    if task_in.due_date is not None:
-        task.due_date = task_in.due_date
-    if task_in.priority is not None:
-        task.priority = task_in.priority
-    if task_in.status is not None:
-        task.status = task_in.status
+            raise assigned_user_not_found()
+
+    apply_task_update(task, task_in)
+    if task_in.assigned_to is not None:
+        task.assignee_id = assigned_user.id
 
     try:
+        change = (counters_before, task_counters.task_snapshot(task))
+        task.change_seq = record_task_changes(db, [task.id], [change])
         db.commit()
         db.refresh(task)
+        publish_task_changes([task.id], [change], task.change_seq, {task.id: TaskRead.model_validate(task)})
         return task
     except Exception as e:
         db.rollback()
@@ -172,26 +1070,18 @@ def update_task(
 def delete_task(
     task_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Delete a task. Admin can delete any task, normal users can only delete tasks created by them."""
     task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
-        )
-    
-    # Normal users can only delete tasks created by them
-    if current_user.role != "admin" and task.created_by != current_user.user_email.lower():
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this task"
-        )
+    check_task_access(task, current_user, "delete")
 
     try:
+        change = (task_counters.task_snapshot(task), None)
+        seq = record_task_changes(db, [task.id], [change])
         db.delete(task)
         db.commit()
+        publish_task_changes([task.id], [change], seq, {})
         return None
     except Exception as e:
         db.rollback()
@@ -1,41 +1,181 @@
-from uuid import uuid4
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from starlette.concurrency import run_in_threadpool
+from app.db import bulk_import
+from app.db.replicas import get_read_db
+from app.db.session import get_db
+from app.models.refresh_token import RefreshToken
 from app.models.user import User
-from app.schemas.user_schema import UserCreate, UserRead, UserUpdate
-from app.core.security import get_password_hash, verify_password
-from app.api.routes.auth import get_current_user, get_optional_token
+from app.schemas.import_schema import ImportReport
+from app.schemas.user_schema import UserBatchItemResult, UserBatchResult, UserCreate, UserRead, UserUpdate
+from app.core.security import decode_access_token, hash_password_async
+from app.api.routes.auth import (
+    get_current_principal,
+    get_current_user,
+    get_optional_token,
+    revoke_refresh_tokens,
+    user_etag,
+    user_version_statement,
+)
+from app.core.principal_cache import Principal, principal_cache
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_BATCH_IDS,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+)
+from app.utils.etags import etag_matches, not_modified, set_etag
+from app.utils.ids import new_id
 from typing import List, Optional
 
 router = APIRouter()
 
 
-def get_db():
-    """Get database session."""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def user_list_statement(limit: int, cursor: Optional[str]):
+    """SELECT for one page of users ordered by id (plus one extra row to detect a next page)."""
+    stmt = select(User)
+    if cursor:
+        try:
+            (last_id,) = decode_cursor(cursor, 1)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        stmt = stmt.where(User.id > last_id)
+    return stmt.order_by(User.id).limit(limit + 1)
+
+
+def paginate_users(users: List[User], limit: int, response: Response) -> List[User]:
+    """Trim the extra row fetched by user_list_statement and set the next page cursor."""
+    if len(users) > limit:
+        users = users[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([users[-1].id])
+    return users
 
 
 @router.get("/", response_model=List[UserRead])
 def list_users(
-    db: Session = Depends(get_db),
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List all users. Admin can see all users, normal users can only see themselves."""
-    if current_user.role == "admin":
-        users = db.query(User).all()
-    else:
+    """List users one page at a time, ordered by id.
+
+    Admin can see all users, normal users can only see themselves.
+    When more users are available, the cursor for the next page is returned in the
+    X-Next-Cursor response header.
+    """
+    if current_user.role != "admin":
         # Normal users can only see themselves
-        users = [current_user]
-    return users
+        return [current_user]
+
+    users = db.execute(user_list_statement(limit, cursor)).scalars().all()
+    return paginate_users(users, limit, response)
+
+
+def reject_existing_user(existing_user: User, token: Optional[str]):
+    """Raise the error add_user returns when the email is already registered."""
+    # If user exists, require authentication
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User already exists. Authentication required.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    # Verify the token is valid and belongs to this user
+    payload = decode_access_token(token)
+    if not payload or "sub" not in payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user_id = payload["sub"]
+    if user_id != existing_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to modify this user"
+        )
+    # If we get here, user exists and is authenticated - return existing user
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="User with this email already exists"
+    )
+
+
+def new_user(user_in: UserCreate, hashed_password: str) -> User:
+    """Build a User from a UserCreate, normalising the email to lowercase."""
+    return User(
+        id=new_id(),
+        user_email=user_in.user_email.lower(),
+        user_name=user_in.user_name,
+        pwd=hashed_password,
+        # Set default role to "normal" if not provided
+        role=user_in.role if user_in.role else "normal",
+    )
+
+
+def check_user_access(user: Optional[User], current_user: Principal, action: str,
+                      allow_admin: bool = False) -> User:
+    """Raise 404 for a missing user and 403 unless it is the current user (or an admin, if allowed)."""
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    if user.id != current_user.id and not (allow_admin and current_user.role == "admin"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not authorized to {action} this user"
+        )
+    return user
+
+
+def users_by_id_statement(user_ids: List[str]):
+    return select(User).where(User.id.in_(set(user_ids)))
+
+
+def batch_read_result(user_ids: List[str], users_by_id, current_user: Principal) -> UserBatchResult:
+    """Check every id of a batch read with the rules of get_user, in request order."""
+    results = []
+    for index, user_id in enumerate(user_ids):
+        try:
+            user = check_user_access(users_by_id.get(user_id), current_user, "view", allow_admin=True)
+        except HTTPException as e:
+            results.append(UserBatchItemResult(
+                index=index, id=user_id, status_code=e.status_code, detail=e.detail
+            ))
+            continue
+        results.append(UserBatchItemResult(
+            index=index, id=user_id, status_code=status.HTTP_200_OK, user=UserRead.model_validate(user)
+        ))
+    failed = sum(1 for result in results if result.status_code >= 400)
+    return UserBatchResult(succeeded=len(results) - failed, failed=failed, results=results)
+
+
+def email_taken() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="User with this email already exists"
+    )
+
+
+def _save(db: Session, user: User) -> User:
+    """Add (if new) and commit a user, then reload it."""
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
 
 
 @router.post("/", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def add_user(
+async def add_user(
     user_in: UserCreate,
     db: Session = Depends(get_db),
     token: Optional[str] = Depends(get_optional_token)
@@ -43,142 +183,140 @@ def add_user(
     """Create a new user. If user is new, allow creation without auth. If user exists, require auth."""
     # Check if user email already exists (convert to lowercase for comparison)
     user_email_lower = user_in.user_email.lower()
-    existing_user = db.query(User).filter(
-        User.user_email == user_email_lower
-    ).first()
+    existing_user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.user_email == user_email_lower).first()
+    )
     
-    # If user exists, require authentication
     if existing_user:
-        if not token:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User already exists. Authentication required.",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        # Verify the token is valid and belongs to this user
-        from app.core.security import decode_access_token
-        payload = decode_access_token(token)
-        if not payload or "sub" not in payload:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        user_id = payload["sub"]
-        if user_id != existing_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to modify this user"
-            )
-        # If we get here, user exists and is authenticated - return existing user
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User with this email already exists"
-        )
+        reject_existing_user(existing_user, token)
 
     # User is new, allow creation without auth
-    # Hash password
-    hashed_password = get_password_hash(user_in.pwd)
-    
-    # Convert email to lowercase
-    user_email_lower = user_in.user_email.lower()
-    
-    # Set default role to "normal" if not provided
-    user_role = user_in.role if user_in.role else "normal"
-
-    new_user = User(
-        id=str(uuid4()),
-        user_email=user_email_lower,
-        user_name=user_in.user_name,
-        pwd=hashed_password,
-        role=user_role,
-    )
+    # Hash password on the password hashing pool
+    hashed_password = await hash_password_async(user_in.pwd)
+    user = new_user(user_in, hashed_password)
 
     try:
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
-        return new_user
+        return await run_in_threadpool(_save, db, user)
     except Exception as e:
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating user: {str(e)}"
         )
 
 
+def import_upload(file: UploadFile, requested_format: Optional[str], current_user: Principal, kind: str):
+    """Check an import request and return (format, text lines) of the uploaded file."""
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not authorized to import {kind}"
+        )
+    try:
+        fmt = bulk_import.file_format(file.filename, requested_format)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return fmt, bulk_import.decode_lines(file.file)
+
+
+@router.post("/import", response_model=ImportReport)
+def import_users(
+    file: UploadFile = File(...),
+    requested_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Bulk import users from a CSV or NDJSON upload (admin only).
+
+    Rows are validated against UserCreate and inserted in batches, with passwords hashed
+    on a process pool shared by every import. Rows that fail are listed in the report with
+    their line number.
+    """
+    fmt, lines = import_upload(file, requested_format, current_user, "users")
+    return bulk_import.import_users(db, lines, fmt, shared_pool=True)
+
+
+@router.get("/batch", response_model=UserBatchResult)
+def get_users_batch(
+    ids: List[str] = Query(..., min_length=1, max_length=MAX_BATCH_IDS),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Get many users by id (repeat `ids`) with one query and one auth lookup.
+
+    Each id gets its own result, in request order, checked like get_user: 404 for a
+    missing user and 403 for one the user may not view.
+    """
+    users = db.execute(users_by_id_statement(ids)).scalars()
+    return batch_read_result(ids, {user.id: user for user in users}, current_user)
+
+
 @router.get("/{user_id}", response_model=UserRead)
 def get_user(
     user_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    """Get a user by ID. Admin can see any user, normal users can only see themselves."""
+    """Get a user by ID. Admin can see any user, normal users can only see themselves.
+
+    A matching If-None-Match gets a 304 after reading only the user's version.
+    """
+    marker = db.execute(user_version_statement(user_id)).first()
+    etag = user_etag(check_user_access(marker, current_user, "view", allow_admin=True))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    # Normal users can only see themselves
-    if current_user.role != "admin" and user.id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view this user"
-        )
-    
-    return user
+    return check_user_access(user, current_user, "view", allow_admin=True)
 
 
 @router.put("/{user_id}", response_model=UserRead)
-def update_user(
+async def update_user(
     user_id: str,
     user_in: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Update a user."""
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.id == user_id).first()
+    )
     # Only allow users to update their own account
-    if user.id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this user"
-        )
+    check_user_access(user, current_user, "update")
 
     # Check if email is being changed and if it's already taken
     if user_in.user_email and user_in.user_email.lower() != user.user_email:
         user_email_lower = user_in.user_email.lower()
-        existing_user = db.query(User).filter(
-            User.user_email == user_email_lower,
-            User.id != user_id
-        ).first()
+        existing_user = await run_in_threadpool(
+            lambda: db.query(User).filter(
+                User.user_email == user_email_lower,
+                User.id != user_id
+            ).first()
+        )
         if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="User with this email already exists"
-            )
+            raise email_taken()
         user.user_email = user_email_lower
 
     if user_in.user_name is not None:
         user.user_name = user_in.user_name
 
     if user_in.pwd is not None:
-        user.pwd = get_password_hash(user_in.pwd)
+        user.pwd = await hash_password_async(user_in.pwd)
+        # A new password signs out every existing session
+        await run_in_threadpool(revoke_refresh_tokens, db, RefreshToken.user_id == user.id)
 
+    user.version += 1
     try:
-        db.commit()
-        db.refresh(user)
+        user = await run_in_threadpool(_save, db, user)
+        principal_cache.invalidate_user(user.id)
         return user
     except Exception as e:
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error updating user: {str(e)}"
@@ -189,26 +327,20 @@ def update_user(
 def delete_user(
     user_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Delete a user."""
     user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
     # Only allow users to delete their own account
-    if user.id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this user"
-        )
+    check_user_access(user, current_user, "delete")
 
     try:
+        db.query(RefreshToken).filter(RefreshToken.user_id == user.id).delete(
+            synchronize_session=False
+        )
         db.delete(user)
         db.commit()
+        principal_cache.invalidate_user(user_id)
         return None
     except Exception as e:
         db.rollback()
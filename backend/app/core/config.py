@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -5,7 +6,49 @@ class Settings(BaseSettings):
     """Application settings."""
     DATABASE_URL: str
     JWT_SECRET: str
+    # Serve the task, user and auth routes with an async engine and AsyncSession
+    DB_ASYNC: bool = False
+    # Defaults to DATABASE_URL with its async driver (asyncpg / aiosqlite)
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Connection pool sizing (ignored for in-memory SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    # Seconds before a pooled connection is replaced; -1 keeps connections indefinitely
+    DB_POOL_RECYCLE: int = -1
+    # Ping each connection on checkout; can be turned off when DB_POOL_RECYCLE is below the server idle timeout
+    DB_POOL_PRE_PING: bool = True
+    # Store user, task and refresh token ids as 16-byte UUIDs instead of strings
+    # (existing databases: run `python -m app.db.keys migrate` with this set first)
+    DB_COMPACT_IDS: bool = False
+    # Comma-separated read replica URLs for the read-only routes (see app.db.replicas)
+    DB_REPLICA_URLS: str = ""
+    # How long a client's reads stay on the primary after its own writes
+    DB_REPLICA_STICKY_SECONDS: float = 5.0
     TENANCY_MODE: str = "shared"  # or "schema"
+    # With TENANCY_MODE=schema, the request header naming the tenant (see app.db.tenancy)
+    TENANT_HEADER: str = "X-Tenant"
+    # Serve /tasks/stats from the task_counters table (run `python -m app.db.task_counters rebuild` first)
+    USE_TASK_COUNTERS: bool = False
+    # In-process cache of access token -> (id, email, role) to skip the per-request user lookup
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    # Dedicated bcrypt worker threads and the most hash/verify calls allowed to run or wait
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    # Rows validated and inserted together by the bulk importer
+    IMPORT_BATCH_SIZE: int = 1000
+    # Processes hashing imported passwords (unset: one per CPU, 0: hash in the importing process)
+    IMPORT_HASH_PROCESSES: Optional[int] = None
+    # Task event streams per worker, events queued per stream before it is told to resync,
+    # and seconds between heartbeats on an idle stream
+    TASK_EVENTS_MAX_SUBSCRIBERS: int = 10000
+    TASK_EVENTS_QUEUE_SIZE: int = 100
+    TASK_EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    # Days task tombstones are kept for /tasks/changes (`python -m app.db.task_versions prune`)
+    TASK_TOMBSTONE_RETENTION_DAYS: int = 30
     
     model_config = SettingsConfigDict(env_file=".env")
 
@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+from app.core.config import settings
+from app.core.tenancy import current_tenant
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Identity and role of an authenticated user, without the rest of the User row."""
+    id: str
+    user_email: str
+    role: str
+    # The tenant the user belongs to (TENANCY_MODE=schema)
+    tenant: Optional[str] = None
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(id=user.id, user_email=user.user_email, role=user.role, tenant=current_tenant.get())
+
+
+class PrincipalCache:
+    """Thread-safe LRU cache of access token -> Principal with a TTL and a size limit.
+
+    Entries never outlive the token they were created from.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= time.time():
+                self._remove(token)
+                return None
+            self._entries.move_to_end(token)
+            return principal
+
+    def put(self, token: str, principal: Principal, token_exp: Optional[float] = None) -> None:
+        if self.max_size <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (principal, expires_at)
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop every cached token of a user, e.g. after the user is updated or deleted."""
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, token: str) -> None:
+        principal, _ = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(principal.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[principal.id]
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
@@ -1,3 +1,9 @@
+import asyncio
+import hashlib
+import hmac
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
 from passlib.context import CryptContext
@@ -16,6 +22,7 @@ except Exception:
 SECRET_KEY = settings.JWT_SECRET  # from your .env
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60  # valid for 1 hour
+REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 
 
 # Hash password
@@ -28,6 +35,41 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+# bcrypt releases the GIL, so a small dedicated thread pool keeps hashing off the
+# event loop and off FastAPI's shared threadpool without starving other requests.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+# Bounds running + queued hashing jobs; beyond it callers are rejected instead of queueing forever
+_password_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING)
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+async def _run_password_job(func, *args):
+    if not _password_slots.acquire(blocking=False):
+        raise PasswordHashingBusy()
+    try:
+        future = _password_executor.submit(func, *args)
+    except Exception:
+        _password_slots.release()
+        raise
+    future.add_done_callback(lambda _: _password_slots.release())
+    return await asyncio.wrap_future(future)
+
+
+# Hash password on the password hashing pool
+async def hash_password_async(password: str) -> str:
+    return await _run_password_job(get_password_hash, password)
+
+
+# Verify password on the password hashing pool
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+
 # Create JWT access token
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -43,4 +85,15 @@ def decode_access_token(token: str) -> Optional[dict]:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+
+# Create an opaque refresh token
+def generate_refresh_token() -> str:
+    return secrets.token_urlsafe(32)
+
+
+# Hash a refresh token for storage. Refresh tokens are high-entropy random values,
+# so a keyed HMAC is enough and keeps refreshing far cheaper than a bcrypt login.
+def hash_refresh_token(token: str) -> str:
+    return hmac.new(SECRET_KEY.encode("utf-8"), token.encode("utf-8"), hashlib.sha256).hexdigest()
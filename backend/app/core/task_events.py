@@ -0,0 +1,248 @@
+# python -m app.core.task_events benchmark [SUBSCRIBERS]
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, List, Optional, Set
+from app.core.config import settings
+from app.core.principal_cache import Principal
+from app.core.tenancy import tenant_key
+from app.db.task_counters import ALL_USERS, task_audience
+
+# Sent to a subscriber that fell too far behind, just before its stream ends
+RESYNC_FRAME = "event: resync\ndata: {}\n\n"
+HEARTBEAT_FRAME = ": heartbeat\n\n"
+# Idle subscribers one worker has to hold in the benchmark
+IDLE_SUBSCRIBERS_TARGET = 10000
+
+
+class TooManySubscribers(Exception):
+    """Raised when a worker already holds TASK_EVENTS_MAX_SUBSCRIBERS streams."""
+
+
+def audience_key(principal: Principal) -> str:
+    """The task audience a subscriber belongs to (see task_counters.task_audience)."""
+    if principal.role == "admin":
+        return tenant_key(principal.tenant, ALL_USERS)
+    return tenant_key(principal.tenant, principal.user_email.lower())
+
+
+def event_frame(kind: str, task_id: str, change_seq: int, task_json: Optional[str]) -> str:
+    """One Server-Sent Events frame; its id is the change_seq, usable with GET /tasks/changes."""
+    data = f'{{"type":"{kind}","id":{json.dumps(task_id)},"change_seq":{change_seq},"task":{task_json or "null"}}}'
+    return f"id: {change_seq}\nevent: {kind}\ndata: {data}\n\n"
+
+
+class Subscription:
+    """Bounded queue of event frames for one connection, owned by the event loop serving it.
+
+    When the queue is full the subscription overflows: queued frames are dropped and the
+    stream ends with a resync event, so a slow client cannot make the worker buffer
+    events without limit. The client then catches up with GET /tasks/changes.
+    """
+
+    def __init__(self, key: str, loop: asyncio.AbstractEventLoop, max_queued: int):
+        self.key = key
+        self.loop = loop
+        self.max_queued = max_queued
+        self.frames: Deque[str] = deque()
+        self.overflowed = False
+        self._ready = asyncio.Event()
+
+    def offer(self, frame: str) -> None:
+        """Queue a frame; only called on the subscription's event loop."""
+        if self.overflowed:
+            return
+        if len(self.frames) >= self.max_queued:
+            self.frames.clear()
+            self.overflowed = True
+        else:
+            self.frames.append(frame)
+        self._ready.set()
+
+    async def next_frame(self, timeout: float) -> Optional[str]:
+        """The next queued frame, or None if nothing arrived within `timeout` seconds."""
+        if not self.frames and not self.overflowed:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self.overflowed:
+            return RESYNC_FRAME
+        return self.frames.popleft()
+
+
+class TaskEventBroker:
+    """In-process fan-out of task changes to the subscribers allowed to see them.
+
+    Subscribers are indexed by audience key (user email, or ALL_USERS for admins), so
+    publishing touches only the subscribers of the two or three keys a task has, no
+    matter how many connections are open. Thread-safe: sync routes publish from
+    threadpool threads and frames are handed to each subscriber's event loop.
+    """
+
+    def __init__(self, max_subscribers: int, max_queued: int):
+        self.max_subscribers = max_subscribers
+        self.max_queued = max_queued
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, principal: Principal, loop: Optional[asyncio.AbstractEventLoop] = None) -> Subscription:
+        subscription = Subscription(
+            audience_key(principal), loop or asyncio.get_running_loop(), self.max_queued
+        )
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                raise TooManySubscribers()
+            self._subscribers.setdefault(subscription.key, set()).add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.key)
+            if subscriptions is None or subscription not in subscriptions:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscribers[subscription.key]
+            self._count -= 1
+
+    def publish(self, task_id: str, before, after, change_seq: int, task_json: Optional[str],
+                tenant: Optional[str] = None) -> None:
+        """Send a committed task change to everyone who could see the task before or after it.
+
+        `before` and `after` are task_counters.task_snapshot tuples (None for a create or a
+        delete). Users who lose sight of the task get a "deleted" event. `tenant` is the
+        tenant the task belongs to (TENANCY_MODE=schema).
+        """
+        had = task_audience(before[0], before[1]) if before is not None else set()
+        has = task_audience(after[0], after[1]) if after is not None else set()
+        had = {tenant_key(tenant, key) for key in had}
+        has = {tenant_key(tenant, key) for key in has}
+        kind = "created" if before is None else "deleted" if after is None else "updated"
+        visible = event_frame(kind, task_id, change_seq, task_json if after is not None else None)
+        removed = event_frame("deleted", task_id, change_seq, None)
+
+        with self._lock:
+            targets = [
+                (subscription, visible if key in has else removed)
+                for key in had | has
+                for subscription in self._subscribers.get(key, ())
+            ]
+        for subscription, frame in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, frame)
+            except RuntimeError:
+                # The subscriber's event loop is closed
+                self.unsubscribe(subscription)
+
+    def __len__(self) -> int:
+        return self._count
+
+
+async def event_stream(subscription: Subscription, heartbeat_seconds: Optional[float] = None) -> AsyncIterator[str]:
+    """SSE frames for a subscription, with a heartbeat comment whenever it has been idle.
+
+    Ends after a resync event if the subscription overflowed.
+    """
+    if heartbeat_seconds is None:
+        heartbeat_seconds = settings.TASK_EVENTS_HEARTBEAT_SECONDS
+    yield f"retry: {int(heartbeat_seconds * 1000)}\n\n"
+    while True:
+        frame = await subscription.next_frame(heartbeat_seconds)
+        if frame is None:
+            yield HEARTBEAT_FRAME
+            continue
+        yield frame
+        if frame is RESYNC_FRAME:
+            return
+
+
+broker = TaskEventBroker(
+    max_subscribers=settings.TASK_EVENTS_MAX_SUBSCRIBERS,
+    max_queued=settings.TASK_EVENTS_QUEUE_SIZE,
+)
+
+
+async def _benchmark(subscribers: int) -> Dict[str, float]:
+    import tracemalloc
+
+    test_broker = TaskEventBroker(max_subscribers=subscribers, max_queued=settings.TASK_EVENTS_QUEUE_SIZE)
+    received: List[int] = [0]
+
+    async def consume(subscription: Subscription) -> None:
+        async for frame in event_stream(subscription, heartbeat_seconds=3600):
+            if frame.startswith("id:"):
+                received[0] += 1
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    consumers = []
+    for i in range(subscribers):
+        # One admin per hundred subscribers; the rest are normal users
+        principal = Principal(id=str(i), user_email=f"user{i}@example.com", role="admin" if i % 100 == 0 else "normal")
+        consumers.append(asyncio.create_task(consume(test_broker.subscribe(principal))))
+    await asyncio.sleep(0)
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    # A change seen by one user (plus the admins) costs the same however many are connected.
+    # Events go out in bursts the subscriber queues can hold, waiting for each to be read.
+    admins = len(range(0, subscribers, 100))
+    events, burst = 1000, max(1, settings.TASK_EVENTS_QUEUE_SIZE // 2)
+    snapshot = ("user1@example.com", "user1@example.com", "pending", "low")
+    publish_seconds = 0.0
+    started = time.perf_counter()
+    for first in range(0, events, burst):
+        publish_started = time.perf_counter()
+        for seq in range(first + 1, min(first + burst, events) + 1):
+            test_broker.publish("task-1", None, snapshot, seq, "{}")
+        publish_seconds += time.perf_counter() - publish_started
+        while received[0] < min(first + burst, events) * (1 + admins):
+            await asyncio.sleep(0)
+    delivered_seconds = time.perf_counter() - started
+
+    for consumer in consumers:
+        consumer.cancel()
+    await asyncio.gather(*consumers, return_exceptions=True)
+    return {
+        "subscribers": len(test_broker),
+        "bytes_per_subscriber": held / subscribers,
+        "publish_seconds": publish_seconds / events,
+        "delivered_seconds": delivered_seconds,
+    }
+
+
+def benchmark(subscribers: int) -> bool:
+    """Hold `subscribers` idle event streams in one event loop and publish through them.
+
+    Measures the Python memory each idle stream holds (socket and ASGI server buffers
+    are not included) and the cost of publishing while they are all connected.
+    """
+    report = asyncio.run(_benchmark(subscribers))
+    ok = report["subscribers"] == subscribers and subscribers >= IDLE_SUBSCRIBERS_TARGET
+    print(
+        f"{report['subscribers']:.0f} idle subscribers, {report['bytes_per_subscriber'] / 1024:.1f} KiB each "
+        f"({report['bytes_per_subscriber'] * subscribers / 2 ** 20:.0f} MiB total); "
+        f"publish {report['publish_seconds'] * 1e6:.0f} us/event, 1000 events delivered in "
+        f"{report['delivered_seconds']:.2f}s (target {IDLE_SUBSCRIBERS_TARGET} subscribers) "
+        f"{'OK' if ok else 'FAILED'}"
+    )
+    return ok
+
+
+def main(argv: List[str]) -> int:
+    if not argv or argv[0] != "benchmark" or len(argv) > 2:
+        print("Usage: python -m app.core.task_events benchmark [SUBSCRIBERS]")
+        return 2
+    return 0 if benchmark(int(argv[1]) if len(argv) > 1 else IDLE_SUBSCRIBERS_TARGET) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,62 @@
+import re
+from contextvars import ContextVar
+from typing import Optional
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Tenant names become part of schema (or SQLite file) names
+TENANT_NAME = re.compile(r"^[a-z][a-z0-9_]{0,39}$")
+SCHEMA_PREFIX = "tenant_"
+
+# The tenant of the request being served (TENANCY_MODE=schema), from the tenant header
+current_tenant: ContextVar[Optional[str]] = ContextVar("current_tenant", default=None)
+
+
+class TenantRequired(Exception):
+    """Raised when a request needs the database but names no tenant."""
+
+
+class UnknownTenant(Exception):
+    """Raised for a tenant name that is invalid or has not been provisioned."""
+
+
+def schema_name(tenant: str) -> str:
+    """The schema holding a tenant's tables."""
+    if not TENANT_NAME.match(tenant):
+        raise UnknownTenant(tenant)
+    return SCHEMA_PREFIX + tenant
+
+
+def tenant_key(tenant: Optional[str], key: str) -> str:
+    """A key of per-user in-process state (caches, event audiences), scoped to a tenant."""
+    return key if tenant is None else f"{tenant}/{key}"
+
+
+class TenantMiddleware:
+    """Sets current_tenant from a request header for everything that serves the request.
+
+    Validation happens when the database is first used (see app.db.tenancy), so routes
+    without a database, such as the docs, work without the header. Responses vary by
+    the header, so ETags of one tenant are never revalidated against another.
+    """
+
+    def __init__(self, app: ASGIApp, header: str):
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+        self.vary = (b"vary", header.encode("latin-1"))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        tenant = next((value.decode("latin-1") for name, value in scope["headers"] if name == self.header), None)
+        token = current_tenant.set(tenant.strip().lower() if tenant else None)
+
+        async def send_with_vary(message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), self.vary]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_vary)
+        finally:
+            current_tenant.reset(token)
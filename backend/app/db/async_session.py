@@ -0,0 +1,49 @@
+from sqlalchemy.engine import make_url
+from app.core.config import settings
+from app.db.pool import engine_options
+
+# Async driver used for each sync DATABASE_URL backend
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Swap the driver of a database URL for its async counterpart."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r} databases")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(
+        hide_password=False
+    )
+
+
+# Only built when async mode is on, so the sync path doesn't need greenlet or an async driver
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_url = settings.ASYNC_DATABASE_URL or to_async_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(async_url, **engine_options(async_url, is_async=True))
+    # expire_on_commit=False: attributes can't be lazily reloaded outside an await
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+else:
+    async_engine = None
+    AsyncSessionLocal = None
+
+
+async def get_async_db():
+    """Get async database session (for the request's tenant with TENANCY_MODE=schema)."""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database access requires DB_ASYNC=true")
+    if settings.TENANCY_MODE == "schema":
+        from app.db.tenancy import registry
+
+        session = registry.async_session()
+    else:
+        session = AsyncSessionLocal()
+    async with session as db:
+        yield db
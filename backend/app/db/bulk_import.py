@@ -0,0 +1,376 @@
+# python -m app.db.bulk_import users|tasks FILE [csv|ndjson] [--tenant TENANT]
+# python -m app.db.bulk_import benchmark [TASK_ROWS] [USER_ROWS]
+
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.core import security, task_events
+from app.core.config import settings
+from app.core.tenancy import current_tenant
+from app.db import task_counters, task_versions
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.import_schema import ImportReport, ImportRowError
+from app.schemas.task_schema import TaskCreate, TaskRead
+from app.schemas.user_schema import UserCreate
+from app.utils.ids import new_id
+
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+# Row errors listed in a report; later ones are only counted
+MAX_REPORTED_ERRORS = 1000
+# Throughput the benchmark has to reach, in rows per second
+TASK_IMPORT_TARGET_ROWS_PER_SECOND = 5000
+USER_IMPORT_TARGET_ROWS_PER_SECOND = 20
+
+UNREADABLE_UTF8 = "Not valid UTF-8; the rest of the file was not read"
+
+Progress = Optional[Callable[[ImportReport], None]]
+
+
+def file_format(filename: Optional[str], requested: Optional[str] = None) -> str:
+    """The requested format, or the one implied by the file extension."""
+    if requested:
+        if requested not in FORMATS.values():
+            raise ValueError(f"Unsupported import format {requested!r}")
+        return requested
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension not in FORMATS:
+        raise ValueError("Cannot tell the import format from the file name; use csv or ndjson")
+    return FORMATS[extension]
+
+
+def decode_lines(raw: Iterable[bytes]) -> Iterator[str]:
+    """The lines of a binary file decoded as UTF-8 one at a time, so a bad byte is
+    reported on its own line rather than wherever a read-ahead buffer ends."""
+    for line in raw:
+        yield line.decode("utf-8")
+
+
+def read_records(lines: Iterable[str], fmt: str) -> Iterator[Tuple[int, object]]:
+    """(line number, record) for each row of a CSV or NDJSON stream.
+
+    Rows that cannot be parsed are yielded as their ValueError. Empty CSV cells are
+    left out, so optional fields fall back to their defaults. Bytes that are not UTF-8, or
+    CSV the csv module cannot read, end the stream with one ValueError for the line after
+    the last one read: the rest of the file is skipped.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        try:
+            for record in reader:
+                yield reader.line_num, {
+                    key: value for key, value in record.items() if key is not None and value != ""
+                }
+        except UnicodeDecodeError:
+            yield reader.line_num + 1, ValueError(UNREADABLE_UTF8)
+        except csv.Error as e:
+            yield reader.line_num + 1, ValueError(f"Unreadable CSV ({e}); the rest of the file was not read")
+        return
+    line_number = 0
+    try:
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                record = e
+            yield line_number, record
+    except UnicodeDecodeError:
+        yield line_number + 1, ValueError(UNREADABLE_UTF8)
+
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(map(str, detail['loc'])) or 'row'}: {detail['msg']}"
+            for detail in error.errors()
+        )
+    return str(error)
+
+
+def _add_error(report: ImportReport, line: int, error) -> None:
+    report.failed += 1
+    if len(report.errors) < MAX_REPORTED_ERRORS:
+        report.errors.append(ImportRowError(line=line, error=_error_message(error)))
+
+
+def _run_import(kind: str, lines: Iterable[str], fmt: str, schema, insert_batch,
+                batch_size: Optional[int], progress: Progress) -> ImportReport:
+    """Validate and insert a stream of rows batch by batch, reporting after every batch."""
+    report = ImportReport(kind=kind)
+    started = time.perf_counter()
+    records = read_records(lines, fmt)
+    while True:
+        batch = list(islice(records, batch_size or settings.IMPORT_BATCH_SIZE))
+        if not batch:
+            break
+        valid = []
+        for line, record in batch:
+            try:
+                if isinstance(record, ValueError):
+                    raise record
+                valid.append((line, schema.model_validate(record)))
+            except ValueError as e:
+                _add_error(report, line, e)
+        if valid:
+            insert_batch(valid, report)
+            report.errors.sort(key=lambda error: error.line)
+        report.processed += len(batch)
+        report.seconds = time.perf_counter() - started
+        report.rows_per_second = report.processed / report.seconds if report.seconds else 0.0
+        if progress:
+            progress(report)
+    return report
+
+
+def _insert_rows(db: Session, model, rows: List[dict], lines: List[int],
+                 report: ImportReport, changes=None) -> None:
+    """One multi-row INSERT (plus counter deltas and task list versions) committed per batch.
+
+    Imported tasks are published to the task event streams once their batch commits.
+    """
+    if not rows:
+        return
+    try:
+        if changes:
+            task_counters.apply_deltas(db, changes)
+            seq = task_versions.record(db, [row["id"] for row in rows], changes)
+            for row in rows:
+                row["change_seq"] = seq
+        db.execute(insert(model), rows)
+        db.commit()
+        report.imported += len(rows)
+    except Exception as e:
+        db.rollback()
+        for line in lines:
+            _add_error(report, line, e)
+        return
+    if changes:
+        _publish_created(rows, changes, seq)
+
+
+def _publish_created(rows: List[dict], changes, seq: int) -> None:
+    """tasks.publish_task_changes for a committed batch of imported tasks.
+
+    The broker is in-process: tasks imported from the command line reach no streams, and
+    clients pick them up with GET /tasks/changes.
+    """
+    # Skip rendering every task when nobody is listening
+    if not len(task_events.broker):
+        return
+    tenant = current_tenant.get()
+    for row, (before, after) in zip(rows, changes):
+        task_events.broker.publish(
+            row["id"], before, after, seq, TaskRead.model_validate(row).model_dump_json(), tenant=tenant
+        )
+
+
+_shared_executor: Optional[Executor] = None
+_shared_executor_lock = threading.Lock()
+
+
+def _shared_hash_executor(processes: int) -> Executor:
+    """The process pool shared by every import in this process, started by the first one."""
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = ProcessPoolExecutor(max_workers=processes)
+        return _shared_executor
+
+
+@contextmanager
+def password_hasher(processes: Optional[int] = None, shared: bool = False):
+    """Yields a function hashing a list of passwords, spread over a process pool.
+
+    bcrypt is CPU bound, so separate processes scale it across cores. With 0 processes
+    the passwords are hashed in the current process. `shared` uses one pool for every
+    call in this process (the API) instead of starting and stopping one per import.
+    """
+    if processes is None:
+        processes = settings.IMPORT_HASH_PROCESSES
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes == 0:
+        yield lambda passwords: [security.get_password_hash(password) for password in passwords]
+        return
+
+    executor = _shared_hash_executor(processes) if shared else ProcessPoolExecutor(max_workers=processes)
+    try:
+        yield lambda passwords: list(executor.map(
+            security.get_password_hash, passwords,
+            chunksize=max(1, len(passwords) // (processes * 4)),
+        ))
+    finally:
+        if not shared:
+            executor.shutdown()
+
+
+def import_users(db: Session, lines: Iterable[str], fmt: str, batch_size: Optional[int] = None,
+                 processes: Optional[int] = None, progress: Progress = None,
+                 shared_pool: bool = False) -> ImportReport:
+    """Import users validated against UserCreate. Existing or repeated emails are row errors.
+
+    `shared_pool` hashes passwords on the process pool shared across imports (see password_hasher).
+    """
+    with password_hasher(processes, shared=shared_pool) as hash_passwords:
+        def insert_batch(valid: List[Tuple[int, BaseModel]], report: ImportReport) -> None:
+            emails = {user_in.user_email.lower() for _, user_in in valid}
+            taken = set(db.execute(select(User.user_email).where(User.user_email.in_(emails))).scalars())
+            accepted = []
+            for line, user_in in valid:
+                email = user_in.user_email.lower()
+                if email in taken:
+                    _add_error(report, line, ValueError("User with this email already exists"))
+                    continue
+                taken.add(email)
+                accepted.append((line, user_in))
+
+            hashes = hash_passwords([user_in.pwd for _, user_in in accepted])
+            rows = [
+                {
+                    "id": new_id(),
+                    "user_email": user_in.user_email.lower(),
+                    "user_name": user_in.user_name,
+                    "pwd": hashed_password,
+                    "role": user_in.role if user_in.role else "normal",
+                }
+                for (_, user_in), hashed_password in zip(accepted, hashes)
+            ]
+            _insert_rows(db, User, rows, [line for line, _ in accepted], report)
+
+        return _run_import("users", lines, fmt, UserCreate, insert_batch, batch_size, progress)
+
+
+def import_tasks(db: Session, lines: Iterable[str], fmt: str, batch_size: Optional[int] = None,
+                 progress: Progress = None) -> ImportReport:
+    """Import tasks validated against TaskCreate. Tasks assigned to unknown users are row errors."""
+    def insert_batch(valid: List[Tuple[int, BaseModel]], report: ImportReport) -> None:
+        emails = {task_in.assigned_to.lower() for _, task_in in valid}
+        known = dict(db.execute(select(User.user_email, User.id).where(User.user_email.in_(emails))).all())
+        rows, lines_in, changes = [], [], []
+        now = datetime.now(timezone.utc)
+        for line, task_in in valid:
+            if task_in.assigned_to.lower() not in known:
+                _add_error(report, line, ValueError("Assigned user not found"))
+                continue
+            row = {
+                "id": new_id(),
+                "title": task_in.title,
+                "description": task_in.description,
+                "start_date": task_in.start_date,
+                "due_date": task_in.due_date,
+                "priority": task_in.priority,
+                "status": task_in.status,
+                "created_by": task_in.created_by.lower(),
+                "assigned_to": task_in.assigned_to.lower(),
+                "assignee_id": known[task_in.assigned_to.lower()],
+                "updated_at": now,
+            }
+            rows.append(row)
+            lines_in.append(line)
+            changes.append((None, (row["created_by"], row["assigned_to"], row["status"], row["priority"])))
+        _insert_rows(db, Task, rows, lines_in, report, changes)
+
+    return _run_import("tasks", lines, fmt, TaskCreate, insert_batch, batch_size, progress)
+
+
+def _print_progress(report: ImportReport) -> None:
+    print(
+        f"{report.kind}: {report.processed} rows, {report.imported} imported, "
+        f"{report.failed} failed ({report.rows_per_second:.0f} rows/s)",
+        file=sys.stderr,
+    )
+
+
+def benchmark(task_rows: int, user_rows: int) -> bool:
+    """Import generated rows into a scratch SQLite database and check the throughput targets."""
+    import tempfile
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.models.base import Base
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        owner = "owner@example.com"
+        db.add(User(id=new_id(), user_email=owner, user_name="Owner", pwd="-", role="admin"))
+        db.commit()
+
+        users = (
+            json.dumps({"user_email": f"user{i}@example.com", "user_name": f"User {i}", "pwd": "benchmark-pwd"})
+            for i in range(user_rows)
+        )
+        tasks = (
+            json.dumps({
+                "title": f"Task {i}", "start_date": "2025-01-01T00:00:00",
+                "due_date": "2025-02-01T00:00:00", "priority": "medium", "status": "pending",
+                "created_by": owner, "assigned_to": owner,
+            })
+            for i in range(task_rows)
+        )
+        passed = True
+        for report, target in (
+            (import_users(db, users, "ndjson") if user_rows else None, USER_IMPORT_TARGET_ROWS_PER_SECOND),
+            (import_tasks(db, tasks, "ndjson") if task_rows else None, TASK_IMPORT_TARGET_ROWS_PER_SECOND),
+        ):
+            if report is None:
+                continue
+            ok = report.failed == 0 and report.rows_per_second >= target
+            passed = passed and ok
+            print(
+                f"{report.kind}: {report.imported} rows in {report.seconds:.2f}s = "
+                f"{report.rows_per_second:.0f} rows/s (target {target}) {'OK' if ok else 'FAILED'}"
+            )
+        db.close()
+        engine.dispose()
+    return passed
+
+
+def main(argv: List[str]) -> int:
+    from app.core.tenancy import UnknownTenant
+    from app.db.tenancy import command_session, command_tenants
+
+    if argv[:1] == ["benchmark"] and len(argv) <= 3:
+        task_rows = int(argv[1]) if len(argv) > 1 else 50000
+        user_rows = int(argv[2]) if len(argv) > 2 else 200
+        return 0 if benchmark(task_rows, user_rows) else 1
+    # A file belongs to one tenant: with TENANCY_MODE=schema it has to be named
+    named = argv.count("--tenant")
+    try:
+        argv, tenants = command_tenants(argv)
+    except UnknownTenant as e:
+        print(f"Unknown tenant {e}")
+        return 1
+    if len(argv) not in (2, 3) or argv[0] not in ("users", "tasks") or (tenants != [None] and named != 1):
+        print("Usage: python -m app.db.bulk_import users|tasks FILE [csv|ndjson] [--tenant TENANT]")
+        print("       python -m app.db.bulk_import benchmark [TASK_ROWS] [USER_ROWS]")
+        return 2
+
+    fmt = file_format(argv[1], argv[2] if len(argv) == 3 else None)
+    with command_session(tenants[0]) as db, open(argv[1], "rb") as raw:
+        lines = decode_lines(raw)
+        if argv[0] == "users":
+            report = import_users(db, lines, fmt, progress=_print_progress)
+        else:
+            report = import_tasks(db, lines, fmt, progress=_print_progress)
+    for error in report.errors:
+        print(f"line {error.line}: {error.error}")
+    print(f"Imported {report.imported} of {report.processed} {report.kind} ({report.failed} failed)")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
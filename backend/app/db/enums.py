@@ -0,0 +1,168 @@
+# python -m app.db.enums migrate
+# python -m app.db.enums benchmark [TASK_ROWS]
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Sequence, Tuple
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from app.models.task import Task
+from app.schemas.task_schema import TASK_PRIORITIES, TASK_STATUSES
+from app.schemas.user_schema import USER_ROLES
+
+# Columns stored as CodedEnum codes, with their values in code order
+ENUM_COLUMNS: Dict[Tuple[str, str], Sequence[str]] = {
+    ("tasks", "status"): TASK_STATUSES,
+    ("tasks", "priority"): TASK_PRIORITIES,
+    ("users", "role"): USER_ROLES,
+}
+# Indexes whose predicate compares a coded column, re-created after the conversion
+CODED_PREDICATE_INDEXES = {("tasks", "status"): ["ix_tasks_open_due_date"]}
+
+
+def _code_case(column: str, values: Sequence[str]) -> str:
+    whens = " ".join(f"WHEN '{value}' THEN {code}" for code, value in enumerate(values))
+    return f"CASE lower(trim({column})) {whens} END"
+
+
+def needs_conversion(connection: Connection, table: str, column: str) -> bool:
+    """Whether a coded column still holds strings, i.e. migrate has not converted it."""
+    if connection.dialect.name == "postgresql":
+        column_type = next(c["type"] for c in inspect(connection).get_columns(table) if c["name"] == column)
+        return str(column_type).lower() != "smallint"
+    return connection.execute(text(
+        f"SELECT 1 FROM {table} WHERE typeof({column}) = 'text' LIMIT 1"
+    )).first() is not None
+
+
+def _unknown_values(connection: Connection, table: str, column: str, values: Sequence[str]) -> List[str]:
+    listed = ", ".join(f"'{value}'" for value in values)
+    return list(connection.execute(text(
+        f"SELECT DISTINCT {column} FROM {table} "
+        f"WHERE {column} IS NOT NULL AND lower(trim({column})) NOT IN ({listed})"
+    )).scalars())
+
+
+def migrate(engine: Engine) -> List[str]:
+    """Convert status, priority and role strings to their smallint codes. Safe to run again.
+
+    Values are matched case-insensitively. Values outside the allowed set (typos such as
+    "Complete") stop the migration before anything changes; fix them and run it again.
+    Returns the converted columns.
+    """
+    converted = []
+    with engine.begin() as connection:
+        pending = [
+            (table, column, values) for (table, column), values in ENUM_COLUMNS.items()
+            if needs_conversion(connection, table, column)
+        ]
+        unknown = {
+            f"{table}.{column}": found for table, column, values in pending
+            if (found := _unknown_values(connection, table, column, values))
+        }
+        if unknown:
+            raise ValueError("Unknown values, fix them first: " + "; ".join(
+                f"{name}: {', '.join(repr(value) for value in values)}" for name, values in unknown.items()
+            ))
+
+        existing = {index["name"] for index in inspect(connection).get_indexes("tasks")}
+        for table, column, values in pending:
+            index_names = [name for name in CODED_PREDICATE_INDEXES.get((table, column), []) if name in existing]
+            for name in index_names:
+                connection.execute(text(f"DROP INDEX {name}"))
+            if connection.dialect.name == "postgresql":
+                connection.execute(text(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} TYPE smallint USING {_code_case(column, values)}"
+                ))
+            else:
+                # SQLite columns take any type: rewriting the values is enough
+                connection.execute(text(
+                    f"UPDATE {table} SET {column} = {_code_case(column, values)} WHERE typeof({column}) = 'text'"
+                ))
+            for index in Task.__table__.indexes:
+                if index.name in index_names:
+                    index.create(connection)
+            converted.append(f"{table}.{column}")
+    return converted
+
+
+GROUP_BY_SQL = "SELECT status, priority, count(*) FROM tasks GROUP BY status, priority"
+
+
+def _measure(engine: Engine, path: str) -> Dict[str, float]:
+    with engine.connect() as connection:
+        connection.exec_driver_sql("VACUUM")
+        connection.exec_driver_sql(GROUP_BY_SQL).all()
+        started = time.perf_counter()
+        for _ in range(10):
+            connection.exec_driver_sql(GROUP_BY_SQL).all()
+        group_by = (time.perf_counter() - started) / 10 * 1000
+    return {"group by ms": group_by, "database MiB": os.path.getsize(path) / 2 ** 20}
+
+
+def benchmark(task_rows: int) -> bool:
+    """Load string-valued tasks into a scratch SQLite database, then migrate it to codes.
+
+    Compares the database size (with an index on status and priority, as the legacy
+    per-column indexes had) and the GROUP BY behind the task counters before and after.
+    """
+    import tempfile
+    from sqlalchemy import create_engine
+    from app.models.base import Base
+    from app.models.user import User  # noqa: F401 (tasks.assignee_id references users)
+
+    now = datetime.now(timezone.utc)
+    reports = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "enums.db")
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            connection.exec_driver_sql("CREATE INDEX ix_benchmark_status_priority ON tasks (status, priority)")
+            # The strings the columns held before, written past the coded type
+            connection.exec_driver_sql(
+                "INSERT INTO tasks (id, title, start_date, due_date, priority, status, created_by, assigned_to, "
+                "version, change_seq) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, 0)",
+                [
+                    (f"task-{i}", f"Task {i}", now.isoformat(), (now + timedelta(hours=i % 500)).isoformat(),
+                     TASK_PRIORITIES[i % 3], TASK_STATUSES[i % 5 % 3], "owner@example.com", "owner@example.com")
+                    for i in range(task_rows)
+                ],
+            )
+        reports["before"] = _measure(engine, path)
+        started = time.perf_counter()
+        migrate(engine)
+        print(f"migrate: {time.perf_counter() - started:.2f} s")
+        reports["after"] = _measure(engine, path)
+        engine.dispose()
+
+    print(f"{task_rows} tasks")
+    print(f"{'':16}{'before':>12}{'after':>12}")
+    for name in reports["after"]:
+        print(f"{name:16}{reports['before'][name]:12.2f}{reports['after'][name]:12.2f}")
+    before, after = reports["before"], reports["after"]
+    return after["database MiB"] < before["database MiB"] and after["group by ms"] <= before["group by ms"]
+
+
+def main(argv: List[str]) -> int:
+    if argv[:1] == ["migrate"] and len(argv) == 1:
+        from app.db.session import engine
+
+        try:
+            converted = migrate(engine)
+        except ValueError as e:
+            print(e)
+            return 1
+        print(f"Converted {', '.join(converted)}" if converted else "Enum columns already converted")
+        return 0
+    if argv[:1] == ["benchmark"] and len(argv) <= 2:
+        return 0 if benchmark(int(argv[1]) if len(argv) > 1 else 1000000) else 1
+    print("Usage: python -m app.db.enums migrate")
+    print("       python -m app.db.enums benchmark [TASK_ROWS]")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,215 @@
+# python -m app.db.indexes migrate
+# python -m app.db.indexes benchmark [TASK_ROWS]
+#
+# Run migrate after `python -m app.db.enums migrate`: the predicate of
+# ix_tasks_open_due_date compares tasks.status with its code, which fails on Postgres
+# while the column still holds strings. migrate refuses to run until then.
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+from sqlalchemy import Index, insert, inspect, text, update
+from sqlalchemy.engine import Engine
+from app.db import enums
+from app.models.task import Task
+from app.models.task_tombstone import TaskTombstone
+from app.models.user import User
+from app.utils.ids import new_id
+
+# Indexes that `index=True` used to create on almost every column, and that no query
+# needs any more: (table, columns) by index name
+LEGACY_INDEXES: Dict[str, Tuple[str, List[str]]] = {
+    "ix_tasks_id": ("tasks", ["id"]),
+    "ix_tasks_title": ("tasks", ["title"]),
+    "ix_tasks_description": ("tasks", ["description"]),
+    "ix_tasks_start_date": ("tasks", ["start_date"]),
+    "ix_tasks_due_date": ("tasks", ["due_date"]),
+    "ix_tasks_priority": ("tasks", ["priority"]),
+    "ix_tasks_status": ("tasks", ["status"]),
+    "ix_tasks_created_by": ("tasks", ["created_by"]),
+    "ix_tasks_assigned_to": ("tasks", ["assigned_to"]),
+    "ix_tasks_change_seq": ("tasks", ["change_seq"]),
+    "ix_tasks_updated_at": ("tasks", ["updated_at"]),
+    "ix_users_id": ("users", ["id"]),
+    "ix_users_user_name": ("users", ["user_name"]),
+    "ix_users_pwd": ("users", ["pwd"]),
+    "ix_users_role": ("users", ["role"]),
+    "ix_task_tombstones_change_seq": ("task_tombstones", ["change_seq"]),
+}
+MODELS = (Task, User, TaskTombstone)
+
+
+def model_indexes() -> List[Index]:
+    return [index for model in MODELS for index in model.__table__.indexes]
+
+
+def migrate(engine: Engine) -> Tuple[List[str], List[str]]:
+    """Drop the legacy indexes and create the ones declared on the models.
+
+    Safe to run more than once. Returns (dropped, created) index names. Raises
+    ValueError while a column compared by an index predicate is not converted yet.
+    """
+    dropped, created = [], []
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        existing = {
+            index["name"]
+            for table in {table for table, _ in LEGACY_INDEXES.values()}
+            for index in inspector.get_indexes(table)
+        }
+        for (table, column), names in enums.CODED_PREDICATE_INDEXES.items():
+            missing = [name for name in names if name not in existing]
+            if missing and enums.needs_conversion(connection, table, column):
+                raise ValueError(
+                    f"{table}.{column} still holds strings, which the predicate of {', '.join(missing)} "
+                    "compares as codes: run python -m app.db.enums migrate first"
+                )
+        for name in LEGACY_INDEXES:
+            if name in existing:
+                connection.execute(text(f"DROP INDEX {name}"))
+                dropped.append(name)
+        for index in model_indexes():
+            if index.name not in existing:
+                index.create(connection, checkfirst=True)
+                created.append(index.name)
+    return dropped, created
+
+
+def _use_legacy_indexes(engine: Engine) -> None:
+    """Turn a schema created from the models back into the legacy index set."""
+    with engine.begin() as connection:
+        for index in model_indexes():
+            if not index.unique:
+                index.drop(connection)
+        for name, (table, columns) in LEGACY_INDEXES.items():
+            connection.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+
+
+def _timed(run, repeat: int = 1) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - started) / repeat
+
+
+def _measure(engine: Engine, task_rows: int, users: int) -> Dict[str, float]:
+    from sqlalchemy.orm import Session
+    from app.api.routes.tasks import (
+        TaskFilterParams, TaskListParams, changed_tasks_statement, overdue_count_statement,
+        task_list_statement,
+    )
+    from app.core.principal_cache import Principal
+
+    emails = [f"user{i}@example.com" for i in range(users)]
+    now = datetime.now(timezone.utc)
+    results: Dict[str, float] = {}
+    with Session(engine) as db:
+        db.execute(insert(User), [
+            {"id": new_id(), "user_email": email, "user_name": email, "pwd": "-", "role": "normal"}
+            for email in emails
+        ])
+        rows = [
+            {
+                "id": new_id(), "title": f"Task {i}", "description": "Benchmark task " * 10,
+                "start_date": now - timedelta(hours=i % 5000), "due_date": now + timedelta(hours=i % 2000 - 1000),
+                "priority": ("low", "medium", "high")[i % 3],
+                "status": "completed" if i % 4 else "pending",
+                "created_by": emails[i % users], "assigned_to": emails[(i * 7) % users],
+                "version": 1, "change_seq": i, "updated_at": now,
+            }
+            for i in range(task_rows)
+        ]
+        started = time.perf_counter()
+        for first in range(0, task_rows, 1000):
+            db.execute(insert(Task), rows[first:first + 1000])
+        db.commit()
+        results["insert rows/s"] = task_rows / (time.perf_counter() - started)
+
+        changed = [
+            {"id": row["id"], "status": "in_progress", "change_seq": task_rows + i, "version": 2}
+            for i, row in enumerate(rows[::10])
+        ]
+        started = time.perf_counter()
+        db.execute(update(Task), changed)
+        db.commit()
+        results["update rows/s"] = len(changed) / (time.perf_counter() - started)
+
+        def list_params(sort: str) -> TaskListParams:
+            filters = TaskFilterParams(
+                status_filter=None, priority=None, assigned_to=None, created_by=None,
+                due_from=None, due_to=None, q=None,
+            )
+            return TaskListParams(filters=filters, sort=sort, limit=100, cursor=None)
+
+        user = Principal(id="-", user_email=emails[users // 2], role="normal")
+        admin = Principal(id="-", user_email="admin@example.com", role="admin")
+        queries = {
+            "user list ms": lambda: db.execute(task_list_statement(list_params("due_date"), user)).all(),
+            "admin list ms": lambda: db.execute(task_list_statement(list_params("due_date"), admin)).all(),
+            "admin title ms": lambda: db.execute(task_list_statement(list_params("title"), admin)).all(),
+            "admin start ms": lambda: db.execute(task_list_statement(list_params("-start_date"), admin)).all(),
+            "user overdue ms": lambda: db.execute(overdue_count_statement(user, now)).scalar(),
+            "admin overdue ms": lambda: db.execute(overdue_count_statement(admin, now)).scalar(),
+            "user changes ms": lambda: db.execute(changed_tasks_statement(user, task_rows, "", 100)).all(),
+            "admin changes ms": lambda: db.execute(changed_tasks_statement(admin, task_rows, "", 100)).all(),
+        }
+        for name, query in queries.items():
+            query()
+            results[name] = _timed(query, repeat=20) * 1000
+    results["task indexes"] = len(inspect(engine).get_indexes("tasks"))
+    return results
+
+
+def benchmark(task_rows: int, users: int = 200) -> bool:
+    """Compare writes and reads on scratch SQLite databases with the legacy and the current indexes."""
+    import tempfile
+    from sqlalchemy import create_engine
+    from app.models.base import Base
+
+    reports = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for label in ("before", "after"):
+            engine = create_engine(f"sqlite:///{os.path.join(directory, label + '.db')}")
+            Base.metadata.create_all(bind=engine)
+            if label == "before":
+                _use_legacy_indexes(engine)
+            reports[label] = _measure(engine, task_rows, users)
+            reports[label]["database MiB"] = os.path.getsize(os.path.join(directory, label + ".db")) / 2 ** 20
+            engine.dispose()
+
+    print(f"{task_rows} tasks over {users} users")
+    print(f"{'':20}{'before':>12}{'after':>12}")
+    for name in reports["after"]:
+        print(f"{name:20}{reports['before'][name]:12.2f}{reports['after'][name]:12.2f}")
+    before, after = reports["before"], reports["after"]
+    # About as many indexes as before to maintain, and no list sort slower (within timing noise)
+    lists = ("user list ms", "admin list ms", "admin title ms", "admin start ms")
+    return (
+        after["insert rows/s"] >= 0.9 * before["insert rows/s"]
+        and all(after[name] <= 1.1 * before[name] for name in lists)
+    )
+
+
+def main(argv: List[str]) -> int:
+    if argv[:1] == ["migrate"] and len(argv) == 1:
+        from app.db.session import engine
+
+        try:
+            dropped, created = migrate(engine)
+        except ValueError as e:
+            print(e)
+            return 1
+        print(f"Dropped {len(dropped)} indexes: {', '.join(dropped) or '-'}")
+        print(f"Created {len(created)} indexes: {', '.join(created) or '-'}")
+        return 0
+    if argv[:1] == ["benchmark"] and len(argv) <= 2:
+        return 0 if benchmark(int(argv[1]) if len(argv) > 1 else 100000) else 1
+    print("Usage: python -m app.db.indexes migrate")
+    print("       python -m app.db.indexes benchmark [TASK_ROWS]")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
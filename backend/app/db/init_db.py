@@ -1,8 +1,22 @@
-from app.models import user, task
+# python -m app.db.init_db
+
+from typing import List
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from app.models import user, task, task_counter, task_list_version, task_tombstone, refresh_token
 from app.models.base import Base
-from app.db.session import engine
 
 
-print("Creating tables...")
-Base.metadata.create_all(bind=engine)
-print("All tables created!")
\ No newline at end of file
+def create_tables(engine: Engine) -> List[str]:
+    """Create the tables (and their indexes) that do not exist yet. Returns their names."""
+    existing = set(inspect(engine).get_table_names())
+    Base.metadata.create_all(bind=engine)
+    return [table for table in Base.metadata.tables if table not in existing]
+
+
+if __name__ == "__main__":
+    from app.db.session import engine
+
+    print("Creating tables...")
+    create_tables(engine)
+    print("All tables created!")
@@ -0,0 +1,240 @@
+# python -m app.db.keys migrate
+# python -m app.db.keys benchmark [TASK_ROWS]
+
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+from sqlalchemy import Index, inspect, insert, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from app.core.config import settings
+from app.models.task import Task
+from app.models.user import User
+from app.utils.ids import new_id
+
+# Every column holding a user, task or refresh token id (an EntityId)
+ID_COLUMNS: List[Tuple[str, str]] = [
+    ("users", "id"),
+    ("tasks", "id"),
+    ("tasks", "assignee_id"),
+    ("refresh_tokens", "id"),
+    ("refresh_tokens", "user_id"),
+    ("task_tombstones", "task_id"),
+]
+# Foreign keys to users.id, as (table, column)
+USER_ID_FOREIGN_KEYS: List[Tuple[str, str]] = [("refresh_tokens", "user_id"), ("tasks", "assignee_id")]
+
+
+def _uuid_bytes(value):
+    """SQLite function: the 16 bytes of a UUID string; anything else is left alone."""
+    try:
+        return uuid.UUID(value).bytes
+    except (AttributeError, TypeError, ValueError):
+        return value
+
+
+def _compact_sqlite_ids(connection: Connection) -> List[str]:
+    """Rewrite the UUID strings of the id columns as 16-byte BLOBs.
+
+    SQLite columns take any type, so only the values change; the FTS rowids and the
+    indexes stay valid.
+    """
+    connection.connection.driver_connection.create_function("uuid_bytes", 1, _uuid_bytes, deterministic=True)
+    connection.execute(text("PRAGMA defer_foreign_keys = ON"))
+    converted = []
+    for table, column in ID_COLUMNS:
+        result = connection.execute(text(
+            f"UPDATE {table} SET {column} = uuid_bytes({column}) WHERE typeof({column}) = 'text'"
+        ))
+        if result.rowcount:
+            converted.append(f"{table}.{column}")
+    return converted
+
+
+def _compact_postgres_ids(connection: Connection, columns: Dict[str, Dict[str, str]]) -> List[str]:
+    """ALTER the id columns to the native uuid type, re-creating the foreign keys to users.id."""
+    if columns["users"]["id"] == "uuid":
+        return []
+    inspector = inspect(connection)
+    for table, _ in USER_ID_FOREIGN_KEYS:
+        for foreign_key in inspector.get_foreign_keys(table):
+            if foreign_key["referred_table"] == "users":
+                connection.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{foreign_key["name"]}"'))
+    converted = []
+    for table, column in ID_COLUMNS:
+        if column in columns[table]:
+            connection.execute(text(
+                f"ALTER TABLE {table} ALTER COLUMN {column} TYPE uuid USING {column}::uuid"
+            ))
+            converted.append(f"{table}.{column}")
+    for table, column in USER_ID_FOREIGN_KEYS:
+        if column in columns[table]:
+            connection.execute(text(f"ALTER TABLE {table} ADD FOREIGN KEY ({column}) REFERENCES users (id)"))
+    return converted
+
+
+def migrate(engine: Engine) -> List[str]:
+    """Move an existing database to the id layout of the models. Safe to run more than once.
+
+    Adds and backfills tasks.assignee_id (the foreign key to users.id that replaces the one
+    on assigned_to), and with DB_COMPACT_IDS stores every id as 16 bytes. Returns the steps
+    taken. On SQLite the old foreign key from assigned_to stays in the table definition;
+    SQLite does not enforce it unless PRAGMA foreign_keys is on.
+    """
+    steps = []
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        postgres = connection.dialect.name == "postgresql"
+        columns = {
+            table: {column["name"]: str(column["type"]).lower() for column in inspector.get_columns(table)}
+            for table in {table for table, _ in ID_COLUMNS}
+        }
+
+        if postgres:
+            for foreign_key in inspector.get_foreign_keys("tasks"):
+                if foreign_key["constrained_columns"] == ["assigned_to"]:
+                    connection.execute(text(f'ALTER TABLE tasks DROP CONSTRAINT "{foreign_key["name"]}"'))
+                    steps.append("dropped tasks.assigned_to -> users.user_email")
+
+        if settings.DB_COMPACT_IDS:
+            if postgres:
+                converted = _compact_postgres_ids(connection, columns)
+            else:
+                converted = _compact_sqlite_ids(connection)
+            if converted:
+                steps.append(f"compacted {', '.join(converted)}")
+
+        if "assignee_id" not in columns["tasks"]:
+            column_type = Task.__table__.c.assignee_id.type.compile(dialect=connection.dialect)
+            connection.execute(text(
+                f"ALTER TABLE tasks ADD COLUMN assignee_id {column_type} REFERENCES users (id)"
+            ))
+            steps.append("added tasks.assignee_id -> users.id")
+        filled = connection.execute(
+            update(Task)
+            .where(Task.assignee_id.is_(None), Task.assigned_to.is_not(None))
+            .values(assignee_id=select(User.id).where(User.user_email == Task.assigned_to).scalar_subquery())
+        ).rowcount
+        if filled:
+            steps.append(f"filled assignee_id of {filled} tasks")
+
+        index: Index = next(index for index in Task.__table__.indexes if index.name == "ix_tasks_assignee_id")
+        if index.name not in {existing["name"] for existing in inspector.get_indexes("tasks")}:
+            index.create(connection)
+            steps.append(f"created {index.name}")
+    return steps
+
+
+def _timed(run, repeat: int = 1) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - started) / repeat
+
+
+def _measure(engine: Engine, task_rows: int, users: int, make_id, by_email: bool) -> Dict[str, float]:
+    from sqlalchemy.orm import Session
+
+    now = datetime.now(timezone.utc)
+    results: Dict[str, float] = {}
+    with Session(engine) as db:
+        user_rows = [
+            {"id": make_id(), "user_email": f"user{i}@example.com", "user_name": f"User {i}", "pwd": "-",
+             "role": "normal"}
+            for i in range(users)
+        ]
+        db.execute(insert(User), user_rows)
+        db.commit()
+        task_ids = [make_id() for _ in range(task_rows)]
+        started = time.perf_counter()
+        for first in range(0, task_rows, 1000):
+            db.execute(insert(Task), [
+                {
+                    "id": task_ids[i], "title": f"Task {i}", "description": "Benchmark task",
+                    "start_date": now, "due_date": now + timedelta(hours=i % 2000),
+                    "priority": "low", "status": "pending",
+                    "created_by": user_rows[i % users]["user_email"],
+                    "assigned_to": user_rows[(i * 7) % users]["user_email"],
+                    "assignee_id": None if by_email else user_rows[(i * 7) % users]["id"],
+                    "version": 1, "change_seq": i, "updated_at": now,
+                }
+                for i in range(first, min(first + 1000, task_rows))
+            ])
+            db.commit()
+        results["insert rows/s"] = task_rows / (time.perf_counter() - started)
+
+        on = Task.assigned_to == User.user_email if by_email else Task.assignee_id == User.id
+        page = select(Task.id, Task.title, User.user_name).join(User, on).order_by(Task.change_seq).limit(1000)
+        one_user = select(Task.id, Task.title).join(User, on).where(User.id == user_rows[users // 2]["id"])
+        queries = {
+            "page join ms": lambda: db.execute(page).all(),
+            "user join ms": lambda: db.execute(one_user).all(),
+            "task by id ms": lambda: db.execute(select(Task).where(Task.id == task_ids[task_rows // 2])).all(),
+        }
+        for name, query in queries.items():
+            query()
+            results[name] = _timed(query, repeat=20) * 1000
+    return results
+
+
+def benchmark(task_rows: int, users: int = 1000) -> bool:
+    """Compare inserts, joins and size on scratch SQLite databases with three key layouts.
+
+    "uuid4": random UUID strings, tasks joined to users by email (the old layout).
+    "uuid7": time-ordered UUID strings, joined by assignee_id.
+    "compact": time-ordered UUIDs stored as 16 bytes (DB_COMPACT_IDS), joined by assignee_id.
+    """
+    import tempfile
+    from sqlalchemy import create_engine
+    from app.models.base import Base
+
+    layouts = {
+        "uuid4": (lambda: str(uuid.uuid4()), True, False),
+        "uuid7": (new_id, False, False),
+        "compact": (new_id, False, True),
+    }
+    reports = {}
+    compact_setting = settings.DB_COMPACT_IDS
+    with tempfile.TemporaryDirectory() as directory:
+        for label, (make_id, by_email, compact) in layouts.items():
+            settings.DB_COMPACT_IDS = compact
+            try:
+                # A new engine, so the id columns pick up the setting
+                path = os.path.join(directory, label + ".db")
+                engine = create_engine(f"sqlite:///{path}")
+                Base.metadata.create_all(bind=engine)
+                reports[label] = _measure(engine, task_rows, users, make_id, by_email)
+                engine.dispose()
+            finally:
+                settings.DB_COMPACT_IDS = compact_setting
+            reports[label]["database MiB"] = os.path.getsize(path) / 2 ** 20
+
+    print(f"{task_rows} tasks over {users} users")
+    print(f"{'':16}" + "".join(f"{label:>12}" for label in layouts))
+    for name in reports["compact"]:
+        print(f"{name:16}" + "".join(f"{reports[label][name]:12.2f}" for label in layouts))
+    before, after = reports["uuid4"], reports["compact"]
+    return (
+        after["insert rows/s"] > before["insert rows/s"]
+        and after["database MiB"] < before["database MiB"]
+    )
+
+
+def main(argv: List[str]) -> int:
+    if argv[:1] == ["migrate"] and len(argv) == 1:
+        from app.db.session import engine
+
+        steps = migrate(engine)
+        print("\n".join(steps) if steps else "Keys already migrated")
+        return 0
+    if argv[:1] == ["benchmark"] and len(argv) <= 2:
+        return 0 if benchmark(int(argv[1]) if len(argv) > 1 else 100000) else 1
+    print("Usage: python -m app.db.keys migrate")
+    print("       python -m app.db.keys benchmark [TASK_ROWS]")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,105 @@
+import threading
+import time
+from typing import Optional
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.config import settings
+
+
+class PoolWaitStats:
+    """Running totals of how long checkouts waited for a pooled connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records the time spent getting each connection (queue wait plus connect)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # Keep the totals across engine.dispose()
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+
+class TimedAsyncQueuePool(TimedQueuePool, AsyncAdaptedQueuePool):
+    """TimedQueuePool for async engines."""
+
+
+def _in_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """create_engine / create_async_engine keyword arguments for the configured pool."""
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if _in_memory_sqlite(url):
+        # In-memory SQLite keeps one connection per thread and has no pool to size
+        return options
+    options.update(
+        poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def pool_status(engine: Optional[Engine]) -> Optional[dict]:
+    """Live statistics for an engine's pool, or None when there is no engine."""
+    if engine is None:
+        return None
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            timeout=pool.timeout(),
+        )
+    if isinstance(pool, TimedQueuePool):
+        status.update(pool.wait_stats.snapshot())
+    return status
@@ -0,0 +1,151 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+from fastapi import Depends, Request
+from fastapi.security.utils import get_authorization_scheme_param
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import settings
+from app.core.security import decode_access_token
+from app.core.tenancy import current_tenant, tenant_key
+from app.db.async_session import get_async_db, to_async_url
+from app.db.pool import engine_options
+from app.db.session import get_db
+
+# Clients remembered by RecentWrites; the oldest are forgotten first
+MAX_TRACKED_CLIENTS = 100000
+UNSAFE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def replica_urls() -> List[str]:
+    return [url.strip() for url in settings.DB_REPLICA_URLS.split(",") if url.strip()]
+
+
+replica_engines = [create_engine(url, **engine_options(url)) for url in replica_urls()]
+replica_sessions = [sessionmaker(bind=engine, autocommit=False, autoflush=False) for engine in replica_engines]
+
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_replica_engines = [
+        create_async_engine(to_async_url(url), **engine_options(to_async_url(url), is_async=True))
+        for url in replica_urls()
+    ]
+    async_replica_sessions = [
+        async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False) for engine in async_replica_engines
+    ]
+else:
+    async_replica_engines = []
+    async_replica_sessions = []
+
+_turns = itertools.count()
+
+
+class RecentWrites:
+    """Thread-safe record of the clients that wrote in the last window_seconds.
+
+    Per worker: a client whose next read lands on another worker may still see replica lag.
+    """
+
+    def __init__(self, window_seconds: float, max_size: int):
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self._expiry: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, client: str) -> None:
+        if self.window_seconds <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._expiry.pop(client, None)
+            self._expiry[client] = now + self.window_seconds
+            # Entries are in expiry order
+            while self._expiry and (len(self._expiry) > self.max_size or next(iter(self._expiry.values())) <= now):
+                self._expiry.popitem(last=False)
+
+    def wrote_recently(self, client: str) -> bool:
+        expires_at = self._expiry.get(client)
+        return expires_at is not None and expires_at > time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expiry.clear()
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+
+recent_writes = RecentWrites(settings.DB_REPLICA_STICKY_SECONDS, MAX_TRACKED_CLIENTS)
+
+
+def client_key(scope: Scope) -> Optional[str]:
+    """The client a request comes from: the user (and tenant) of its valid access token.
+
+    Not the token itself, so a client keeps reading its writes after it refreshes its
+    token or logs in again.
+    """
+    authorization = next((value for name, value in scope["headers"] if name == b"authorization"), None)
+    if authorization is None:
+        return None
+    scheme, token = get_authorization_scheme_param(authorization.decode("latin-1"))
+    payload = decode_access_token(token) if scheme.lower() == "bearer" else None
+    if not payload or "sub" not in payload:
+        return None
+    return tenant_key(current_tenant.get(), str(payload["sub"]))
+
+
+def _use_replica(request: Request, sessions: list) -> bool:
+    if not sessions or settings.TENANCY_MODE == "schema":
+        return False
+    client = client_key(request.scope)
+    return client is None or not recent_writes.wrote_recently(client)
+
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """Session for read-only routes: a replica (round robin), or the request's get_db session.
+
+    The primary serves the read when no replicas are configured, with TENANCY_MODE=schema,
+    and for DB_REPLICA_STICKY_SECONDS after the client's own writes, so clients read what
+    they just wrote despite replica lag.
+    """
+    if not _use_replica(request, replica_sessions):
+        yield db
+        return
+    replica = replica_sessions[next(_turns) % len(replica_sessions)]()
+    try:
+        yield replica
+    finally:
+        replica.close()
+
+
+async def get_async_read_db(request: Request, db=Depends(get_async_db)):
+    """get_read_db for AsyncSession routes."""
+    if not _use_replica(request, async_replica_sessions):
+        yield db
+        return
+    async with async_replica_sessions[next(_turns) % len(async_replica_sessions)]() as replica:
+        yield replica
+
+
+class ReadYourWritesMiddleware:
+    """Records the clients whose writes succeeded, for get_read_db."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        client = client_key(scope) if scope["type"] == "http" and scope["method"] in UNSAFE_METHODS else None
+        if client is None or not (replica_sessions or async_replica_sessions):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_recording(message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                recent_writes.record(client)
+            await send(message)
+
+        await self.app(scope, receive, send_recording)
@@ -1,6 +1,24 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.pool import engine_options
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)  # keeps connections healthy
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
\ No newline at end of file
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+
+def get_db():
+    """Get the database session shared by a request and all of its dependencies.
+
+    With TENANCY_MODE=schema the session works on the tables of the request's tenant.
+    """
+    if settings.TENANCY_MODE == "schema":
+        from app.db.tenancy import registry
+
+        db = registry.session()
+    else:
+        db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,195 @@
+# python -m app.db.task_counters rebuild|verify [--tenant TENANT ...]
+
+import sys
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from app.db.upsert import increment_statement
+from app.models.task import Task
+from app.models.task_counter import TaskCounter
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# Counter key used for the admin view over every task
+ALL_USERS = "*"
+DIMENSIONS = ("status", "priority")
+
+CounterKey = Tuple[str, str, str]
+
+
+def task_audience(created_by: Optional[str], assigned_to: Optional[str]) -> Set[str]:
+    """Every user who can list a task, plus ALL_USERS."""
+    return {ALL_USERS} | {email for email in (created_by, assigned_to) if email}
+
+
+def _task_keys(created_by: Optional[str], assigned_to: Optional[str],
+               status: Optional[str], priority: Optional[str]) -> List[CounterKey]:
+    """Counter rows a task contributes to: one per dimension for every user in its audience."""
+    users = task_audience(created_by, assigned_to)
+    values = {"status": status, "priority": priority}
+    return [
+        (user, dimension, values[dimension])
+        for user in users
+        for dimension in DIMENSIONS
+        if values[dimension] is not None
+    ]
+
+
+def task_snapshot(task: Task) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
+    """The fields of a task that determine its counter rows."""
+    return (task.created_by, task.assigned_to, task.status, task.priority)
+
+
+def _delta_statements(dialect: str, changes):
+    """Upserts applying the net effect of (before, after) snapshot pairs.
+
+    Rows are visited in key order so concurrent writers lock them in the same order.
+    """
+    delta: Counter = Counter()
+    for before, after in changes:
+        if before is not None:
+            delta.subtract(_task_keys(*before))
+        if after is not None:
+            delta.update(_task_keys(*after))
+
+    for (user_email, dimension, value), change in sorted(delta.items()):
+        if change == 0:
+            continue
+        yield increment_statement(
+            dialect, TaskCounter.__table__,
+            {"user_email": user_email, "dimension": dimension, "value": value, "count": change},
+            ["user_email", "dimension", "value"], "count",
+        )
+
+
+def apply_delta(db: Session, before=None, after=None) -> None:
+    """Move a task's contribution from the `before` snapshot to the `after` snapshot.
+
+    Pass only `after` for a new task and only `before` for a deleted one. The changes are
+    written through `db` so they commit or roll back together with the task itself.
+    """
+    apply_deltas(db, [(before, after)])
+
+
+def apply_deltas(db: Session, changes) -> None:
+    """apply_delta for many (before, after) pairs, writing each counter row once."""
+    for stmt in _delta_statements(db.get_bind().dialect.name, changes):
+        db.execute(stmt)
+
+
+async def apply_delta_async(db: "AsyncSession", before=None, after=None) -> None:
+    """apply_delta for an AsyncSession."""
+    await apply_deltas_async(db, [(before, after)])
+
+
+async def apply_deltas_async(db: "AsyncSession", changes) -> None:
+    """apply_deltas for an AsyncSession."""
+    for stmt in _delta_statements(db.get_bind().dialect.name, changes):
+        await db.execute(stmt)
+
+
+def _counters_statement(user_email: str):
+    return select(TaskCounter.dimension, TaskCounter.value, TaskCounter.count).where(
+        TaskCounter.user_email == user_email, TaskCounter.count != 0
+    )
+
+
+def read_counters(db: Session, user_email: str) -> Dict[Tuple[str, str], int]:
+    """Counter values for one user (or ALL_USERS), keyed by (dimension, value)."""
+    rows = db.execute(_counters_statement(user_email))
+    return {(dimension, value): count for dimension, value, count in rows}
+
+
+async def read_counters_async(db: "AsyncSession", user_email: str) -> Dict[Tuple[str, str], int]:
+    """read_counters for an AsyncSession."""
+    rows = await db.execute(_counters_statement(user_email))
+    return {(dimension, value): count for dimension, value, count in rows}
+
+
+def compute_counters(db: Session) -> Dict[CounterKey, int]:
+    """Recompute every counter from the tasks table with GROUP BY queries."""
+    expected: Counter = Counter()
+    for dimension in DIMENSIONS:
+        column = getattr(Task, dimension)
+        for value, count in db.query(column, func.count(Task.id)).group_by(column):
+            if value is not None:
+                expected[(ALL_USERS, dimension, value)] += count
+        for user, value, count in db.query(
+            Task.created_by, column, func.count(Task.id)
+        ).group_by(Task.created_by, column):
+            if user and value is not None:
+                expected[(user, dimension, value)] += count
+        # Tasks assigned to their creator are already counted once above
+        for user, value, count in db.query(
+            Task.assigned_to, column, func.count(Task.id)
+        ).filter(
+            (Task.created_by.is_(None)) | (Task.assigned_to != Task.created_by)
+        ).group_by(Task.assigned_to, column):
+            if user and value is not None:
+                expected[(user, dimension, value)] += count
+    return dict(expected)
+
+
+def rebuild(db: Session) -> int:
+    """Replace the counter table with freshly computed values. Returns the row count."""
+    expected = compute_counters(db)
+    db.query(TaskCounter).delete(synchronize_session=False)
+    if expected:
+        db.execute(
+            insert(TaskCounter),
+            [
+                {"user_email": user, "dimension": dimension, "value": value, "count": count}
+                for (user, dimension, value), count in expected.items()
+            ],
+        )
+    db.commit()
+    return len(expected)
+
+
+def verify(db: Session) -> List[Tuple[CounterKey, int, int]]:
+    """Compare stored counters with recomputed ones. Returns (key, stored, expected) drifts."""
+    expected = compute_counters(db)
+    stored = {
+        (row.user_email, row.dimension, row.value): row.count
+        for row in db.query(TaskCounter)
+    }
+    drift = []
+    for key in sorted(set(expected) | set(stored)):
+        if stored.get(key, 0) != expected.get(key, 0):
+            drift.append((key, stored.get(key, 0), expected.get(key, 0)))
+    return drift
+
+
+def main(argv: List[str]) -> int:
+    from app.core.tenancy import UnknownTenant
+    from app.db.tenancy import command_session, command_tenants
+    from app.models.user import User  # noqa: F401 (Task.assigned_to_user references users)
+
+    try:
+        argv, tenants = command_tenants(argv)
+    except UnknownTenant as e:
+        print(f"Unknown tenant {e}")
+        return 1
+    if len(argv) != 1 or argv[0] not in ("rebuild", "verify"):
+        print("Usage: python -m app.db.task_counters rebuild|verify [--tenant TENANT ...]")
+        return 2
+
+    drifted = 0
+    for tenant in tenants:
+        prefix = f"{tenant}: " if tenant else ""
+        with command_session(tenant) as db:
+            if argv[0] == "rebuild":
+                print(f"{prefix}Rebuilt task counters: {rebuild(db)} rows")
+                continue
+            drift = verify(db)
+        for (user, dimension, value), stored, expected in drift:
+            print(f"{prefix}{user} {dimension}={value}: stored {stored}, expected {expected}")
+        print(f"{prefix}Task counters are consistent" if not drift else f"{prefix}{len(drift)} counters drifted")
+        drifted += len(drift)
+    return 1 if drifted else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,162 @@
+# python -m app.db.task_search install [--tenant TENANT ...]
+# python -m app.db.task_search benchmark [TASK_ROWS]
+
+import re
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+from sqlalchemy import Float, cast, column, func, insert, literal_column, select, table, text
+from sqlalchemy.engine import Connection, Engine
+from app.models.task import TASK_SEARCH_DDL, TASK_SEARCH_VECTOR_SQL, Task
+from app.utils.ids import new_id
+
+# The FTS5 table SQLite keeps in step with tasks (rowid = tasks.rowid)
+_fts = table("task_search", column("rowid"), column("rank"))
+_search_vector = literal_column(TASK_SEARCH_VECTOR_SQL)
+
+
+def search_terms(q: str) -> List[str]:
+    """The words of a search string; punctuation and query operators are dropped."""
+    return re.findall(r"\w+", q.lower())
+
+
+def search_statement(dialect: str, q: str):
+    """(SELECT of (Task, score), score) for the tasks matching every word of q as a prefix.
+
+    Higher scores rank first. Uses the full-text index of the dialect, so the cost depends
+    on the number of matches rather than on the number of tasks. Returns None when q has
+    no words to search for.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return None
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery(literal_column("'english'"), " & ".join(f"{term}:*" for term in terms))
+        # ts_rank_cd is a real; as double precision the score compared by the cursor
+        # keyset is exactly the one written into the cursor
+        score = cast(func.ts_rank_cd(_search_vector, tsquery), Float(53))
+        return select(Task, score.label("score")).where(_search_vector.op("@@")(tsquery)), score
+
+    # bm25 rank: lower is better
+    score = -_fts.c.rank
+    return (
+        select(Task, score.label("score"))
+        .join(_fts, _fts.c.rowid == literal_column("tasks.rowid"))
+        .where(literal_column("task_search").op("MATCH")(" ".join(f'"{term}"*' for term in terms))),
+        score,
+    )
+
+
+def install(connection: Connection) -> None:
+    """Create the search index of an existing database, and (SQLite) fill it from tasks.
+
+    Also rebuilds the SQLite index, e.g. after a VACUUM renumbered the tasks rowids.
+    """
+    for statement in TASK_SEARCH_DDL.get(connection.dialect.name, []):
+        connection.execute(text(statement))
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("DELETE FROM task_search"))
+        connection.execute(text(
+            "INSERT INTO task_search (rowid, title, description) SELECT rowid, title, description FROM tasks"
+        ))
+
+
+WORDS = (
+    "report budget review design launch client meeting invoice backlog roadmap hiring audit "
+    "migration release contract vendor training onboarding security dashboard"
+).split()
+
+
+def benchmark(task_rows: int) -> bool:
+    """Compare the full-text search with the ILIKE filter of list_tasks on growing SQLite databases."""
+    import os
+    import tempfile
+    from sqlalchemy import create_engine, or_
+    from sqlalchemy.orm import Session
+    from app.models.base import Base
+    from app.models.user import User  # noqa: F401 (tasks.assignee_id references users)
+
+    now = datetime.now(timezone.utc)
+    sizes = []
+    size = task_rows
+    while size >= 10000:
+        sizes.insert(0, size)
+        size //= 10
+
+    passed = True
+    print(f"{'tasks':>10}{'ilike ms':>12}{'search ms':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        engine: Engine = create_engine(f"sqlite:///{os.path.join(directory, 'search.db')}")
+        Base.metadata.create_all(bind=engine)
+        loaded = 0
+        with Session(engine) as db:
+            for size in sizes:
+                for first in range(loaded, size, 1000):
+                    db.execute(insert(Task), [
+                        {
+                            "id": new_id(),
+                            "title": f"{WORDS[i % len(WORDS)]} {WORDS[i * 7 % len(WORDS)]} {i}",
+                            "description": " ".join(WORDS[(i + k) * 3 % len(WORDS)] for k in range(12)),
+                            "start_date": now, "due_date": now + timedelta(days=7),
+                            "priority": "low", "status": "pending",
+                            "created_by": "owner@example.com", "assigned_to": "owner@example.com",
+                        }
+                        for i in range(first, min(first + 1000, size))
+                    ])
+                db.commit()
+                loaded = size
+
+                # A rare term: one task in the whole table
+                needle = str(size // 2)
+                stmt, score = search_statement("sqlite", needle)
+                search = stmt.order_by(score.desc(), Task.id.desc()).limit(101)
+                ilike = select(Task).where(
+                    or_(Task.title.ilike(f"%{needle}%"), Task.description.ilike(f"%{needle}%"))
+                ).limit(101)
+                timings = []
+                for query in (ilike, search):
+                    db.execute(query).all()
+                    started = time.perf_counter()
+                    for _ in range(10):
+                        db.execute(query).all()
+                    timings.append((time.perf_counter() - started) / 10 * 1000)
+                passed = passed and timings[1] < 10
+                print(f"{size:>10}{timings[0]:>12.2f}{timings[1]:>12.2f}")
+        engine.dispose()
+    print("OK" if passed else "FAILED: search above 10 ms")
+    return passed
+
+
+def main(argv: List[str]) -> int:
+    if argv[:1] == ["install"]:
+        from app.core.tenancy import UnknownTenant
+        from app.db import tenancy
+        from app.db.session import engine
+
+        try:
+            argv, tenants = tenancy.command_tenants(argv)
+        except UnknownTenant as e:
+            print(f"Unknown tenant {e}")
+            return 1
+        if argv == ["install"]:
+            for tenant in tenants:
+                if tenant is None:
+                    with engine.begin() as connection:
+                        install(connection)
+                    print(f"Search index installed for {engine.dialect.name}")
+                    continue
+                # install runs raw SQL, which needs the tenant's tables as the unqualified names
+                with tenancy.registry.migration_engine(tenant) as tenant_engine, tenant_engine.begin() as connection:
+                    install(connection)
+                print(f"{tenant}: Search index installed for {engine.dialect.name}")
+            return 0
+    if argv[:1] == ["benchmark"] and len(argv) <= 2:
+        return 0 if benchmark(int(argv[1]) if len(argv) > 1 else 1000000) else 1
+    print("Usage: python -m app.db.task_search install [--tenant TENANT ...]")
+    print("       python -m app.db.task_search benchmark [TASK_ROWS]")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,246 @@
+# python -m app.db.task_versions prune [DAYS] [--tenant TENANT ...]
+# python -m app.db.task_versions benchmark [WRITERS] [SECONDS] [DATABASE_URL]
+
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, List, Optional
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.task_counters import ALL_USERS, task_audience
+from app.db.upsert import increment_statement
+from app.models.task_list_version import TaskListVersion
+from app.models.task_tombstone import TaskTombstone
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# task_list_versions row holding the change_seq up to which tombstones were pruned
+PRUNED_SEQ = "#pruned"
+
+
+def _bump_statements(dialect: str, changes):
+    """Upserts bumping the list version of every user a change touches.
+
+    `changes` are (before, after) task_counters.task_snapshot pairs, as given to
+    task_counters.apply_deltas. Users are visited in sorted order so concurrent writers
+    lock the rows in the same order.
+    """
+    users = set()
+    for before, after in changes:
+        for snapshot in (before, after):
+            if snapshot is not None:
+                users |= task_audience(snapshot[0], snapshot[1])
+
+    for user_email in sorted(users):
+        yield increment_statement(
+            dialect, TaskListVersion.__table__, {"user_email": user_email, "version": 1}, ["user_email"], "version"
+        )
+
+
+def bump(db: Session, changes) -> None:
+    """Mark the task lists of everyone who can see the changed tasks as modified.
+
+    Written through `db`, so the new versions commit together with the task changes.
+    """
+    for stmt in _bump_statements(db.get_bind().dialect.name, changes):
+        db.execute(stmt)
+
+
+async def bump_async(db: "AsyncSession", changes) -> None:
+    """bump for an AsyncSession."""
+    for stmt in _bump_statements(db.get_bind().dialect.name, changes):
+        await db.execute(stmt)
+
+
+def list_version_statement(user_email: str):
+    """Current task list version of a user (or task_counters.ALL_USERS); no row means 0."""
+    return select(TaskListVersion.version).where(TaskListVersion.user_email == user_email)
+
+
+def current_seq_statement():
+    """The sync sequence: the ALL_USERS list version, which every task write bumps.
+
+    Writers hold its row lock until they commit, so sequence numbers become visible in
+    order and a reader that has seen N has seen every change numbered N or lower. The
+    price is that task writes commit one at a time: throughput is capped at about one
+    write per time a transaction holds the lock (see benchmark). A database sequence
+    would not serialise writers, but its numbers commit out of order, so readers would
+    need a separate visibility horizon to avoid skipping changes.
+    """
+    return list_version_statement(ALL_USERS)
+
+
+def _tombstone_statements(task_ids: List[str], changes, seq: int):
+    """Tombstones for users who lose a task, and removal of tombstones for users who regain it."""
+    now = datetime.now(timezone.utc)
+    for task_id, (before, after) in zip(task_ids, changes):
+        if before is None:
+            continue
+        had = task_audience(before[0], before[1])
+        has = task_audience(after[0], after[1]) if after is not None else set()
+        if had == has:
+            continue
+        for user_email in sorted(had ^ has):
+            yield delete(TaskTombstone).where(
+                TaskTombstone.task_id == task_id, TaskTombstone.user_email == user_email
+            )
+            if user_email not in has:
+                yield insert(TaskTombstone).values(
+                    task_id=task_id, user_email=user_email, change_seq=seq, deleted_at=now
+                )
+
+
+def record(db: Session, task_ids: List[str], changes) -> int:
+    """Bump the list versions for task changes and write their tombstones.
+
+    `task_ids` lines up with `changes`. Returns the sync sequence number of this
+    transaction, to be stored as the change_seq of every task it writes.
+    """
+    bump(db, changes)
+    seq = db.execute(current_seq_statement()).scalar_one()
+    for stmt in _tombstone_statements(task_ids, changes, seq):
+        db.execute(stmt)
+    return seq
+
+
+async def record_async(db: "AsyncSession", task_ids: List[str], changes) -> int:
+    """record for an AsyncSession."""
+    await bump_async(db, changes)
+    seq = (await db.execute(current_seq_statement())).scalar_one()
+    for stmt in _tombstone_statements(task_ids, changes, seq):
+        await db.execute(stmt)
+    return seq
+
+
+def pruned_seq_statement():
+    """The change_seq up to which tombstones were pruned (see prune_tombstones); no row means 0."""
+    return list_version_statement(PRUNED_SEQ)
+
+
+def sync_position_pruned(pruned_seq: int, tomb_seq: int, tomb_id: str) -> bool:
+    """Whether tombstones after a sync token's (change_seq, task_id) position were pruned.
+
+    Every tombstone up to pruned_seq is gone. A position at pruned_seq itself is only safe
+    before its first tombstone, as in the token of a full listing.
+    """
+    return tomb_seq < pruned_seq or (tomb_seq == pruned_seq and tomb_id != "")
+
+
+def prune_tombstones(db: Session, retention_days: Optional[int] = None) -> int:
+    """Delete tombstones older than the retention period. Returns how many were deleted.
+
+    Tombstones go by change_seq: every one up to the newest expired one is deleted, and
+    that change_seq is recorded so /tasks/changes refuses sync tokens from before it.
+    """
+    if retention_days is None:
+        retention_days = settings.TASK_TOMBSTONE_RETENTION_DAYS
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    horizon = db.execute(
+        select(func.max(TaskTombstone.change_seq)).where(TaskTombstone.deleted_at < cutoff)
+    ).scalar()
+    if horizon is None:
+        return 0
+    deleted = db.execute(delete(TaskTombstone).where(TaskTombstone.change_seq <= horizon)).rowcount
+    db.merge(TaskListVersion(user_email=PRUNED_SEQ, version=horizon))
+    db.commit()
+    return deleted
+
+
+def benchmark(writers: int = 8, seconds: float = 5.0, url: Optional[str] = None, hold_ms: float = 1.0) -> bool:
+    """Measure task-write transactions/s with and without the shared sequence row.
+
+    Each writer repeatedly bumps its own list version, then (in the "shared" run) the
+    row every write bumps, and holds its locks for hold_ms before committing, standing
+    in for the rest of a task write. Runs on a scratch SQLite database unless `url`
+    names a database to use; only task_list_versions rows keyed "#benchmark..." are
+    written there. Returns False if any transaction failed.
+    """
+    import os
+    import tempfile
+    from sqlalchemy import create_engine
+
+    def run(engine, shared: bool) -> float:
+        dialect = engine.dialect.name
+        table = TaskListVersion.__table__
+        deadline = time.perf_counter() + seconds
+        counts = [0] * writers
+        errors = []
+
+        def write(writer: int) -> None:
+            try:
+                keys = [f"#benchmark-{writer}"] + (["#benchmark"] if shared else [])
+                while time.perf_counter() < deadline:
+                    with engine.begin() as connection:
+                        for key in keys:
+                            connection.execute(increment_statement(
+                                dialect, table, {"user_email": key, "version": 1}, ["user_email"], "version"
+                            ))
+                        time.sleep(hold_ms / 1000)
+                    counts[writer] += 1
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(writer,)) for writer in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for error in errors:
+            print(f"Writer failed: {error}")
+        return sum(counts) / seconds if not errors else 0.0
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(
+            url or f"sqlite:///{os.path.join(directory, 'versions.db')}", pool_size=writers, max_overflow=0
+        )
+        TaskListVersion.__table__.create(engine, checkfirst=True)
+        try:
+            reports = {label: run(engine, label == "shared") for label in ("per-user", "shared")}
+            with engine.begin() as connection:
+                connection.execute(delete(TaskListVersion).where(TaskListVersion.user_email.like("#benchmark%")))
+        finally:
+            engine.dispose()
+
+    print(f"{writers} writers on {engine.dialect.name}, locks held {hold_ms:g} ms per write")
+    for label, rate in reports.items():
+        print(f"{label:10}{rate:12.0f} writes/s")
+    # Writers through the shared row commit one at a time
+    print(f"shared cap: under {1000 / hold_ms:.0f} writes/s (one write per {hold_ms:g} ms lock hold)")
+    return all(reports.values())
+
+
+def main(argv: List[str]) -> int:
+    from app.core.tenancy import UnknownTenant
+    from app.db.tenancy import command_session, command_tenants
+    from app.models.user import User  # noqa: F401 (tasks.assignee_id references users)
+
+    if argv[:1] == ["benchmark"] and len(argv) <= 4:
+        return 0 if benchmark(
+            int(argv[1]) if len(argv) > 1 else 8, float(argv[2]) if len(argv) > 2 else 5.0,
+            argv[3] if len(argv) > 3 else None,
+        ) else 1
+    try:
+        argv, tenants = command_tenants(argv)
+    except UnknownTenant as e:
+        print(f"Unknown tenant {e}")
+        return 1
+    if len(argv) not in (1, 2) or argv[0] != "prune":
+        print("Usage: python -m app.db.task_versions prune [DAYS] [--tenant TENANT ...]")
+        print("       python -m app.db.task_versions benchmark [WRITERS] [SECONDS] [DATABASE_URL]")
+        return 2
+
+    # One tenant at a time (TENANCY_MODE=schema: every tenant unless --tenant names some)
+    for tenant in tenants:
+        with command_session(tenant) as db:
+            deleted = prune_tombstones(db, int(argv[1]) if len(argv) == 2 else None)
+            seq = db.execute(pruned_seq_statement()).scalar() or 0
+        prefix = f"{tenant}: " if tenant else ""
+        print(f"{prefix}Pruned {deleted} task tombstones; sync tokens before change {seq} need a full sync")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,244 @@
+# python -m app.db.tenancy list
+# python -m app.db.tenancy provision TENANT
+# python -m app.db.tenancy migrate [TENANT ...]
+
+import glob
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from app.core.config import settings
+from app.core.tenancy import (
+    SCHEMA_PREFIX, TENANT_NAME, TenantRequired, UnknownTenant, current_tenant, schema_name,
+)
+from app.db import enums, indexes, keys
+from app.db.async_session import async_engine as default_async_engine, to_async_url
+from app.db.init_db import create_tables
+from app.db.pool import engine_options
+from app.db.session import SessionLocal, engine as default_engine
+
+
+def _sqlite_tenant_url(url: str, schema: str) -> str:
+    """SQLite has no schemas: each tenant gets its own file next to the main database."""
+    parsed = make_url(url)
+    if parsed.database in (None, "", ":memory:"):
+        raise ValueError("TENANCY_MODE=schema needs a file-based SQLite database")
+    stem, extension = os.path.splitext(parsed.database)
+    return parsed.set(database=f"{stem}_{schema}{extension or '.db'}").render_as_string(hide_password=False)
+
+
+class TenantRegistry:
+    """Engines of the provisioned tenants, created on first use and kept for the process.
+
+    On Postgres every tenant is a schema and its engine is the shared engine with a
+    schema_translate_map, so all tenants share one connection pool while each statement
+    names the tenant's tables. SQLite has no schemas, so each tenant is its own database
+    file with its own engine.
+    """
+
+    def __init__(self, engine: Engine, async_engine=None):
+        self.engine = engine
+        self.async_engine = async_engine
+        self.url = engine.url.render_as_string(hide_password=False)
+        self.sqlite = engine.dialect.name == "sqlite"
+        self._engines: Dict[str, Engine] = {}
+        self._async_engines: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def list(self) -> List[str]:
+        """Names of the provisioned tenants."""
+        if self.sqlite:
+            pattern = _sqlite_tenant_url(self.url, SCHEMA_PREFIX + "*")
+            files = glob.glob(make_url(pattern).database)
+            prefix, suffix = make_url(pattern).database.split("*")
+            names = [path[len(prefix):len(path) - len(suffix)] for path in files]
+        else:
+            with self.engine.connect() as connection:
+                names = [
+                    schema[len(SCHEMA_PREFIX):] for schema in connection.execute(text(
+                        "SELECT schema_name FROM information_schema.schemata WHERE schema_name LIKE :pattern"
+                    ), {"pattern": SCHEMA_PREFIX.replace("_", "\\_") + "%"}).scalars()
+                ]
+        return sorted(name for name in names if TENANT_NAME.match(name))
+
+    def _schema(self, tenant: Optional[str]) -> str:
+        if tenant is None:
+            raise TenantRequired()
+        schema = schema_name(tenant)
+        if tenant not in self._engines and tenant not in self.list():
+            raise UnknownTenant(tenant)
+        return schema
+
+    def tenant_engine(self, tenant: Optional[str]) -> Engine:
+        """The engine serving a provisioned tenant; raises UnknownTenant for anything else."""
+        engine = self._engines.get(tenant)
+        if engine is not None:
+            return engine
+        schema = self._schema(tenant)
+        with self._lock:
+            if tenant not in self._engines:
+                if self.sqlite:
+                    url = _sqlite_tenant_url(self.url, schema)
+                    self._engines[tenant] = create_engine(url, **engine_options(url))
+                else:
+                    self._engines[tenant] = self.engine.execution_options(schema_translate_map={None: schema})
+            return self._engines[tenant]
+
+    def tenant_async_engine(self, tenant: Optional[str]):
+        """The async engine serving a provisioned tenant (DB_ASYNC=true)."""
+        engine = self._async_engines.get(tenant)
+        if engine is not None:
+            return engine
+        self.tenant_engine(tenant)
+        with self._lock:
+            if tenant not in self._async_engines:
+                if self.sqlite:
+                    from sqlalchemy.ext.asyncio import create_async_engine
+
+                    url = to_async_url(_sqlite_tenant_url(self.url, schema_name(tenant)))
+                    self._async_engines[tenant] = create_async_engine(url, **engine_options(url, is_async=True))
+                else:
+                    self._async_engines[tenant] = self.async_engine.execution_options(
+                        schema_translate_map={None: schema_name(tenant)}
+                    )
+            return self._async_engines[tenant]
+
+    def session(self) -> Session:
+        """A session on the engine of the current request's tenant."""
+        return Session(bind=self.tenant_engine(current_tenant.get()), autocommit=False, autoflush=False)
+
+    def async_session(self):
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        return AsyncSession(
+            bind=self.tenant_async_engine(current_tenant.get()), autoflush=False, expire_on_commit=False
+        )
+
+    @contextmanager
+    def migration_engine(self, tenant: str) -> Iterator[Engine]:
+        """An engine whose unqualified table names are the tenant's, for DDL and raw SQL.
+
+        The request engines rely on schema_translate_map, which only applies to SQLAlchemy
+        tables; migrations also run text() statements, so on Postgres they get a separate
+        connection with the tenant schema as its search_path.
+        """
+        schema = schema_name(tenant)
+        if self.sqlite:
+            url = _sqlite_tenant_url(self.url, schema)
+            engine = create_engine(url, poolclass=NullPool)
+        else:
+            engine = create_engine(self.url, poolclass=NullPool, connect_args={"options": f"-csearch_path={schema}"})
+        try:
+            yield engine
+        finally:
+            engine.dispose()
+
+    def provision(self, tenant: str) -> None:
+        """Create a tenant's schema and every table in it. Safe to run again."""
+        schema = schema_name(tenant)
+        if not self.sqlite:
+            with self.engine.begin() as connection:
+                connection.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+        with self.migration_engine(tenant) as engine:
+            create_tables(engine)
+
+    def migrate(self, tenants: Optional[List[str]] = None,
+                progress: Optional[Callable[[str, str, object], None]] = None) -> Dict[str, List[Tuple[str, object]]]:
+        """Run every schema migration in each tenant (default: all of them), one tenant at a time.
+
+        Returns the result of each migration by tenant.
+        """
+        results = {}
+        for tenant in tenants if tenants is not None else self.list():
+            results[tenant] = []
+            with self.migration_engine(tenant) as engine:
+                for name, migration in MIGRATIONS:
+                    result = migration(engine)
+                    results[tenant].append((name, result))
+                    if progress is not None:
+                        progress(tenant, name, result)
+        return results
+
+
+# In the order a database created before each change needs them (indexes last: the
+# models' indexes cover columns the earlier steps add)
+MIGRATIONS: List[Tuple[str, Callable[[Engine], object]]] = [
+    ("tables", create_tables),
+    ("keys", keys.migrate),
+    ("enums", enums.migrate),
+    ("indexes", indexes.migrate),
+]
+
+
+registry = TenantRegistry(default_engine, default_async_engine)
+
+
+def command_tenants(argv: List[str]) -> Tuple[List[str], List[Optional[str]]]:
+    """Split the `--tenant TENANT` options off the arguments of a maintenance command.
+
+    Returns the other arguments and the tenants to run on: the ones named, else every
+    provisioned tenant with TENANCY_MODE=schema, else [None] for the shared tables.
+    Raises UnknownTenant for a name that is not a provisioned tenant.
+    """
+    rest, named = [], []
+    args = iter(argv)
+    for arg in args:
+        if arg == "--tenant":
+            named.append(next(args, ""))
+        else:
+            rest.append(arg)
+    if settings.TENANCY_MODE != "schema":
+        if named:
+            raise UnknownTenant(named[0])
+        return rest, [None]
+    provisioned = registry.list()
+    for tenant in named:
+        if tenant not in provisioned:
+            raise UnknownTenant(tenant)
+    return rest, named or provisioned
+
+
+@contextmanager
+def command_session(tenant: Optional[str]) -> Iterator[Session]:
+    """A session on a tenant's tables (the shared tables for None), with current_tenant set."""
+    token = current_tenant.set(tenant)
+    try:
+        db = registry.session() if tenant is not None else SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+    finally:
+        current_tenant.reset(token)
+
+
+def main(argv: List[str]) -> int:
+    if argv == ["list"]:
+        print("\n".join(registry.list()) or "No tenants")
+        return 0
+    if argv[:1] == ["provision"] and len(argv) == 2:
+        try:
+            registry.provision(argv[1])
+        except UnknownTenant:
+            print(f"Invalid tenant name {argv[1]!r}: use lowercase letters, digits and _")
+            return 1
+        print(f"Provisioned {argv[1]} in {schema_name(argv[1])}")
+        return 0
+    if argv[:1] == ["migrate"]:
+        registry.migrate(
+            argv[1:] or None, progress=lambda tenant, name, result: print(f"{tenant}: {name}: {result}")
+        )
+        return 0
+    print("Usage: python -m app.db.tenancy list")
+    print("       python -m app.db.tenancy provision TENANT")
+    print("       python -m app.db.tenancy migrate [TENANT ...]")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
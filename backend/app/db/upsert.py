@@ -0,0 +1,19 @@
+from typing import Dict, List
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql, sqlite
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def increment_statement(dialect: str, table: Table, values: Dict, key: List[str], column: str):
+    """INSERT of `values`, or when a row with the same `key` exists, adding values[column] to it.
+
+    One atomic statement, so concurrent writers creating the same row can't both insert it.
+    """
+    if dialect not in _INSERTS:
+        raise ValueError(f"Upserts are not supported on {dialect}")
+    stmt = _INSERTS[dialect](table).values(**values)
+    return stmt.on_conflict_do_update(
+        index_elements=key, set_={column: table.c[column] + stmt.excluded[column]}
+    )
@@ -1,27 +1,94 @@
 # uvicorn app.main:app --reload
 
-from fastapi import FastAPI
+from typing import Optional
+from fastapi import APIRouter, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import tasks, users, auth
+from fastapi.responses import JSONResponse
+from app.api.routes import tasks, users, auth, metrics
+from app.core.config import settings
+from app.core.security import PasswordHashingBusy
+from app.core.tenancy import TenantMiddleware, TenantRequired, UnknownTenant
+from app.db.replicas import ReadYourWritesMiddleware
 
-app = FastAPI(title="taskz")
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],  # Frontend URLs
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["*"],
-    expose_headers=["*"],
-)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    """Shed load when too many password hashes are already running or queued."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
 
-app.include_router(auth.router, prefix="/auth", tags=["Auth"])
-app.include_router(users.router, prefix="/users", tags=["Users"])
-app.include_router(tasks.router, prefix="/tasks", tags=["Tasks"])
+
+async def tenant_required_handler(request: Request, exc: TenantRequired):
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": f"Missing {settings.TENANT_HEADER} header"},
+    )
+
+
+async def unknown_tenant_handler(request: Request, exc: UnknownTenant):
+    return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"detail": "Unknown tenant"})
 
 
-@app.get("/")
 def read_root():
     """Root endpoint."""
-    return {"message": "Taskz API", "version": "1.0.0"}
\ No newline at end of file
+    return {"message": "Taskz API", "version": "1.0.0"}
+
+
+def with_async_routes(sync_router: APIRouter, async_router: APIRouter) -> APIRouter:
+    """Router serving the async version of every route that has one.
+
+    Routes keep the order of the sync router, so static paths such as /tasks/stats
+    are still matched before /tasks/{task_id}. Routes without an async version stay sync.
+    """
+    overrides = {(route.path, frozenset(route.methods)): route for route in async_router.routes}
+    router = APIRouter()
+    router.routes = [
+        overrides.get((route.path, frozenset(route.methods)), route)
+        for route in sync_router.routes
+    ]
+    return router
+
+
+def create_app(use_async_db: Optional[bool] = None) -> FastAPI:
+    """Build the API, with AsyncSession-backed routes when use_async_db (default: DB_ASYNC) is set."""
+    if use_async_db is None:
+        use_async_db = settings.DB_ASYNC
+    app = FastAPI(title="taskz")
+
+    # Add CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],  # Frontend URLs
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+        allow_headers=["*"],
+        expose_headers=["*"],
+    )
+
+    app.add_middleware(ReadYourWritesMiddleware)
+    app.add_exception_handler(PasswordHashingBusy, password_hashing_busy_handler)
+    if settings.TENANCY_MODE == "schema":
+        app.add_middleware(TenantMiddleware, header=settings.TENANT_HEADER)
+        app.add_exception_handler(TenantRequired, tenant_required_handler)
+        app.add_exception_handler(UnknownTenant, unknown_tenant_handler)
+
+    auth_router, users_router, tasks_router = auth.router, users.router, tasks.router
+    if use_async_db:
+        from app.api.routes import async_auth, async_tasks, async_users
+
+        auth_router = with_async_routes(auth.router, async_auth.router)
+        users_router = with_async_routes(users.router, async_users.router)
+        tasks_router = with_async_routes(tasks.router, async_tasks.router)
+
+    app.include_router(auth_router, prefix="/auth", tags=["Auth"])
+    app.include_router(users_router, prefix="/users", tags=["Users"])
+    app.include_router(tasks_router, prefix="/tasks", tags=["Tasks"])
+    app.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
+
+    app.get("/")(read_root)
+    return app
+
+
+app = create_app()
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from app.models.base import Base
+from app.models.types import EntityId
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(EntityId, primary_key=True)
+    user_id = Column(EntityId, ForeignKey("users.id"), index=True, nullable=False)
+    # Keyed hash of the token; the token itself is never stored
+    token_hash = Column(String, unique=True, index=True, nullable=False)
+    # All tokens produced by rotating one login share a family, so reuse can revoke them together
+    family_id = Column(String, index=True, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    replaced_by = Column(String, nullable=True)
@@ -1,19 +1,75 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import DDL, Column, Index, Integer, String, Text, DateTime, ForeignKey, event
 from sqlalchemy.orm import relationship
 from app.models.base import Base
+from app.models.types import CodedEnum, EntityId
+from app.schemas.task_schema import TASK_PRIORITIES, TASK_STATUSES
 
 class Task(Base):
     __tablename__ = "tasks"
 
-    id = Column(String, primary_key=True, index=True)
-    title = Column(String, index=True)
-    description = Column(Text, index=True)
-    start_date = Column(DateTime(timezone=True), index=True)
-    due_date = Column(DateTime(timezone=True), index=True)
-    priority = Column(String, index=True)
-    status = Column(String, index=True)
-    created_by = Column(String, index=True)
-    assigned_to = Column(String, ForeignKey("users.user_email"))
+    id = Column(EntityId, primary_key=True)
+    title = Column(String)
+    description = Column(Text)
+    start_date = Column(DateTime(timezone=True))
+    due_date = Column(DateTime(timezone=True))
+    priority = Column(CodedEnum(TASK_PRIORITIES))
+    status = Column(CodedEnum(TASK_STATUSES))
+    created_by = Column(String)
+    # Lowercased email of the assignee, which the access checks compare against
+    assigned_to = Column(String)
+    # The same user by id: the foreign key, and what joins to users use
+    assignee_id = Column(EntityId, ForeignKey("users.id"))
+    # Bumped by every update; used as the task's ETag
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Sync sequence of the last write (see app.db.task_versions) and when it happened
+    change_seq = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True))
     
     assigned_to_user = relationship("User", back_populates="tasks")
 
+    # Indexes follow the queries the routes run (see app.db.indexes for the migration).
+    # A normal user's tasks are `created_by = ? OR assigned_to = ?`: each side has its own
+    # index, in due date order for list_tasks and the overdue count, and in change_seq
+    # order for /tasks/changes. Admins read every task in the same two orders, and in the
+    # other list_tasks sorts (title, start_date), where a user's own tasks are few enough to sort.
+    __table_args__ = (
+        Index("ix_tasks_created_by_due_date", "created_by", "due_date"),
+        Index("ix_tasks_assigned_to_due_date", "assigned_to", "due_date"),
+        Index("ix_tasks_due_date_id", "due_date", "id"),
+        Index("ix_tasks_title_id", "title", "id"),
+        Index("ix_tasks_start_date_id", "start_date", "id"),
+        # The admin overdue count only looks at open tasks, which are few once tasks pile up
+        Index(
+            "ix_tasks_open_due_date", "due_date",
+            postgresql_where=status != "completed", sqlite_where=status != "completed",
+        ),
+        Index("ix_tasks_created_by_change_seq", "created_by", "change_seq"),
+        Index("ix_tasks_assigned_to_change_seq", "assigned_to", "change_seq"),
+        Index("ix_tasks_change_seq_id", "change_seq", "id"),
+        # Joins from users, and the foreign key check when a user is deleted
+        Index("ix_tasks_assignee_id", "assignee_id"),
+    )
+
+
+# Full-text search over title and description (queried by app.db.task_search). Postgres
+# keeps an expression GIN index; SQLite mirrors the columns into an FTS5 table, kept in
+# sync by triggers so every write path (ORM, bulk statements, imports) updates it.
+TASK_SEARCH_VECTOR_SQL = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))"
+TASK_SEARCH_DDL = {
+    "postgresql": [
+        f"CREATE INDEX IF NOT EXISTS ix_tasks_search ON tasks USING gin ({TASK_SEARCH_VECTOR_SQL})",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS task_search USING fts5("
+        "title, description, tokenize='porter unicode61', detail=column)",
+        "CREATE TRIGGER IF NOT EXISTS task_search_insert AFTER INSERT ON tasks BEGIN "
+        "INSERT INTO task_search (rowid, title, description) VALUES (new.rowid, new.title, new.description); END",
+        "CREATE TRIGGER IF NOT EXISTS task_search_update AFTER UPDATE OF title, description ON tasks BEGIN "
+        "UPDATE task_search SET title = new.title, description = new.description WHERE rowid = old.rowid; END",
+        "CREATE TRIGGER IF NOT EXISTS task_search_delete AFTER DELETE ON tasks BEGIN "
+        "DELETE FROM task_search WHERE rowid = old.rowid; END",
+    ],
+}
+for _dialect, _statements in TASK_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Task.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
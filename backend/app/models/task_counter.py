@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String
+from app.models.base import Base
+
+
+class TaskCounter(Base):
+    __tablename__ = "task_counters"
+
+    # Lowercased email of the user the task is visible to, or "*" for all tasks
+    user_email = Column(String, primary_key=True)
+    dimension = Column(String, primary_key=True)  # "status" or "priority"
+    value = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String
+from app.models.base import Base
+
+
+class TaskListVersion(Base):
+    __tablename__ = "task_list_versions"
+
+    # Lowercased email of the user whose task list changed, or "*" for the admin view
+    user_email = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from app.models.base import Base
+from app.models.types import EntityId
+
+
+class TaskTombstone(Base):
+    __tablename__ = "task_tombstones"
+
+    # A task that was deleted, or that the user can no longer see
+    task_id = Column(EntityId, primary_key=True)
+    # Lowercased email of the user who lost the task, or "*" for the admin view
+    user_email = Column(String, primary_key=True)
+    change_seq = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True))
+
+    # /tasks/changes reads one user's tombstones in change_seq order
+    __table_args__ = (
+        Index("ix_task_tombstones_user_email_change_seq", "user_email", "change_seq", "task_id"),
+    )
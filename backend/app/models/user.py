@@ -1,15 +1,20 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 from app.models.base import Base
+from app.models.types import CodedEnum, EntityId
+from app.schemas.user_schema import USER_ROLES
 
 
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(String, primary_key=True, index=True)    
+    id = Column(EntityId, primary_key=True)
+    # Users are only looked up by id and by email
     user_email = Column(String, unique=True, index=True)
-    user_name = Column(String, index=True)
-    pwd = Column(String, index=True)
-    role = Column(String, index=True, default="normal")  # "admin" or "normal"
+    user_name = Column(String)
+    pwd = Column(String)
+    role = Column(CodedEnum(USER_ROLES), default="normal")
+    # Bumped by every update; used as the user's ETag
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     tasks = relationship("Task", back_populates="assigned_to_user")
 
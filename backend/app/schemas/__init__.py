@@ -1,2 +1,16 @@
 from .user_schema import UserBase, UserCreate, UserRead
-from .task_schema import TaskBase, TaskCreate, TaskRead
\ No newline at end of file
+from .task_schema import (
+    TaskBase,
+    TaskBulkCreate,
+    TaskBulkDelete,
+    TaskBulkItemResult,
+    TaskBulkResult,
+    TaskBulkUpdate,
+    TaskBulkUpdateItem,
+    TaskChanges,
+    TaskCreate,
+    TaskRead,
+    TaskStats,
+)
+from .metrics_schema import DatabasePoolMetrics, PoolStatus
+from .import_schema import ImportReport, ImportRowError
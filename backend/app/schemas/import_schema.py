@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class ImportRowError(BaseModel):
+    """Schema for a row of an import file that was not imported."""
+    line: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    """Schema for the progress and outcome of a bulk import."""
+    kind: str
+    processed: int = 0
+    imported: int = 0
+    failed: int = 0
+    # Only the first MAX_REPORTED_ERRORS row errors are listed; `failed` counts all of them
+    errors: List[ImportRowError] = []
+    seconds: float = 0.0
+    rows_per_second: float = 0.0
@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class PoolStatus(BaseModel):
+    """Schema for live connection pool statistics."""
+    pool_class: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    max_overflow: Optional[int] = None
+    timeout: Optional[float] = None
+    # Time spent getting a connection, including waits for a free one
+    checkouts: Optional[int] = None
+    timeouts: Optional[int] = None
+    wait_seconds_total: Optional[float] = None
+    wait_seconds_max: Optional[float] = None
+
+
+class DatabasePoolMetrics(BaseModel):
+    """Schema for the sync and (when DB_ASYNC is on) async engine pools."""
+    database: PoolStatus
+    async_database: Optional[PoolStatus] = None
+    # Sync pools of the read replicas, in DB_REPLICA_URLS order
+    replicas: List[PoolStatus] = []
@@ -1,7 +1,14 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Literal, Optional
 from datetime import datetime
 
+# Allowed values. The database stores each as its position here (see
+# app.models.types.CodedEnum), so only ever append to these tuples.
+TASK_STATUSES = ("pending", "in_progress", "completed")
+TASK_PRIORITIES = ("low", "medium", "high")
+TaskStatus = Literal[TASK_STATUSES]
+TaskPriority = Literal[TASK_PRIORITIES]
+
 
 class TaskBase(BaseModel):
     """Base task schema."""
@@ -9,8 +16,8 @@ class TaskBase(BaseModel):
     description: Optional[str] = None
     start_date: datetime
     due_date: datetime
-    priority: str
-    status: str
+    priority: TaskPriority
+    status: TaskStatus
 
 
 class TaskCreate(TaskBase):
@@ -25,8 +32,8 @@ class TaskUpdate(BaseModel):
     description: Optional[str] = None
     start_date: Optional[datetime] = None
     due_date: Optional[datetime] = None
-    priority: Optional[str] = None
-    status: Optional[str] = None
+    priority: Optional[TaskPriority] = None
+    status: Optional[TaskStatus] = None
     assigned_to: Optional[str] = None
 
 
@@ -35,5 +42,71 @@ class TaskRead(TaskBase):
     id: str
     created_by: str
     assigned_to: str
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TaskStats(BaseModel):
+    """Schema for aggregated task statistics."""
+    total: int
+    pending: int
+    in_progress: int
+    completed: int
+    high_priority: int
+    overdue: int
+
+
+# Most tasks accepted by one bulk request
+MAX_BULK_TASKS = 1000
+
+
+class TaskBulkUpdateItem(TaskUpdate):
+    """Schema for one task in a bulk update."""
+    id: str
+
+
+class TaskBulkCreate(BaseModel):
+    """Schema for creating many tasks. atomic=False writes the items that pass their checks."""
+    tasks: List[TaskCreate] = Field(min_length=1, max_length=MAX_BULK_TASKS)
+    atomic: bool = True
+
+
+class TaskBulkUpdate(BaseModel):
+    """Schema for updating many tasks."""
+    tasks: List[TaskBulkUpdateItem] = Field(min_length=1, max_length=MAX_BULK_TASKS)
+    atomic: bool = True
+
+
+class TaskBulkDelete(BaseModel):
+    """Schema for deleting many tasks."""
+    ids: List[str] = Field(min_length=1, max_length=MAX_BULK_TASKS)
+    atomic: bool = True
+
+
+class TaskBulkItemResult(BaseModel):
+    """Schema for the outcome of one item of a bulk request, in request order."""
+    index: int
+    id: Optional[str] = None
+    status_code: int
+    detail: Optional[str] = None
+    task: Optional[TaskRead] = None
+
+
+class TaskBulkResult(BaseModel):
+    """Schema for the outcome of a bulk request."""
+    succeeded: int
+    failed: int
+    results: List[TaskBulkItemResult]
+
+
+class TaskChanges(BaseModel):
+    """Schema for one page of task changes since a sync token.
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    `deleted` lists the ids of tasks that were deleted or are no longer visible to the
+    user. Pass `next_token` as `since` on the next call; has_more means call again now.
+    """
+    tasks: List[TaskRead]
+    deleted: List[str]
+    next_token: str
+    has_more: bool
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class RefreshRequest(BaseModel):
+    """Schema for exchanging or revoking a refresh token."""
+    refresh_token: str
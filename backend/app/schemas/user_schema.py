@@ -1,12 +1,16 @@
 from pydantic import BaseModel, EmailStr, ConfigDict
-from typing import Optional
+from typing import List, Literal, Optional
+
+# Allowed roles, stored as their position here: only ever append
+USER_ROLES = ("normal", "admin")
+UserRole = Literal[USER_ROLES]
 
 
 class UserBase(BaseModel):
     """Base user schema."""
     user_email: EmailStr
     user_name: str
-    role: Optional[str] = "normal"  # "admin" or "normal"
+    role: Optional[UserRole] = "normal"
 
 
 class UserCreate(UserBase):
@@ -24,6 +28,22 @@ class UserUpdate(BaseModel):
 class UserRead(UserBase):
     """Schema for reading a user."""
     id: str
-    role: str
+    role: UserRole
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class UserBatchItemResult(BaseModel):
+    """Schema for the outcome of one id of a batch read, in request order."""
+    index: int
+    id: str
+    status_code: int
+    detail: Optional[str] = None
+    user: Optional[UserRead] = None
+
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+class UserBatchResult(BaseModel):
+    """Schema for the outcome of a batch read."""
+    succeeded: int
+    failed: int
+    results: List[UserBatchItemResult]
\ No newline at end of file
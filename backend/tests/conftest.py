@@ -4,7 +4,7 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 from uuid import uuid4
 
 # Set environment variables before importing app modules
@@ -12,60 +12,81 @@ os.environ["DATABASE_URL"] = "sqlite:///:memory:"
 os.environ["JWT_SECRET"] = "test-secret-key-for-testing-only"
 os.environ.setdefault("PASSLIB_BCRYPT_BACKEND", "bcrypt")
 
-# Use bcrypt directly in tests to avoid passlib initialization issues
+# Use bcrypt directly in tests to avoid passlib initialization issues.
+# Minimum cost factor: the tests check behaviour, not hash strength.
 import bcrypt
 def hash_password_for_test(password: str) -> str:
     """Hash password using bcrypt directly for tests."""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=4)).decode('utf-8')
 
-from app.main import app
-from app.db.session import SessionLocal
+from app.main import app, create_app
+from app.db.async_session import get_async_db, to_async_url
+from app.db.session import get_db
 from app.models.base import Base
 from app.models.user import User
 from app.models.task import Task
 
+# The same routes served through AsyncSession (DB_ASYNC=true)
+async_app = create_app(use_async_db=True)
 
-# Create in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture(scope="function")
+def db_engine(tmp_path):
+    """Engine on a fresh SQLite file, so sync and async connections see the same data."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'taskz-test.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
 
 
 @pytest.fixture(scope="function")
-def db_session():
+def db_session(db_engine):
     """Create a fresh database session for each test."""
-    Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
+    db = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)()
     try:
         yield db
     finally:
         db.close()
-        Base.metadata.drop_all(bind=engine)
 
 
-@pytest.fixture(scope="function")
-def client(db_session):
-    """Create a test client with database override."""
+@pytest.fixture(scope="function", params=["sync", "async"])
+def client(request, db_engine, db_session):
+    """Create a test client with database override, once per database mode.
+
+    "async" serves the same API with DB_ASYNC routes over aiosqlite, so every API test
+    also checks that the async path behaves like the sync one.
+    """
+    test_app = app if request.param == "sync" else async_app
+
     def override_get_db():
         try:
             yield db_session
         finally:
             pass
 
-    # Override get_db in all route modules
-    from app.api.routes import users, tasks, auth
-    app.dependency_overrides[users.get_db] = override_get_db
-    app.dependency_overrides[tasks.get_db] = override_get_db
-    app.dependency_overrides[auth.get_db] = override_get_db
+    # Every router shares the one get_db dependency
+    test_app.dependency_overrides[get_db] = override_get_db
+
+    if request.param == "async":
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        async_engine = create_async_engine(to_async_url(str(db_engine.url)), poolclass=NullPool)
+        TestingAsyncSessionLocal = async_sessionmaker(
+            bind=async_engine, autoflush=False, expire_on_commit=False
+        )
+
+        async def override_get_async_db():
+            async with TestingAsyncSessionLocal() as session:
+                yield session
 
-    # Override password functions to use bcrypt directly to avoid passlib issues
+        test_app.dependency_overrides[get_async_db] = override_get_async_db
+
+    # Override password functions to use bcrypt directly to avoid passlib issues.
+    # The async password service looks these up on the security module at call time.
     from app.core import security
-    from app.api.routes import auth as auth_module
-    from app.api.routes import users as users_module
     
     original_verify = security.verify_password
     original_hash = security.get_password_hash
@@ -79,24 +100,24 @@ def client(db_session):
     
     def get_password_hash_override(password: str) -> str:
         """Override get_password_hash to use bcrypt directly."""
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=4)).decode('utf-8')
     
     security.verify_password = verify_password_override
     security.get_password_hash = get_password_hash_override
-    auth_module.verify_password = verify_password_override
-    users_module.get_password_hash = get_password_hash_override
 
-    with TestClient(app) as test_client:
+    # Tokens cached by earlier tests must not leak into this one
+    from app.core.principal_cache import principal_cache
+    principal_cache.clear()
+
+    with TestClient(test_app) as test_client:
         yield test_client
+
+    principal_cache.clear()
     
     # Restore original functions
     security.verify_password = original_verify
     security.get_password_hash = original_hash
-    if hasattr(auth_module, 'verify_password'):
-        auth_module.verify_password = original_verify
-    if hasattr(users_module, 'get_password_hash'):
-        users_module.get_password_hash = original_hash
-    app.dependency_overrides.clear()
+    test_app.dependency_overrides.clear()
 
 
 @pytest.fixture
@@ -1,5 +1,6 @@
 """Tests for authentication endpoints."""
 import pytest
+from datetime import datetime, timedelta, timezone
 from fastapi import status
 
 
@@ -66,3 +67,220 @@ def test_get_current_user_invalid_token(client):
     )
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
+
+
+def test_principal_cache_skips_user_lookup(client, db_session, test_user, auth_headers):
+    """Test that task routes authenticate from the principal cache once the token is cached."""
+    from app.core.principal_cache import principal_cache
+
+    assert client.get("/tasks/", headers=auth_headers).status_code == status.HTTP_200_OK
+
+    # Remove the user behind the API's back; the cached principal is still served
+    db_session.delete(test_user)
+    db_session.commit()
+    assert client.get("/tasks/", headers=auth_headers).status_code == status.HTTP_200_OK
+
+    principal_cache.invalidate_user(test_user.id)
+    assert client.get("/tasks/", headers=auth_headers).status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_principal_cache_disabled(client, db_session, test_user, auth_headers, monkeypatch):
+    """Test that every request looks the user up when the cache is turned off."""
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "PRINCIPAL_CACHE_ENABLED", False)
+    assert client.get("/tasks/", headers=auth_headers).status_code == status.HTTP_200_OK
+
+    db_session.delete(test_user)
+    db_session.commit()
+    assert client.get("/tasks/", headers=auth_headers).status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_update_user_invalidates_principal(client, test_user, auth_headers):
+    """Test that a changed email is seen immediately by routes using the cached principal."""
+    assert client.get("/tasks/", headers=auth_headers).status_code == status.HTTP_200_OK
+
+    response = client.put(
+        f"/users/{test_user.id}", json={"user_email": "renamed@example.com"}, headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    start_date = datetime.now(timezone.utc)
+    response = client.post(
+        "/tasks/",
+        json={
+            "title": "After rename",
+            "start_date": start_date.isoformat(),
+            "due_date": (start_date + timedelta(days=1)).isoformat(),
+            "priority": "low",
+            "status": "pending",
+            "created_by": "renamed@example.com",
+            "assigned_to": "renamed@example.com"
+        },
+        headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    response = client.get("/tasks/", headers=auth_headers)
+    assert [t["title"] for t in response.json()] == ["After rename"]
+
+
+def test_principal_cache_lru_and_ttl():
+    """Test the size limit and expiry of the principal cache."""
+    from app.core.principal_cache import Principal, PrincipalCache
+
+    cache = PrincipalCache(max_size=2, ttl_seconds=60)
+    for i in range(3):
+        cache.put(f"token-{i}", Principal(id=f"user-{i}", user_email=f"u{i}@example.com", role="normal"))
+    assert len(cache) == 2
+    assert cache.get("token-0") is None
+    assert cache.get("token-2").id == "user-2"
+
+    # Entries never outlive the token's own expiry
+    cache.put("expired", Principal(id="user-x", user_email="x@example.com", role="normal"), token_exp=0)
+    assert cache.get("expired") is None
+
+
+def test_login_rejected_when_password_queue_full(client, test_user, monkeypatch):
+    """Test that login sheds load with 503 when the password hashing queue is full."""
+    import threading
+    from app.core import security
+
+    monkeypatch.setattr(security, "_password_slots", threading.BoundedSemaphore(1))
+    security._password_slots.acquire()
+    response = client.post(
+        "/auth/login",
+        data={"username": test_user.user_email, "password": "testpassword123"}
+    )
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+
+    security._password_slots.release()
+    response = client.post(
+        "/auth/login",
+        data={"username": test_user.user_email, "password": "testpassword123"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_login_does_not_query_on_the_event_loop(client, db_engine, test_user):
+    """Test that every login query runs in the threadpool, none on the event loop."""
+    import asyncio
+    from sqlalchemy import event
+
+    on_loop = []
+
+    def record(*args):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        on_loop.append(args[2])
+
+    event.listen(db_engine, "before_cursor_execute", record)
+    try:
+        response = client.post(
+            "/auth/login",
+            data={"username": test_user.user_email, "password": "testpassword123"}
+        )
+    finally:
+        event.remove(db_engine, "before_cursor_execute", record)
+    assert response.status_code == status.HTTP_200_OK
+    assert on_loop == []
+
+
+def _login(client, user):
+    response = client.post(
+        "/auth/login",
+        data={"username": user.user_email, "password": "testpassword123"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def test_login_returns_refresh_token(client, test_user, db_session):
+    """Test that login issues a refresh token and only stores its hash."""
+    from app.models.refresh_token import RefreshToken
+
+    refresh_token = _login(client, test_user)["refresh_token"]
+    stored = db_session.query(RefreshToken).filter(RefreshToken.user_id == test_user.id).one()
+    assert stored.token_hash != refresh_token
+    assert refresh_token not in stored.token_hash
+
+
+def test_refresh_rotates_token(client, test_user):
+    """Test that refreshing returns a working access token and a new refresh token."""
+    refresh_token = _login(client, test_user)["refresh_token"]
+
+    response = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["token_type"] == "bearer"
+    assert data["refresh_token"] != refresh_token
+
+    me = client.get("/auth/me", headers={"Authorization": f"Bearer {data['access_token']}"})
+    assert me.status_code == status.HTTP_200_OK
+    assert me.json()["id"] == test_user.id
+
+    second = client.post("/auth/refresh", json={"refresh_token": data["refresh_token"]})
+    assert second.status_code == status.HTTP_200_OK
+
+
+def test_refresh_token_reuse_revokes_family(client, test_user):
+    """Test that reusing a rotated refresh token revokes every token from that login."""
+    original = _login(client, test_user)["refresh_token"]
+    rotated = client.post("/auth/refresh", json={"refresh_token": original}).json()["refresh_token"]
+
+    reuse = client.post("/auth/refresh", json={"refresh_token": original})
+    assert reuse.status_code == status.HTTP_401_UNAUTHORIZED
+
+    # The legitimate holder's newer token is revoked too
+    response = client.post("/auth/refresh", json={"refresh_token": rotated})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_refresh_invalid_or_expired(client, test_user, db_session):
+    """Test that unknown and expired refresh tokens are rejected."""
+    from datetime import datetime, timedelta, timezone
+    from app.models.refresh_token import RefreshToken
+
+    response = client.post("/auth/refresh", json={"refresh_token": "not-a-token"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    refresh_token = _login(client, test_user)["refresh_token"]
+    stored = db_session.query(RefreshToken).filter(RefreshToken.user_id == test_user.id).one()
+    stored.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    db_session.commit()
+    response = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_logout_revokes_refresh_token(client, test_user):
+    """Test that logout revokes the refresh token."""
+    refresh_token = _login(client, test_user)["refresh_token"]
+    response = client.post("/auth/logout", json={"refresh_token": refresh_token})
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    response = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_password_change_revokes_refresh_tokens(client, test_user):
+    """Test that changing the password revokes existing refresh tokens."""
+    tokens = _login(client, test_user)
+    response = client.put(
+        f"/users/{test_user.id}",
+        json={"pwd": "newpassword123"},
+        headers={"Authorization": f"Bearer {tokens['access_token']}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_get_current_user_etag(client, test_user, auth_headers):
+    """Test conditional GET on /auth/me."""
+    etag = client.get("/auth/me", headers=auth_headers).headers["ETag"]
+    response = client.get("/auth/me", headers={**auth_headers, "If-None-Match": f'"other", {etag}'})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
@@ -0,0 +1,159 @@
+"""Tests for bulk import of users and tasks."""
+import io
+import json
+import bcrypt
+import pytest
+from fastapi import status
+
+from app.core import security
+from app.core.config import settings
+from app.db import bulk_import, task_counters
+from app.models.task import Task
+from app.models.user import User
+from tests.conftest import hash_password_for_test
+
+
+def _task_line(user, **overrides):
+    task = {
+        "title": "Imported Task",
+        "start_date": "2025-01-01T09:00:00+00:00",
+        "due_date": "2025-01-08T09:00:00+00:00",
+        "priority": "medium",
+        "status": "pending",
+        "created_by": user.user_email,
+        "assigned_to": user.user_email,
+    }
+    task.update(overrides)
+    return json.dumps(task)
+
+
+@pytest.fixture
+def in_process_hashing(monkeypatch):
+    """Hash imported passwords in the test process with the fast test hash."""
+    monkeypatch.setattr(security, "get_password_hash", hash_password_for_test)
+    monkeypatch.setattr(settings, "IMPORT_HASH_PROCESSES", 0)
+
+
+def test_import_tasks_reports_row_errors(db_session, test_user):
+    """Test that bad rows are reported by line while the rest are imported in batches."""
+    lines = [
+        _task_line(test_user, title="One"),
+        "{not json",
+        _task_line(test_user, status=None),
+        "",
+        _task_line(test_user, assigned_to="nobody@example.com"),
+        _task_line(test_user, title="Two", priority="high"),
+    ]
+    progress = []
+    report = bulk_import.import_tasks(db_session, lines, "ndjson", batch_size=2, progress=progress.append)
+
+    assert (report.processed, report.imported, report.failed) == (5, 2, 3)
+    assert [error.line for error in report.errors] == [2, 3, 5]
+    assert "status" in report.errors[1].error
+    assert report.errors[2].error == "Assigned user not found"
+    assert len(progress) == 3
+    assert sorted(title for (title,) in db_session.query(Task.title)) == ["One", "Two"]
+    assert {assignee_id for (assignee_id,) in db_session.query(Task.assignee_id)} == {test_user.id}
+    assert task_counters.verify(db_session) == []
+
+
+def test_import_users_csv(db_session, test_user, in_process_hashing):
+    """Test importing users from CSV, rejecting emails that already exist or repeat."""
+    csv_file = io.StringIO(
+        "user_email,user_name,pwd,role\n"
+        "New@Example.com,New User,secret123,\n"
+        f"{test_user.user_email},Taken,secret123,\n"
+        "new@example.com,Repeated,secret123,admin\n"
+        "not-an-email,Bad,secret123,\n"
+    )
+    report = bulk_import.import_users(db_session, csv_file, "csv")
+
+    assert (report.processed, report.imported, report.failed) == (4, 1, 3)
+    assert [error.line for error in report.errors] == [3, 4, 5]
+    user = db_session.query(User).filter(User.user_email == "new@example.com").one()
+    assert user.role == "normal"
+    assert bcrypt.checkpw(b"secret123", user.pwd.encode())
+
+
+def test_password_hasher_uses_process_pool(monkeypatch):
+    """Test that passwords hashed on the process pool verify."""
+    monkeypatch.setattr(security, "get_password_hash", hash_password_for_test)
+    with bulk_import.password_hasher(2) as hash_passwords:
+        hashes = hash_passwords(["first", "second", "third"])
+    for password, hashed in zip([b"first", b"second", b"third"], hashes):
+        assert bcrypt.checkpw(password, hashed.encode())
+
+
+def test_password_hasher_shares_one_pool(monkeypatch):
+    """Test that shared hashing reuses one process pool across imports and keeps it running."""
+    monkeypatch.setattr(security, "get_password_hash", hash_password_for_test)
+    monkeypatch.setattr(bulk_import, "_shared_executor", None)
+    pools = []
+    for password in ("first", "second"):
+        with bulk_import.password_hasher(1, shared=True) as hash_passwords:
+            assert bcrypt.checkpw(password.encode(), hash_passwords([password])[0].encode())
+        pools.append(bulk_import._shared_executor)
+    assert pools[0] is pools[1]
+    assert pools[0].submit(len, "ok").result() == 2
+    pools[0].shutdown()
+
+
+def test_unreadable_uploads_are_row_errors(client, test_user, admin_auth_headers):
+    """Test that bytes that aren't UTF-8 or unreadable CSV are reported, not a server error."""
+    good = _task_line(test_user, title="Kept").encode()
+    uploads = [
+        ("tasks.csv", b"title\n\xff\xfe bad\n", 2),
+        ("tasks.ndjson", good + b"\n\xff\xfe\n", 2),
+        # Longer than the csv module's field size limit
+        ("tasks.csv", b"title\nOk\n" + b"x" * 200000 + b"\n", 3),
+    ]
+    for filename, upload, line in uploads:
+        response = client.post("/tasks/import", files={"file": (filename, upload)}, headers=admin_auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        report = response.json()
+        assert report["errors"][-1]["line"] == line
+        assert "the rest of the file was not read" in report["errors"][-1]["error"]
+    assert [t["title"] for t in client.get("/tasks/", headers=admin_auth_headers).json()] == ["Kept"]
+
+
+@pytest.mark.parametrize("filename, requested, expected", [
+    ("tasks.csv", None, "csv"),
+    ("tasks.JSONL", None, "ndjson"),
+    ("upload", "ndjson", "ndjson"),
+])
+def test_file_format(filename, requested, expected):
+    """Test that the import format comes from the request or the file extension."""
+    assert bulk_import.file_format(filename, requested) == expected
+
+
+def test_import_tasks_endpoint(client, test_user, admin_auth_headers, auth_headers):
+    """Test the task import upload as admin and as a normal user."""
+    upload = "\n".join([_task_line(test_user), _task_line(test_user, priority="low")])
+
+    response = client.post(
+        "/tasks/import", files={"file": ("tasks.ndjson", upload)}, headers=admin_auth_headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert (response.json()["imported"], response.json()["failed"]) == (2, 0)
+    assert len(client.get("/tasks/", headers=auth_headers).json()) == 2
+
+    response = client.post("/tasks/import", files={"file": ("tasks.ndjson", upload)}, headers=auth_headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    response = client.post("/tasks/import", files={"file": ("tasks.txt", upload)}, headers=admin_auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_import_users_endpoint(client, admin_auth_headers, monkeypatch):
+    """Test that imported users can sign in."""
+    monkeypatch.setattr(settings, "IMPORT_HASH_PROCESSES", 0)
+    upload = json.dumps({"user_email": "imported@example.com", "user_name": "Imported", "pwd": "secret123"})
+
+    response = client.post(
+        "/users/import", params={"format": "ndjson"}, files={"file": ("users", upload)},
+        headers=admin_auth_headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["imported"] == 1
+
+    response = client.post("/auth/login", data={"username": "imported@example.com", "password": "secret123"})
+    assert response.status_code == status.HTTP_200_OK
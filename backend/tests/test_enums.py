@@ -0,0 +1,63 @@
+"""Tests for the coded status, priority and role columns and their migration."""
+import pytest
+from sqlalchemy import select, text
+
+from app.db import enums
+from app.models.task import Task
+from app.models.user import User
+
+
+def _task(user, **overrides):
+    task = {
+        "title": "Coded", "start_date": "2025-01-01T00:00:00Z", "due_date": "2025-01-08T00:00:00Z",
+        "priority": "high", "status": "in_progress",
+        "created_by": user.user_email, "assigned_to": user.user_email,
+    }
+    task.update(overrides)
+    return task
+
+
+def test_task_values_are_validated_and_stored_as_codes(client, db_session, test_user, auth_headers):
+    """Test that unknown values are rejected and known ones stored as codes but read as strings."""
+    for field, value in (("status", "Complete"), ("priority", "urgent")):
+        response = client.post("/tasks/", json=_task(test_user, **{field: value}), headers=auth_headers)
+        assert response.status_code == 422
+    assert client.get("/tasks/", params={"status": "done"}, headers=auth_headers).status_code == 422
+
+    created = client.post("/tasks/", json=_task(test_user), headers=auth_headers).json()
+    assert (created["status"], created["priority"]) == ("in_progress", "high")
+    assert db_session.execute(text("SELECT status, priority FROM tasks")).one() == (1, 2)
+    listed = client.get("/tasks/", params={"status": "in_progress"}, headers=auth_headers).json()
+    assert [task["id"] for task in listed] == [created["id"]]
+
+
+def _insert_legacy_task(db_engine, task_id, task_status):
+    with db_engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO tasks (id, title, priority, status, version, change_seq) "
+            "VALUES (:id, 'Legacy', 'Medium', :status, 1, 0)"
+        ), {"id": task_id, "status": task_status})
+
+
+def test_migrate_converts_strings(db_engine, db_session, test_user):
+    """Test that migrate turns legacy strings into codes, ignoring case, and runs once."""
+    _insert_legacy_task(db_engine, "legacy-1", "Completed ")
+    with db_engine.begin() as connection:
+        connection.execute(text("UPDATE users SET role = 'normal'"))
+
+    assert enums.migrate(db_engine) == ["tasks.status", "tasks.priority", "users.role"]
+    assert db_session.execute(text("SELECT status, priority FROM tasks")).one() == (2, 1)
+    assert db_session.execute(select(Task.status, Task.priority)).one() == ("completed", "medium")
+    assert db_session.get(User, test_user.id).role == "normal"
+    assert enums.migrate(db_engine) == []
+
+
+def test_migrate_rejects_unknown_values(db_engine):
+    """Test that a typo stops the migration before any column is converted."""
+    _insert_legacy_task(db_engine, "legacy-1", "pending")
+    _insert_legacy_task(db_engine, "legacy-2", "Complete")
+
+    with pytest.raises(ValueError, match="tasks.status: 'Complete'"):
+        enums.migrate(db_engine)
+    with db_engine.connect() as connection:
+        assert connection.execute(text("SELECT typeof(status) FROM tasks")).scalars().all() == ["text"] * 2
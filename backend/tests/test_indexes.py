@@ -0,0 +1,39 @@
+"""Tests for the task and user index migration."""
+import pytest
+from sqlalchemy import inspect, text
+
+from app.db import enums, indexes
+
+
+def _index_names(engine, table):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def test_migrate_replaces_legacy_indexes(db_engine):
+    """Test that migrate drops the per-column indexes and creates the composite ones, once."""
+    indexes._use_legacy_indexes(db_engine)
+    assert "ix_tasks_description" in _index_names(db_engine, "tasks")
+
+    dropped, created = indexes.migrate(db_engine)
+    assert set(dropped) == set(indexes.LEGACY_INDEXES)
+    assert "ix_tasks_created_by_due_date" in created
+    assert _index_names(db_engine, "tasks") == {index.name for index in indexes.Task.__table__.indexes}
+    assert _index_names(db_engine, "users") == {"ix_users_user_email"}
+
+    assert indexes.migrate(db_engine) == ([], [])
+
+
+def test_migrate_needs_the_enum_migration_first(db_engine):
+    """Test that migrate refuses to create the status-coded index before the enum migration."""
+    with db_engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_tasks_open_due_date"))
+        connection.execute(text(
+            "INSERT INTO tasks (id, title, priority, status, version, change_seq) "
+            "VALUES ('legacy', 'Legacy', 'medium', 'pending', 1, 0)"
+        ))
+    with pytest.raises(ValueError, match="app.db.enums migrate"):
+        indexes.migrate(db_engine)
+    assert "ix_tasks_open_due_date" not in _index_names(db_engine, "tasks")
+
+    enums.migrate(db_engine)
+    assert indexes.migrate(db_engine) == ([], ["ix_tasks_open_due_date"])
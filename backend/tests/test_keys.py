@@ -0,0 +1,80 @@
+"""Tests for time-ordered ids, compact id storage and the key migration."""
+from uuid import UUID
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import keys
+from app.models.base import Base
+from app.models.task import Task
+from app.models.user import User
+from app.utils.ids import new_id
+
+
+def test_new_id_is_time_ordered_uuid7():
+    """Test that new ids are version 7 UUID strings that sort in creation order."""
+    ids = [new_id() for _ in range(1000)]
+    assert {UUID(value).version for value in ids} == {7}
+    assert len(set(ids)) == len(ids)
+    # The leading 48 bits are the creation time in milliseconds
+    millis = [UUID(value).int >> 80 for value in ids]
+    assert millis == sorted(millis)
+    assert [value[:13] for value in ids] == sorted(value[:13] for value in ids)
+
+
+def test_compact_ids_are_stored_as_bytes(tmp_path, monkeypatch):
+    """Test that DB_COMPACT_IDS stores 16 bytes but reads and matches the string ids."""
+    monkeypatch.setattr(settings, "DB_COMPACT_IDS", True)
+    engine = create_engine(f"sqlite:///{tmp_path / 'compact.db'}")
+    Base.metadata.create_all(bind=engine)
+    user_id, task_id = new_id(), new_id()
+    with Session(engine) as db:
+        db.add(User(id=user_id, user_email="a@example.com", user_name="A", pwd="-", role="normal"))
+        db.add(Task(id=task_id, title="One", assigned_to="a@example.com", assignee_id=user_id))
+        db.commit()
+
+        assert db.execute(text("SELECT typeof(id), length(id) FROM tasks")).one() == ("blob", 16)
+        db.expunge_all()
+        task = db.get(Task, task_id)
+        assert (task.id, task.assignee_id, task.assigned_to_user.id) == (task_id, user_id, user_id)
+        assert db.get(Task, "nonexistent-id") is None
+    engine.dispose()
+
+
+def _add_legacy_task(db_session, user):
+    """A task as written before assignee_id existed."""
+    task = Task(id=new_id(), title="Legacy", created_by=user.user_email, assigned_to=user.user_email)
+    db_session.add(task)
+    db_session.commit()
+    return task.id
+
+
+def test_migrate_fills_assignee_id(db_engine, db_session, test_user):
+    """Test that migrate sets assignee_id from assigned_to, once."""
+    task_id = _add_legacy_task(db_session, test_user)
+
+    assert "filled assignee_id of 1 tasks" in keys.migrate(db_engine)
+    db_session.expire_all()
+    assert db_session.get(Task, task_id).assignee_id == test_user.id
+    assert keys.migrate(db_engine) == []
+
+
+def test_migrate_compacts_ids(db_engine, db_session, test_user, monkeypatch):
+    """Test that migrate with DB_COMPACT_IDS rewrites the string ids of an existing database."""
+    monkeypatch.setattr(settings, "DB_COMPACT_IDS", False)
+    # Stored as a string, as before compact ids (even when the suite runs with them)
+    with db_engine.begin() as connection:
+        connection.execute(text("UPDATE users SET id = :id"), {"id": test_user.id})
+    task_id = _add_legacy_task(db_session, test_user)
+    monkeypatch.setattr(settings, "DB_COMPACT_IDS", True)
+
+    steps = keys.migrate(db_engine)
+    assert "compacted users.id, tasks.id" in steps
+    with db_engine.connect() as connection:
+        assert set(connection.execute(text("SELECT typeof(id) FROM users UNION SELECT typeof(id) FROM tasks")
+                                      ).scalars()) == {"blob"}
+    db_session.expire_all()
+    task = db_session.get(Task, task_id)
+    assert (task.id, task.assignee_id) == (task_id, test_user.id)
+    assert keys.migrate(db_engine) == []
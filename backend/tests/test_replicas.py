@@ -0,0 +1,107 @@
+"""Tests for read replica routing, with a second SQLite file standing in for the replica."""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.security import create_access_token
+from app.db import replicas
+from app.db.async_session import to_async_url
+from app.models.base import Base
+from app.models.task import Task
+from app.utils.ids import new_id
+
+
+@pytest.fixture
+def replica_engine(tmp_path, monkeypatch):
+    """An empty replica that only sees the primary's data when replicate() copies it over."""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}", poolclass=NullPool)
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(to_async_url(str(engine.url)), poolclass=NullPool)
+    monkeypatch.setattr(replicas, "replica_sessions", [sessionmaker(bind=engine)])
+    monkeypatch.setattr(replicas, "async_replica_sessions", [async_sessionmaker(bind=async_engine)])
+    replicas.recent_writes.clear()
+    yield engine
+    replicas.recent_writes.clear()
+    engine.dispose()
+
+
+def replicate(primary, replica):
+    """Copy the primary database file over the replica, like replication catching up."""
+    source, target = primary.raw_connection(), replica.raw_connection()
+    try:
+        source.driver_connection.backup(target.driver_connection)
+    finally:
+        source.close()
+        target.close()
+
+
+def _task(user):
+    return {
+        "title": "Mine", "start_date": "2025-01-01T00:00:00Z", "due_date": "2025-01-08T00:00:00Z",
+        "priority": "high", "status": "pending", "created_by": user.user_email, "assigned_to": user.user_email,
+    }
+
+
+def test_reads_use_the_replica_except_after_own_writes(client, db_engine, db_session, replica_engine,
+                                                       test_user, auth_headers):
+    """Test that reads come from the replica, but a client's own writes are visible at once."""
+    existing = Task(
+        id=new_id(), title="Existing", start_date=datetime(2025, 1, 1), due_date=datetime(2025, 1, 8),
+        priority="low", status="pending", created_by=test_user.user_email,
+        assigned_to=test_user.user_email, assignee_id=test_user.id,
+    )
+    db_session.add(existing)
+    db_session.commit()
+
+    # Not replicated yet
+    assert client.get("/tasks/", headers=auth_headers).json() == []
+    assert client.get(f"/tasks/{existing.id}", headers=auth_headers).status_code == 404
+    assert client.get("/auth/me", headers=auth_headers).status_code == 404
+
+    created = client.post("/tasks/", json=_task(test_user), headers=auth_headers).json()
+    listed = client.get("/tasks/", headers=auth_headers).json()
+    assert {task["id"] for task in listed} == {existing.id, created["id"]}
+    assert client.get("/tasks/stats", headers=auth_headers).json()["total"] == 2
+
+    replicas.recent_writes.clear()
+    assert client.get("/tasks/", headers=auth_headers).json() == []
+    replicate(db_engine, replica_engine)
+    assert len(client.get("/tasks/", headers=auth_headers).json()) == 2
+    assert client.get("/auth/me", headers=auth_headers).json()["id"] == test_user.id
+
+
+def test_reads_stay_on_the_primary_with_a_new_token(client, replica_engine, test_user, test_user2, auth_headers):
+    """Test that stickiness follows the user across tokens, and not other users."""
+    created = client.post("/tasks/", json=_task(test_user), headers=auth_headers).json()
+
+    refreshed = create_access_token(data={"sub": test_user.id, "refreshed": True})
+    assert f"Bearer {refreshed}" != auth_headers["Authorization"]
+    listed = client.get("/tasks/", headers={"Authorization": f"Bearer {refreshed}"}).json()
+    assert [task["id"] for task in listed] == [created["id"]]
+
+    other = {"Authorization": f"Bearer {create_access_token(data={'sub': test_user2.id})}"}
+    assert client.get(f"/tasks/{created['id']}", headers=other).status_code == 404
+
+
+def test_failed_writes_do_not_pin_reads_to_the_primary(client, replica_engine, auth_headers):
+    """Test that only successful writes keep the client on the primary."""
+    response = client.put(f"/tasks/{new_id()}", json={"title": "Nope"}, headers=auth_headers)
+    assert response.status_code == 404
+    assert len(replicas.recent_writes) == 0
+
+
+def test_recent_writes_expire():
+    """Test that clients are forgotten after the window, and the oldest first when full."""
+    writes = replicas.RecentWrites(window_seconds=60, max_size=2)
+    for client in ("a", "b", "c"):
+        writes.record(client)
+    assert [writes.wrote_recently(client) for client in ("a", "b", "c")] == [False, True, True]
+
+    writes.window_seconds = 0
+    writes.record("d")
+    assert not writes.wrote_recently("d")
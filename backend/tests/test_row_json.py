@@ -0,0 +1,49 @@
+"""Tests for rendering task lists straight from row tuples."""
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from app.api.routes.tasks import TASK_READ_COLUMNS, TASK_READ_FIELDS
+from app.models.task import Task
+from app.schemas.task_schema import TaskRead
+from app.utils import row_json
+
+
+def test_list_tasks_renders_task_read(client, db_session, test_user, auth_headers):
+    """Test that the row path returns what validating the tasks into TaskRead returns."""
+    for title in ("Plain", "Ünïcode ✓ \"quoted\""):
+        response = client.post("/tasks/", json={
+            "title": title, "description": None,
+            "start_date": "2025-01-01T09:30:00.123456Z", "due_date": "2025-01-08T00:00:00+02:00",
+            "priority": "high", "status": "pending",
+            "created_by": test_user.user_email, "assigned_to": test_user.user_email,
+        }, headers=auth_headers)
+        assert response.status_code == 201
+
+    response = client.get("/tasks/", params={"limit": 1}, headers=auth_headers)
+    assert response.headers["content-type"] == "application/json"
+    assert {"etag", "x-next-cursor"} <= set(response.headers)
+    tasks = db_session.execute(select(Task).order_by(Task.due_date, Task.id)).scalars().all()
+    adapter = TypeAdapter(List[TaskRead])
+    assert response.content == adapter.dump_json(adapter.validate_python(tasks[:1], from_attributes=True))
+
+    rows = db_session.execute(select(*TASK_READ_COLUMNS).order_by(Task.due_date, Task.id)).all()
+    assert row_json.rows_json(TASK_READ_FIELDS, rows) == adapter.dump_json(
+        adapter.validate_python(tasks, from_attributes=True)
+    )
+
+
+def test_encoders_render_the_same_json(monkeypatch):
+    """Test that the pydantic fallback renders the bytes orjson does, time zones included."""
+    fields = ["id", "at", "note"]
+    rows = [
+        ("a", datetime(2025, 1, 1, 9, 30, tzinfo=timezone.utc), "ü"),
+        ("b", datetime(2025, 1, 1, 9, 30, 0, 5, tzinfo=timezone(timedelta(hours=2))), None),
+        ("c", datetime(2025, 1, 1), "x"),
+    ]
+    rendered = row_json.rows_json(fields, rows)
+    monkeypatch.setattr(row_json, "orjson", None)
+    assert row_json.rows_json(fields, rows) == rendered
+    assert TypeAdapter(List[dict]).validate_json(rendered)[0]["at"] == "2025-01-01T09:30:00Z"
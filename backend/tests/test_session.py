@@ -0,0 +1,40 @@
+"""Tests for the request-scoped database session."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.principal_cache import principal_cache
+from app.core.security import create_access_token
+from app.db import session
+from app.main import app
+
+
+@pytest.fixture
+def checkouts(db_engine, test_user, monkeypatch):
+    """Serve the real get_db from the test engine and record every pool checkout."""
+    monkeypatch.setattr(
+        session, "SessionLocal", sessionmaker(bind=db_engine, autocommit=False, autoflush=False)
+    )
+    counted = []
+
+    def on_checkout(*args):
+        counted.append(args)
+
+    event.listen(db_engine, "checkout", on_checkout)
+    principal_cache.clear()
+    yield counted
+    principal_cache.clear()
+    event.remove(db_engine, "checkout", on_checkout)
+
+
+@pytest.mark.parametrize("path", ["/tasks/", "/tasks/stats", "/users/", "/auth/me"])
+def test_authenticated_request_checks_out_one_connection(checkouts, test_user, path):
+    """Test that authentication and the route share a single session per request."""
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': test_user.id})}"}
+
+    with TestClient(app) as test_client:
+        response = test_client.get(path, headers=headers)
+
+    assert response.status_code == 200
+    assert len(checkouts) == 1
@@ -0,0 +1,153 @@
+"""Tests for the materialized per-user task counters."""
+import pytest
+from datetime import datetime, timedelta, timezone
+from fastapi import status
+
+from app.core.config import settings
+from app.db import task_counters
+
+
+def _task_payload(user, **overrides):
+    start_date = datetime.now(timezone.utc)
+    payload = {
+        "title": "Counted Task",
+        "description": "Task Description",
+        "start_date": start_date.isoformat(),
+        "due_date": (start_date + timedelta(days=7)).isoformat(),
+        "priority": "medium",
+        "status": "pending",
+        "created_by": user.user_email,
+        "assigned_to": user.user_email,
+    }
+    payload.update(overrides)
+    return payload
+
+
+@pytest.fixture
+def counters_enabled(monkeypatch):
+    """Serve /tasks/stats from the counter table."""
+    monkeypatch.setattr(settings, "USE_TASK_COUNTERS", True)
+
+
+def test_write_paths_keep_counters_consistent(client, db_session, test_user, test_user2, auth_headers):
+    """Test that create, update and delete maintain the counters in the same transaction."""
+    first = client.post("/tasks/", json=_task_payload(test_user, priority="high"), headers=auth_headers)
+    second = client.post(
+        "/tasks/", json=_task_payload(test_user, assigned_to=test_user2.user_email), headers=auth_headers
+    )
+    assert first.status_code == second.status_code == status.HTTP_201_CREATED
+    assert task_counters.verify(db_session) == []
+
+    response = client.put(
+        f"/tasks/{first.json()['id']}",
+        json={"status": "completed", "assigned_to": test_user2.user_email},
+        headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert task_counters.verify(db_session) == []
+
+    response = client.delete(f"/tasks/{second.json()['id']}", headers=auth_headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert task_counters.verify(db_session) == []
+
+    counters = task_counters.read_counters(db_session, test_user2.user_email)
+    assert counters == {("status", "completed"): 1, ("priority", "high"): 1}
+
+
+def test_stats_from_counters_match_aggregate(client, db_session, test_user, test_user2,
+                                             auth_headers, admin_auth_headers, monkeypatch):
+    """Test that counter-backed stats match the SQL aggregate for users and admin."""
+    past = datetime.now(timezone.utc) - timedelta(days=3)
+    client.post("/tasks/", json=_task_payload(test_user, priority="high"), headers=auth_headers)
+    client.post(
+        "/tasks/",
+        json=_task_payload(test_user, status="in_progress", due_date=past.isoformat()),
+        headers=auth_headers
+    )
+    client.post(
+        "/tasks/", json=_task_payload(test_user, assigned_to=test_user2.user_email), headers=auth_headers
+    )
+
+    expected_user = client.get("/tasks/stats", headers=auth_headers).json()
+    expected_admin = client.get("/tasks/stats", headers=admin_auth_headers).json()
+
+    monkeypatch.setattr(settings, "USE_TASK_COUNTERS", True)
+    assert client.get("/tasks/stats", headers=auth_headers).json() == expected_user
+    assert client.get("/tasks/stats", headers=admin_auth_headers).json() == expected_admin
+    assert expected_user["overdue"] == 1
+
+
+def test_rebuild_repairs_drift(db_session, test_user, test_user2):
+    """Test that verify reports drift and rebuild recomputes the counters."""
+    from uuid import uuid4
+    from app.models.task import Task
+
+    # Inserted directly, bypassing the routes, so no counters are maintained
+    for assignee in (test_user, test_user2):
+        db_session.add(Task(
+            id=str(uuid4()),
+            title="Direct Task",
+            description=None,
+            start_date=datetime.now(timezone.utc),
+            due_date=datetime.now(timezone.utc) + timedelta(days=1),
+            priority="low",
+            status="pending",
+            created_by=test_user.user_email,
+            assigned_to=assignee.user_email
+        ))
+    db_session.commit()
+
+    drift = task_counters.verify(db_session)
+    assert ((task_counters.ALL_USERS, "status", "pending"), 0, 2) in drift
+
+    task_counters.rebuild(db_session)
+    assert task_counters.verify(db_session) == []
+    assert task_counters.read_counters(db_session, test_user.user_email)[("status", "pending")] == 2
+    assert task_counters.read_counters(db_session, test_user2.user_email)[("status", "pending")] == 1
+
+
+def test_bulk_write_paths_keep_counters_consistent(client, db_session, test_user, test_user2, auth_headers):
+    """Test that bulk create, update and delete maintain the counters."""
+    response = client.post(
+        "/tasks/bulk/create",
+        json={"tasks": [_task_payload(test_user, priority="high") for _ in range(3)]},
+        headers=auth_headers
+    )
+    ids = [result["id"] for result in response.json()["results"]]
+    assert task_counters.verify(db_session) == []
+
+    response = client.post(
+        "/tasks/bulk/update",
+        json={"tasks": [
+            {"id": ids[0], "status": "completed"},
+            {"id": ids[1], "assigned_to": test_user2.user_email, "priority": "low"},
+        ]},
+        headers=auth_headers
+    )
+    assert response.json()["succeeded"] == 2
+    assert task_counters.verify(db_session) == []
+
+    response = client.post("/tasks/bulk/delete", json={"ids": ids[1:]}, headers=auth_headers)
+    assert response.json()["succeeded"] == 2
+    assert task_counters.verify(db_session) == []
+    assert task_counters.read_counters(db_session, test_user2.user_email) == {}
+
+
+def test_counter_rows_are_upserted_atomically(db_session):
+    """Test that a new counter row is created by the same statement that increments one."""
+    from sqlalchemy.dialects import postgresql, sqlite
+
+    snapshot = ("a@example.com", "a@example.com", "pending", "high")
+    for _ in range(2):
+        task_counters.apply_delta(db_session, after=snapshot)
+    db_session.commit()
+    assert task_counters.read_counters(db_session, "a@example.com") == {
+        ("status", "pending"): 2, ("priority", "high"): 2,
+    }
+
+    for dialect in (postgresql.dialect(), sqlite.dialect()):
+        statements = list(task_counters._delta_statements(dialect.name, [(None, snapshot)]))
+        assert len(statements) == 4
+        sql = str(statements[0].compile(dialect=dialect))
+        assert "ON CONFLICT (user_email, dimension, value) DO UPDATE" in sql
+        assert "count = (task_counters.count + excluded.count)" in sql
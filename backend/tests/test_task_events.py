@@ -0,0 +1,149 @@
+"""Tests for the task event broker and stream."""
+import asyncio
+import json
+import pytest
+from fastapi import status
+
+from app.core import task_events
+from app.core.principal_cache import Principal
+from app.core.task_events import RESYNC_FRAME, TaskEventBroker, event_stream
+
+ALICE = Principal(id="1", user_email="Alice@example.com", role="normal")
+BOB = Principal(id="2", user_email="bob@example.com", role="normal")
+ADMIN = Principal(id="3", user_email="admin@example.com", role="admin")
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def _frames(loop, subscription):
+    """Every frame queued for a subscription, as (event, data) pairs."""
+    async def drain():
+        frames = []
+        while True:
+            frame = await subscription.next_frame(0.01)
+            if frame is None:
+                return frames
+            lines = dict(line.split(": ", 1) for line in frame.strip().split("\n"))
+            frames.append((lines["event"], json.loads(lines["data"])))
+            if frame is RESYNC_FRAME:
+                return frames
+    return loop.run_until_complete(drain())
+
+
+def test_broker_sends_events_to_task_audience(loop):
+    """Test that only users who can see a task get its events, and losing it sends a delete."""
+    broker = TaskEventBroker(max_subscribers=10, max_queued=10)
+    alice, bob, admin = (broker.subscribe(p, loop) for p in (ALICE, BOB, ADMIN))
+
+    created = ("alice@example.com", "alice@example.com", "pending", "low")
+    broker.publish("t1", None, created, 1, '{"title":"One"}')
+    broker.publish("t1", created, ("alice@example.com", "bob@example.com", "pending", "low"), 2, "{}")
+
+    assert _frames(loop, alice) == [
+        ("created", {"type": "created", "id": "t1", "change_seq": 1, "task": {"title": "One"}}),
+        ("updated", {"type": "updated", "id": "t1", "change_seq": 2, "task": {}}),
+    ]
+    assert [event for event, _ in _frames(loop, bob)] == ["updated"]
+    assert [event for event, _ in _frames(loop, admin)] == ["created", "updated"]
+
+    broker.publish("t1", ("alice@example.com", "bob@example.com", "pending", "low"),
+                   ("bob@example.com", "bob@example.com", "pending", "low"), 3, "{}")
+    assert _frames(loop, alice) == [("deleted", {"type": "deleted", "id": "t1", "change_seq": 3, "task": None})]
+
+    broker.unsubscribe(alice)
+    broker.unsubscribe(alice)
+    assert len(broker) == 2
+
+
+def test_slow_subscriber_is_told_to_resync(loop):
+    """Test that a full queue drops its events and ends the stream with a resync event."""
+    broker = TaskEventBroker(max_subscribers=10, max_queued=2)
+    subscription = broker.subscribe(BOB, loop)
+    for seq in range(1, 4):
+        broker.publish("t1", None, ("bob@example.com", "bob@example.com", "pending", "low"), seq, "{}")
+    assert _frames(loop, subscription) == [("resync", {})]
+
+
+def test_event_stream_sends_heartbeats(loop):
+    """Test that an idle stream sends heartbeat comments and ends after a resync."""
+    broker = TaskEventBroker(max_subscribers=10, max_queued=1)
+    subscription = broker.subscribe(BOB, loop)
+
+    async def read():
+        frames = []
+        async for frame in event_stream(subscription, heartbeat_seconds=0.01):
+            frames.append(frame)
+            if len(frames) == 3:
+                for seq in (1, 2):
+                    broker.publish("t1", None, ("bob@example.com", None, "pending", "low"), seq, "{}")
+        return frames
+
+    frames = loop.run_until_complete(asyncio.wait_for(read(), 5))
+    assert frames[0] == "retry: 10\n\n"
+    assert frames[1:3] == [task_events.HEARTBEAT_FRAME] * 2
+    assert frames[-1] == RESYNC_FRAME
+
+
+def test_task_writes_publish_events(client, test_user, auth_headers, loop, monkeypatch):
+    """Test that add, update and delete publish to the broker after they commit."""
+    broker = TaskEventBroker(max_subscribers=10, max_queued=10)
+    monkeypatch.setattr(task_events, "broker", broker)
+    subscription = broker.subscribe(ADMIN, loop)
+
+    response = client.post("/tasks/", json={
+        "title": "Pushed", "start_date": "2025-01-01T00:00:00Z", "due_date": "2025-01-08T00:00:00Z",
+        "priority": "low", "status": "pending",
+        "created_by": test_user.user_email, "assigned_to": test_user.user_email,
+    }, headers=auth_headers)
+    task_id = response.json()["id"]
+    client.put(f"/tasks/{task_id}", json={"status": "completed"}, headers=auth_headers)
+    client.delete(f"/tasks/{task_id}", headers=auth_headers)
+
+    frames = _frames(loop, subscription)
+    assert [event for event, _ in frames] == ["created", "updated", "deleted"]
+    assert frames[0][1]["task"]["title"] == "Pushed"
+    assert frames[1][1]["task"]["status"] == "completed"
+    assert frames[0][1]["change_seq"] < frames[1][1]["change_seq"] < frames[2][1]["change_seq"]
+
+
+def test_imported_tasks_publish_events(client, test_user, admin_auth_headers, loop, monkeypatch):
+    """Test that tasks created by an import are published once their batch commits."""
+    broker = TaskEventBroker(max_subscribers=10, max_queued=10)
+    monkeypatch.setattr(task_events, "broker", broker)
+    subscription = broker.subscribe(ADMIN, loop)
+
+    upload = "\n".join(json.dumps({
+        "title": title, "start_date": "2025-01-01T00:00:00Z", "due_date": "2025-01-08T00:00:00Z",
+        "priority": "low", "status": "pending",
+        "created_by": test_user.user_email, "assigned_to": test_user.user_email,
+    }) for title in ("First", "Second"))
+    response = client.post("/tasks/import", files={"file": ("tasks.ndjson", upload)}, headers=admin_auth_headers)
+    assert response.json()["imported"] == 2
+
+    frames = _frames(loop, subscription)
+    assert [(event, data["task"]["title"]) for event, data in frames] == [("created", "First"), ("created", "Second")]
+    assert frames[0][1]["change_seq"] == frames[1][1]["change_seq"]
+    changes = client.get("/tasks/changes", headers=admin_auth_headers).json()
+    assert sorted(task["id"] for task in changes["tasks"]) == sorted(data["id"] for _, data in frames)
+
+
+def test_task_events_endpoint_limits_subscribers(client, auth_headers, monkeypatch):
+    """Test that /tasks/events needs a user and sheds load when the worker is full."""
+    assert client.get("/tasks/events").status_code == status.HTTP_401_UNAUTHORIZED
+
+    monkeypatch.setattr(task_events, "broker", TaskEventBroker(max_subscribers=0, max_queued=10))
+    response = client.get("/tasks/events", headers=auth_headers)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "5"
+
+
+def test_benchmark_holds_idle_subscribers():
+    """Test the idle subscriber load test on a small scale."""
+    report = asyncio.run(task_events._benchmark(300))
+    assert report["subscribers"] == 300
+    assert report["bytes_per_subscriber"] > 0
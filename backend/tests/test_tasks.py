@@ -258,3 +258,726 @@ def test_admin_can_access_any_task(client, test_task, admin_auth_headers):
     data = response.json()
     assert data["id"] == test_task.id
 
+
+
+def test_list_tasks_paginates_with_cursor(client, test_user, auth_headers, db_session):
+    """Test that task listing walks all pages through the next cursor."""
+    from uuid import uuid4
+    from app.models.task import Task
+
+    now = datetime.now(timezone.utc)
+    created_ids = []
+    for i in range(5):
+        task = Task(
+            id=str(uuid4()),
+            title=f"Task {i}",
+            description="Paged task",
+            start_date=now,
+            # Two tasks share a due date to exercise the id tie-breaker
+            due_date=now + timedelta(days=i // 2),
+            priority="low",
+            status="pending",
+            created_by=test_user.user_email.lower(),
+            assigned_to=test_user.user_email.lower()
+        )
+        db_session.add(task)
+        created_ids.append(task.id)
+    db_session.commit()
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/tasks/", params=params, headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert len(data) <= 2
+        seen.extend(t["id"] for t in data)
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert sorted(seen) == sorted(created_ids)
+    assert len(seen) == len(set(seen))
+
+
+def test_list_tasks_invalid_cursor(client, auth_headers):
+    """Test that a malformed cursor is rejected."""
+    response = client.get("/tasks/", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.fixture
+def filter_tasks(db_session, test_user, test_user2):
+    """Create a small set of tasks with varied fields for filtering tests."""
+    from uuid import uuid4
+    from app.models.task import Task
+
+    now = datetime.now(timezone.utc)
+    specs = [
+        ("Write report", "Quarterly numbers", "pending", "high", test_user2, 1),
+        ("Review code", "Pull request for search", "in_progress", "medium", test_user, 2),
+        ("Deploy", "Ship the release", "completed", "high", test_user, 3),
+        ("Plan sprint", None, "pending", "low", test_user, 4),
+    ]
+    tasks = {}
+    for title, description, task_status, priority, assignee, days in specs:
+        task = Task(
+            id=str(uuid4()),
+            title=title,
+            description=description,
+            start_date=now,
+            due_date=now + timedelta(days=days),
+            priority=priority,
+            status=task_status,
+            created_by=test_user.user_email.lower(),
+            assigned_to=assignee.user_email.lower()
+        )
+        db_session.add(task)
+        tasks[title] = task
+    db_session.commit()
+    return tasks
+
+
+def test_list_tasks_filter_by_status_and_priority(client, filter_tasks, auth_headers):
+    """Test filtering tasks by status and priority."""
+    response = client.get("/tasks/", params={"status": "pending"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert {t["title"] for t in response.json()} == {"Write report", "Plan sprint"}
+
+    response = client.get(
+        "/tasks/", params={"status": "pending", "priority": "high"}, headers=auth_headers
+    )
+    assert [t["title"] for t in response.json()] == ["Write report"]
+
+
+def test_list_tasks_filter_by_assignee_and_due_range(client, filter_tasks, test_user2, auth_headers):
+    """Test filtering tasks by assignee and due date range."""
+    response = client.get(
+        "/tasks/", params={"assigned_to": test_user2.user_email.upper()}, headers=auth_headers
+    )
+    assert [t["title"] for t in response.json()] == ["Write report"]
+
+    now = datetime.now(timezone.utc)
+    response = client.get(
+        "/tasks/",
+        params={
+            "due_from": (now + timedelta(days=1, hours=12)).isoformat(),
+            "due_to": (now + timedelta(days=3, hours=12)).isoformat(),
+        },
+        headers=auth_headers
+    )
+    assert [t["title"] for t in response.json()] == ["Review code", "Deploy"]
+
+
+def test_list_tasks_search(client, filter_tasks, auth_headers):
+    """Test free-text search over title, description and assignee."""
+    response = client.get("/tasks/", params={"q": "SEARCH"}, headers=auth_headers)
+    assert [t["title"] for t in response.json()] == ["Review code"]
+
+    response = client.get("/tasks/", params={"q": "report"}, headers=auth_headers)
+    assert [t["title"] for t in response.json()] == ["Write report"]
+
+    response = client.get("/tasks/", params={"q": "TEST2@"}, headers=auth_headers)
+    assert [t["title"] for t in response.json()] == ["Write report"]
+
+    # LIKE wildcards typed by the user are matched literally
+    for q in ("%", "_", "Write_report", "\\"):
+        assert client.get("/tasks/", params={"q": q}, headers=auth_headers).json() == []
+
+
+def test_list_tasks_sort_descending_with_cursor(client, filter_tasks, auth_headers):
+    """Test descending sort order is preserved across pages."""
+    first = client.get("/tasks/", params={"sort": "-due_date", "limit": 3}, headers=auth_headers)
+    assert first.status_code == status.HTTP_200_OK
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get(
+        "/tasks/", params={"sort": "-due_date", "limit": 3, "cursor": cursor}, headers=auth_headers
+    )
+    titles = [t["title"] for t in first.json() + second.json()]
+    assert titles == ["Plan sprint", "Deploy", "Review code", "Write report"]
+
+    # A cursor issued for one sort order cannot be reused with another
+    mismatched = client.get(
+        "/tasks/", params={"sort": "title", "cursor": cursor}, headers=auth_headers
+    )
+    assert mismatched.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_list_tasks_sparse_fields(client, filter_tasks, auth_headers):
+    """Test that fields limits the returned fields (id always included) and pages still work."""
+    response = client.get(
+        "/tasks/", params={"fields": "status,title", "sort": "-title", "limit": 2}, headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {"title": "Write report", "status": "pending", "id": filter_tasks["Write report"].id},
+        {"title": "Review code", "status": "in_progress", "id": filter_tasks["Review code"].id},
+    ]
+    response = client.get(
+        "/tasks/",
+        params={"fields": "status,title", "sort": "-title", "limit": 2, "cursor": response.headers["X-Next-Cursor"]},
+        headers=auth_headers,
+    )
+    assert [task["title"] for task in response.json()] == ["Plan sprint", "Deploy"]
+
+    for fields in ("title,pwd", "title,", ""):
+        response = client.get("/tasks/", params={"fields": fields}, headers=auth_headers)
+        assert response.status_code == 422
+
+
+def test_sparse_fields_are_not_read(test_user):
+    """Test that unrequested columns, such as the description, are left out of the SELECT."""
+    from app.api.routes.tasks import TaskFilterParams, TaskListParams, task_list_statement, task_read_statement
+    from app.core.principal_cache import Principal
+
+    filters = TaskFilterParams(
+        status_filter=None, priority=None, assigned_to=None, created_by=None, due_from=None, due_to=None, q=None
+    )
+    params = TaskListParams(filters=filters, sort="due_date", limit=10, cursor=None)
+    user = Principal.from_user(test_user)
+    for statement in (task_list_statement(params, user, ["title", "id"]), task_read_statement("task-1", ["id"])):
+        columns = str(statement).split(" FROM ")[0]
+        assert "description" not in columns
+        assert "tasks.id" in columns
+
+
+def test_list_tasks_invalid_sort(client, auth_headers):
+    """Test that an unknown sort key is rejected."""
+    response = client.get("/tasks/", params={"sort": "description"}, headers=auth_headers)
+    assert response.status_code == 422
+
+
+def test_task_stats(client, filter_tasks, db_session, test_user, auth_headers):
+    """Test aggregated task statistics for a normal user."""
+    from uuid import uuid4
+    from app.models.task import Task
+
+    now = datetime.now(timezone.utc)
+    db_session.add(Task(
+        id=str(uuid4()),
+        title="Late task",
+        description=None,
+        start_date=now - timedelta(days=5),
+        due_date=now - timedelta(days=1),
+        priority="high",
+        status="in_progress",
+        created_by=test_user.user_email.lower(),
+        assigned_to=test_user.user_email.lower()
+    ))
+    db_session.commit()
+
+    response = client.get("/tasks/stats", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "total": 5,
+        "pending": 2,
+        "in_progress": 2,
+        "completed": 1,
+        "high_priority": 3,
+        "overdue": 1,
+    }
+
+
+def test_task_stats_respects_visibility(client, test_task, test_user2, db_session, auth_headers, admin_auth_headers):
+    """Test that stats only count tasks the user can list, while admin counts all."""
+    from uuid import uuid4
+    from app.models.task import Task
+
+    db_session.add(Task(
+        id=str(uuid4()),
+        title="Other User Task",
+        description="Task by another user",
+        start_date=datetime.now(timezone.utc),
+        due_date=datetime.now(timezone.utc) + timedelta(days=7),
+        priority="low",
+        status="pending",
+        created_by=test_user2.user_email.lower(),
+        assigned_to=test_user2.user_email.lower()
+    ))
+    db_session.commit()
+
+    response = client.get("/tasks/stats", headers=auth_headers)
+    assert response.json()["total"] == 1
+
+    response = client.get("/tasks/stats", headers=admin_auth_headers)
+    assert response.json()["total"] == 2
+
+
+def test_task_stats_empty(client, auth_headers):
+    """Test stats with no visible tasks."""
+    response = client.get("/tasks/stats", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["total"] == 0
+    assert response.json()["overdue"] == 0
+
+
+def _bulk_task(user, **overrides):
+    start_date = datetime.now(timezone.utc)
+    task = {
+        "title": "Bulk Task",
+        "start_date": start_date.isoformat(),
+        "due_date": (start_date + timedelta(days=7)).isoformat(),
+        "priority": "medium",
+        "status": "pending",
+        "created_by": user.user_email,
+        "assigned_to": user.user_email,
+    }
+    task.update(overrides)
+    return task
+
+
+@pytest.fixture
+def other_user_task(db_session, test_user2):
+    """Create a task that test_user cannot modify."""
+    from uuid import uuid4
+    from app.models.task import Task
+
+    task = Task(
+        id=str(uuid4()),
+        title="Other User Task",
+        start_date=datetime.now(timezone.utc),
+        due_date=datetime.now(timezone.utc) + timedelta(days=7),
+        priority="low",
+        status="pending",
+        created_by=test_user2.user_email.lower(),
+        assigned_to=test_user2.user_email.lower()
+    )
+    db_session.add(task)
+    db_session.commit()
+    return task
+
+
+def test_bulk_create_tasks(client, test_user, test_user2, auth_headers):
+    """Test creating several tasks in one request."""
+    response = client.post(
+        "/tasks/bulk/create",
+        json={"tasks": [
+            _bulk_task(test_user, title="First"),
+            _bulk_task(test_user, title="Second", assigned_to=test_user2.user_email.upper()),
+        ]},
+        headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert (data["succeeded"], data["failed"]) == (2, 0)
+    assert [r["status_code"] for r in data["results"]] == [201, 201]
+    assert data["results"][1]["task"]["assigned_to"] == test_user2.user_email.lower()
+
+    listed = client.get("/tasks/", params={"sort": "title"}, headers=auth_headers).json()
+    assert [t["title"] for t in listed] == ["First", "Second"]
+    assert {t["id"] for t in listed} == {r["id"] for r in data["results"]}
+
+
+def test_task_writes_set_assignee_id(client, db_session, test_user, test_user2, auth_headers):
+    """Test that every way of writing a task keeps assignee_id (the key to users.id) in step."""
+    from app.models.task import Task
+
+    created = client.post("/tasks/", json=_bulk_task(test_user), headers=auth_headers).json()
+    bulk = client.post(
+        "/tasks/bulk/create", json={"tasks": [_bulk_task(test_user, assigned_to=test_user2.user_email)]},
+        headers=auth_headers
+    ).json()["results"][0]
+    client.put(f"/tasks/{created['id']}", json={"assigned_to": test_user2.user_email}, headers=auth_headers)
+    client.post("/tasks/bulk/update", json={"tasks": [{"id": bulk["id"], "assigned_to": test_user.user_email}]},
+                headers=auth_headers)
+
+    db_session.expire_all()
+    assert db_session.get(Task, created["id"]).assignee_id == test_user2.id
+    assert db_session.get(Task, bulk["id"]).assigned_to_user.id == test_user.id
+
+
+def test_bulk_create_tasks_atomic_rejects_batch(client, test_user, auth_headers):
+    """Test that an atomic batch with an unknown assignee creates nothing."""
+    response = client.post(
+        "/tasks/bulk/create",
+        json={"tasks": [
+            _bulk_task(test_user),
+            _bulk_task(test_user, assigned_to="nobody@example.com"),
+        ]},
+        headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    data = response.json()
+    assert (data["succeeded"], data["failed"]) == (0, 2)
+    assert [r["status_code"] for r in data["results"]] == [424, 404]
+    assert data["results"][1]["detail"] == "Assigned user not found"
+    assert client.get("/tasks/", headers=auth_headers).json() == []
+
+
+
+def test_create_task_rejects_unknown_assignee(client, test_user, auth_headers):
+    """Test that single and bulk create both answer 404 for an assignee who is not a user."""
+    unknown = _bulk_task(test_user, assigned_to="nobody@example.com")
+    response = client.post("/tasks/", json=unknown, headers=auth_headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["detail"] == "Assigned user not found"
+
+    response = client.post("/tasks/bulk/create", json={"atomic": False, "tasks": [unknown]}, headers=auth_headers)
+    assert [(r["status_code"], r["detail"]) for r in response.json()["results"]] == [
+        (404, "Assigned user not found")
+    ]
+    assert client.get("/tasks/", headers=auth_headers).json() == []
+
+def test_bulk_update_tasks_partial(client, test_task, other_user_task, test_user2, auth_headers):
+    """Test that a non-atomic bulk update applies the items that pass their checks."""
+    response = client.post(
+        "/tasks/bulk/update",
+        json={"atomic": False, "tasks": [
+            {"id": test_task.id, "status": "completed", "assigned_to": test_user2.user_email},
+            {"id": other_user_task.id, "status": "completed"},
+            {"id": "missing", "status": "completed"},
+            {"id": test_task.id, "title": "Twice"},
+        ]},
+        headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert (data["succeeded"], data["failed"]) == (1, 3)
+    assert [r["status_code"] for r in data["results"]] == [200, 403, 404, 400]
+    assert data["results"][0]["task"]["status"] == "completed"
+    assert data["results"][0]["task"]["title"] == "Test Task"
+
+    task = client.get(f"/tasks/{test_task.id}", headers=auth_headers).json()
+    assert task["status"] == "completed"
+    assert task["assigned_to"] == test_user2.user_email.lower()
+
+
+def test_bulk_update_tasks_atomic_rejects_batch(client, test_task, other_user_task, auth_headers):
+    """Test that one forbidden item rejects an atomic bulk update."""
+    response = client.post(
+        "/tasks/bulk/update",
+        json={"tasks": [
+            {"id": test_task.id, "status": "completed"},
+            {"id": other_user_task.id, "status": "completed"},
+        ]},
+        headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert [r["status_code"] for r in response.json()["results"]] == [424, 403]
+    assert client.get(f"/tasks/{test_task.id}", headers=auth_headers).json()["status"] == "pending"
+
+
+def test_bulk_delete_tasks(client, test_task, other_user_task, auth_headers, admin_auth_headers):
+    """Test bulk delete in atomic and partial modes."""
+    ids = [test_task.id, other_user_task.id]
+    response = client.post("/tasks/bulk/delete", json={"ids": ids}, headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get(f"/tasks/{test_task.id}", headers=auth_headers).status_code == 200
+
+    response = client.post("/tasks/bulk/delete", json={"ids": ids, "atomic": False}, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert [r["status_code"] for r in response.json()["results"]] == [204, 403]
+    assert client.get(f"/tasks/{test_task.id}", headers=auth_headers).status_code == 404
+
+    response = client.post("/tasks/bulk/delete", json={"ids": [other_user_task.id]}, headers=admin_auth_headers)
+    assert response.json()["succeeded"] == 1
+    assert client.get("/tasks/", headers=admin_auth_headers).json() == []
+
+
+def test_get_tasks_batch(client, test_task, other_user_task, auth_headers, admin_auth_headers):
+    """Test that a batch read reports each id like get_task would, in request order."""
+    ids = [other_user_task.id, "missing-id", test_task.id, test_task.id]
+    response = client.get("/tasks/batch", params={"ids": ids}, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (2, 2)
+    assert [(item["id"], item["status_code"]) for item in body["results"]] == [
+        (other_user_task.id, 403), ("missing-id", 404), (test_task.id, 200), (test_task.id, 200),
+    ]
+    assert body["results"][2]["task"]["title"] == "Test Task"
+    assert body["results"][0]["task"] is None
+
+    response = client.get("/tasks/batch", params={"ids": ids}, headers=admin_auth_headers)
+    assert [item["status_code"] for item in response.json()["results"]] == [200, 404, 200, 200]
+
+
+def test_get_tasks_batch_size_is_limited(client, auth_headers):
+    """Test that a batch read needs between 1 and MAX_BATCH_IDS ids."""
+    from app.utils.pagination import MAX_BATCH_IDS
+
+    assert client.get("/tasks/batch", headers=auth_headers).status_code == 422
+    ids = [f"task-{i}" for i in range(MAX_BATCH_IDS + 1)]
+    assert client.get("/tasks/batch", params={"ids": ids}, headers=auth_headers).status_code == 422
+
+
+def test_bulk_request_size_is_limited(client, test_user, auth_headers):
+    """Test that empty and oversized batches are rejected."""
+    from app.schemas.task_schema import MAX_BULK_TASKS
+
+    response = client.post("/tasks/bulk/delete", json={"ids": []}, headers=auth_headers)
+    assert response.status_code == 422
+    response = client.post(
+        "/tasks/bulk/delete", json={"ids": ["x"] * (MAX_BULK_TASKS + 1)}, headers=auth_headers
+    )
+    assert response.status_code == 422
+
+
+def test_export_tasks_ndjson(client, filter_tasks, other_user_task, auth_headers, monkeypatch):
+    """Test that the NDJSON export streams every visible task across fetch batches."""
+    import json
+    from app.api.routes import tasks
+
+    monkeypatch.setattr(tasks, "EXPORT_BATCH_SIZE", 2)
+    listed = client.get("/tasks/", headers=auth_headers).json()
+
+    response = client.get("/tasks/export", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(t["id"] for t in exported) == sorted(t["id"] for t in listed)
+    assert len(exported) == 4 and other_user_task.id not in [t["id"] for t in exported]
+    assert set(exported[0]) == set(listed[0])
+
+    response = client.get("/tasks/export", params={"status": "completed"}, headers=auth_headers)
+    assert all(json.loads(line)["status"] == "completed" for line in response.text.splitlines())
+
+
+def test_export_tasks_csv(client, test_task, auth_headers):
+    """Test the CSV export."""
+    import csv
+    import io
+
+    response = client.get("/tasks/export", params={"format": "csv"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["id"] for row in rows] == [test_task.id]
+    assert rows[0]["title"] == "Test Task"
+
+
+def test_export_tasks_invalid_format(client, auth_headers):
+    """Test that unknown export formats are rejected."""
+    response = client.get("/tasks/export", params={"format": "xml"}, headers=auth_headers)
+    assert response.status_code == 422
+
+
+def test_get_task_etag(client, test_task, auth_headers):
+    """Test that get_task answers a matching If-None-Match with 304 until the task changes."""
+    response = client.get(f"/tasks/{test_task.id}", headers=auth_headers)
+    etag = response.headers["ETag"]
+
+    response = client.get(f"/tasks/{test_task.id}", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+
+    client.put(f"/tasks/{test_task.id}", json={"title": "Renamed"}, headers=auth_headers)
+    response = client.get(f"/tasks/{test_task.id}", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["title"] == "Renamed"
+    assert response.headers["ETag"] != etag
+
+
+def test_get_task_sparse_fields(client, test_task, auth_headers):
+    """Test that get_task returns only the requested fields, under its own ETag."""
+    full = client.get(f"/tasks/{test_task.id}", headers=auth_headers)
+    response = client.get(f"/tasks/{test_task.id}", params={"fields": "due_date,title"}, headers=auth_headers)
+    assert response.json() == {"title": "Test Task", "due_date": full.json()["due_date"], "id": test_task.id}
+    assert response.headers["ETag"] != full.headers["ETag"]
+
+    response = client.get(
+        f"/tasks/{test_task.id}", params={"fields": "due_date,title"},
+        headers={**auth_headers, "If-None-Match": response.headers["ETag"]},
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_list_tasks_etag(client, test_task, other_user_task, test_user, auth_headers, admin_auth_headers):
+    """Test that list_tasks ETags change with the query and with writes the user can see."""
+    etag = client.get("/tasks/", headers=auth_headers).headers["ETag"]
+    conditional = {**auth_headers, "If-None-Match": etag}
+    assert client.get("/tasks/", headers=conditional).status_code == status.HTTP_304_NOT_MODIFIED
+    assert client.get("/tasks/", params={"status": "pending"}, headers=conditional).status_code == 200
+
+    # A task the user cannot see leaves their list version alone
+    client.put(f"/tasks/{other_user_task.id}", json={"title": "Elsewhere"}, headers=admin_auth_headers)
+    assert client.get("/tasks/", headers=conditional).status_code == status.HTTP_304_NOT_MODIFIED
+
+    client.post("/tasks/bulk/create", json={"tasks": [_bulk_task(test_user)]}, headers=auth_headers)
+    response = client.get("/tasks/", headers=conditional)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 2
+
+    etag = response.headers["ETag"]
+    client.delete(f"/tasks/{test_task.id}", headers=auth_headers)
+    assert client.get("/tasks/", headers={**auth_headers, "If-None-Match": etag}).status_code == 200
+
+
+def _sync(client, headers, since=None, **params):
+    if since is not None:
+        params["since"] = since
+    response = client.get("/tasks/changes", params=params, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def test_task_changes(client, test_task, other_user_task, test_user, test_user2, auth_headers, admin_auth_headers):
+    """Test that the changes feed returns only tasks written since the token, plus removals."""
+    data = _sync(client, auth_headers)
+    assert [t["id"] for t in data["tasks"]] == [test_task.id]
+    assert (data["deleted"], data["has_more"]) == ([], False)
+    token = data["next_token"]
+    assert _sync(client, auth_headers, token)["tasks"] == []
+
+    client.put(f"/tasks/{test_task.id}", json={"title": "Renamed"}, headers=auth_headers)
+    client.put(
+        f"/tasks/{other_user_task.id}", json={"assigned_to": test_user.user_email}, headers=admin_auth_headers
+    )
+    data = _sync(client, auth_headers, token)
+    assert [t["title"] for t in data["tasks"]] == ["Renamed", "Other User Task"]
+    assert data["tasks"][0]["updated_at"] is not None
+    assert data["deleted"] == []
+    token = data["next_token"]
+
+    # Reassigned away from the user, and deleted: both are reported as removed
+    client.put(
+        f"/tasks/{other_user_task.id}", json={"assigned_to": test_user2.user_email}, headers=admin_auth_headers
+    )
+    client.delete(f"/tasks/{test_task.id}", headers=auth_headers)
+    data = _sync(client, auth_headers, token)
+    assert data["tasks"] == []
+    assert data["deleted"] == [other_user_task.id, test_task.id]
+
+    # The admin still sees the reassigned task, and only the deletion
+    admin_data = _sync(client, admin_auth_headers, token)
+    assert [t["id"] for t in admin_data["tasks"]] == [other_user_task.id]
+    assert admin_data["deleted"] == [test_task.id]
+    assert _sync(client, auth_headers, data["next_token"]) == {
+        "tasks": [], "deleted": [], "next_token": data["next_token"], "has_more": False
+    }
+
+
+def test_task_changes_pages(client, test_user, auth_headers):
+    """Test that the changes feed pages through bulk writes with its token."""
+    client.post(
+        "/tasks/bulk/create", json={"tasks": [_bulk_task(test_user, title=str(i)) for i in range(3)]},
+        headers=auth_headers
+    )
+    seen, token, has_more = [], None, True
+    while has_more:
+        data = _sync(client, auth_headers, token, limit=2)
+        seen += [t["title"] for t in data["tasks"]]
+        token, has_more = data["next_token"], data["has_more"]
+    assert sorted(seen) == ["0", "1", "2"]
+
+    response = client.get("/tasks/changes", params={"since": "not-a-token"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Invalid sync token"
+
+
+def test_task_changes_after_tombstones_are_pruned(client, db_session, test_task, auth_headers):
+    """Test that pruning drops old tombstones and sync tokens from before them get a 410."""
+    from app.db import task_versions
+    from app.models.task_tombstone import TaskTombstone
+
+    token = _sync(client, auth_headers)["next_token"]
+    client.delete(f"/tasks/{test_task.id}", headers=auth_headers)
+    assert task_versions.prune_tombstones(db_session) == 0
+
+    db_session.query(TaskTombstone).update({"deleted_at": datetime.now(timezone.utc) - timedelta(days=31)})
+    db_session.commit()
+    assert task_versions.prune_tombstones(db_session) == 2
+    assert db_session.query(TaskTombstone).count() == 0
+
+    response = client.get("/tasks/changes", params={"since": token}, headers=auth_headers)
+    assert response.status_code == status.HTTP_410_GONE
+    # A full sync starts over with a token that is accepted
+    data = _sync(client, auth_headers)
+    assert data["tasks"] == []
+    assert _sync(client, auth_headers, data["next_token"])["deleted"] == []
+
+
+def test_sequence_benchmark_leaves_no_rows(db_engine, db_session, capsys):
+    """Test that the sequence row benchmark runs concurrent writers and cleans up after itself."""
+    from app.db import task_versions
+    from app.models.task_list_version import TaskListVersion
+
+    assert task_versions.benchmark(writers=2, seconds=0.2, url=str(db_engine.url))
+    assert "shared cap" in capsys.readouterr().out
+    assert db_session.query(TaskListVersion).count() == 0
+
+
+def test_search_tasks(client, test_user, other_user_task, auth_headers, admin_auth_headers):
+    """Test that search ranks matching visible tasks and follows task writes."""
+    created = client.post("/tasks/bulk/create", json={"tasks": [
+        _bulk_task(test_user, title="Quarterly budget", description="Budget review for the budget committee"),
+        _bulk_task(test_user, title="Budget notes"),
+        _bulk_task(test_user, title="Team lunch", description="Nothing about money"),
+    ]}, headers=auth_headers).json()
+    ids = [result["id"] for result in created["results"]]
+    client.put(f"/tasks/{other_user_task.id}", json={"title": "Other budget"}, headers=admin_auth_headers)
+
+    response = client.get("/tasks/search", params={"q": "budgets"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert [t["id"] for t in response.json()] == ids[:2]
+    assert len(client.get("/tasks/search", params={"q": "budget"}, headers=admin_auth_headers).json()) == 3
+
+    # Every word must match, each as a prefix
+    assert [t["id"] for t in client.get(
+        "/tasks/search", params={"q": "quarter BUDG"}, headers=auth_headers
+    ).json()] == [ids[0]]
+
+    client.put(f"/tasks/{ids[2]}", json={"description": "Budget lunch"}, headers=auth_headers)
+    client.delete(f"/tasks/{ids[0]}", headers=auth_headers)
+    results = client.get("/tasks/search", params={"q": "budget"}, headers=auth_headers).json()
+    assert sorted(t["id"] for t in results) == sorted(ids[1:])
+    assert client.get("/tasks/search", params={"q": "?!"}, headers=auth_headers).json() == []
+
+
+def test_search_tasks_pages(client, test_user, auth_headers):
+    """Test that search results are paged with a cursor tied to the query."""
+    client.post("/tasks/bulk/create", json={"tasks": [
+        _bulk_task(test_user, title=f"Report {i}", description="report " * i) for i in range(1, 6)
+    ]}, headers=auth_headers)
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": "report", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/tasks/search", params=params, headers=auth_headers)
+        seen += [t["title"] for t in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        last_cursor = cursor
+    assert sorted(seen) == [f"Report {i}" for i in range(1, 6)]
+    assert seen[0] == "Report 5"
+
+    response = client.get(
+        "/tasks/search", params={"q": "other", "cursor": last_cursor}, headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_search_tasks_pages_through_tied_scores(client, test_user, auth_headers):
+    """Test that tasks with the same score are neither skipped nor repeated across pages."""
+    created = client.post("/tasks/bulk/create", json={"tasks": [
+        _bulk_task(test_user, title="Weekly report") for _ in range(5)
+    ]}, headers=auth_headers).json()
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": "report", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/tasks/search", params=params, headers=auth_headers)
+        seen += [t["id"] for t in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert sorted(seen) == sorted(result["id"] for result in created["results"])
+
+
+def test_search_statement_uses_postgres_text_index():
+    """Test that the Postgres search matches the expression of the GIN index."""
+    from sqlalchemy.dialects import postgresql
+    from app.db import task_search
+    from app.models.task import TASK_SEARCH_VECTOR_SQL
+
+    stmt, _ = task_search.search_statement("postgresql", "Budget: review!")
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert f"{TASK_SEARCH_VECTOR_SQL} @@ to_tsquery('english'" in sql
+    assert "CAST(ts_rank_cd(" in sql and "AS FLOAT(53))" in sql
+    assert stmt.compile(dialect=postgresql.dialect()).params["to_tsquery_1"] == "budget:* & review:*"
@@ -0,0 +1,192 @@
+"""Tests for schema-per-tenant isolation (TENANCY_MODE=schema)."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+
+from app.core.config import settings
+from app.core.principal_cache import principal_cache
+from app.core.security import create_access_token
+from app.core.tenancy import TenantRequired, UnknownTenant, current_tenant
+from app.db import tenancy
+from app.main import create_app
+from app.models.task import Task
+from app.models.user import User
+from app.utils.ids import new_id
+
+
+@pytest.fixture
+def registry(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'main.db'}")
+    registry = tenancy.TenantRegistry(engine)
+    registry.provision("acme")
+    registry.provision("globex")
+    yield registry
+    for tenant_engine in registry._engines.values():
+        tenant_engine.dispose()
+    engine.dispose()
+
+
+def _add_user(registry, tenant, email):
+    token = current_tenant.set(tenant)
+    try:
+        with registry.session() as db:
+            user = User(id=new_id(), user_email=email, user_name=email, pwd="-", role="normal")
+            db.add(user)
+            db.commit()
+            return user.id
+    finally:
+        current_tenant.reset(token)
+
+
+def test_tenants_are_isolated(registry, tmp_path):
+    """Test that each provisioned tenant has its own tables and others are refused."""
+    assert registry.list() == ["acme", "globex"]
+    assert (tmp_path / "main_tenant_acme.db").exists()
+    _add_user(registry, "acme", "a@example.com")
+
+    for tenant, emails in (("acme", ["a@example.com"]), ("globex", [])):
+        token = current_tenant.set(tenant)
+        try:
+            with registry.session() as db:
+                assert db.execute(select(User.user_email)).scalars().all() == emails
+        finally:
+            current_tenant.reset(token)
+
+    with pytest.raises(TenantRequired):
+        registry.session()
+    for tenant in ("initech", "Bad-Name"):
+        with pytest.raises(UnknownTenant):
+            registry.tenant_engine(tenant)
+
+
+def test_migrate_runs_every_migration_per_tenant(registry):
+    """Test that migrate brings each tenant up to date and has nothing left to do after."""
+    steps = [name for name, _ in tenancy.MIGRATIONS]
+    results = registry.migrate()
+    assert sorted(results) == ["acme", "globex"]
+    assert [name for name, _ in results["acme"]] == steps
+    assert dict(results["globex"])["tables"] == []
+
+
+def test_requests_use_the_tenant_from_the_header(registry, monkeypatch):
+    """Test that the tenant header picks the tables, and missing or unknown tenants are refused."""
+    monkeypatch.setattr(settings, "TENANCY_MODE", "schema")
+    monkeypatch.setattr(tenancy, "registry", registry)
+    user_id = _add_user(registry, "acme", "a@example.com")
+    _add_user(registry, "globex", "a@example.com")
+    auth = {"Authorization": f"Bearer {create_access_token(data={'sub': user_id})}"}
+    task = {
+        "title": "Acme only", "start_date": "2025-01-01T00:00:00Z", "due_date": "2025-01-08T00:00:00Z",
+        "priority": "high", "status": "pending", "created_by": "a@example.com", "assigned_to": "a@example.com",
+    }
+
+    principal_cache.clear()
+    with TestClient(create_app(use_async_db=False)) as client:
+        created = client.post("/tasks/", json=task, headers={**auth, "X-Tenant": "acme"})
+        assert created.status_code == 201
+        listed = client.get("/tasks/", headers={**auth, "X-Tenant": "ACME"})
+        assert [item["id"] for item in listed.json()] == [created.json()["id"]]
+        assert "X-Tenant" in listed.headers["vary"]
+
+        # The token's user (and the principal cached for it) belong to acme only
+        assert client.get("/tasks/", headers={**auth, "X-Tenant": "globex"}).status_code == 404
+        assert client.get("/tasks/", headers=auth).json() == {"detail": "Missing X-Tenant header"}
+        assert client.get("/tasks/", headers={**auth, "X-Tenant": "initech"}).status_code == 404
+    principal_cache.clear()
+
+    token = current_tenant.set("globex")
+    try:
+        with registry.session() as db:
+            assert db.execute(select(Task)).first() is None
+    finally:
+        current_tenant.reset(token)
+
+
+def test_prune_runs_in_every_tenant(registry, monkeypatch, capsys):
+    """Test that the prune command covers every tenant, or only the ones named."""
+    from datetime import datetime, timedelta, timezone
+    from app.db import task_versions
+    from app.models.task_tombstone import TaskTombstone
+
+    monkeypatch.setattr(settings, "TENANCY_MODE", "schema")
+    monkeypatch.setattr(tenancy, "registry", registry)
+    old = datetime.now(timezone.utc) - timedelta(days=30)
+    for tenant in ("acme", "globex"):
+        with tenancy.command_session(tenant) as db:
+            db.add_all([
+                TaskTombstone(task_id=new_id(), user_email="*", change_seq=seq, deleted_at=old) for seq in (1, 2)
+            ])
+            db.commit()
+
+    assert task_versions.main(["prune", "7", "--tenant", "acme"]) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        "acme: Pruned 2 task tombstones; sync tokens before change 2 need a full sync"
+    ]
+    assert task_versions.main(["prune", "7"]) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        "acme: Pruned 0 task tombstones; sync tokens before change 2 need a full sync",
+        "globex: Pruned 2 task tombstones; sync tokens before change 2 need a full sync",
+    ]
+    assert task_versions.main(["prune", "--tenant", "initech"]) == 1
+
+
+def test_task_counters_run_in_every_tenant(registry, monkeypatch, capsys):
+    """Test that verify and rebuild cover every tenant, or only the ones named."""
+    from datetime import datetime, timezone
+    from app.db import task_counters
+
+    monkeypatch.setattr(settings, "TENANCY_MODE", "schema")
+    monkeypatch.setattr(tenancy, "registry", registry)
+    _add_user(registry, "acme", "a@example.com")
+    # Inserted directly, bypassing the routes, so no counters are maintained
+    with tenancy.command_session("acme") as db:
+        now = datetime.now(timezone.utc)
+        db.add(Task(
+            id=new_id(), title="Direct Task", start_date=now, due_date=now, priority="low", status="pending",
+            created_by="a@example.com", assigned_to="a@example.com",
+        ))
+        db.commit()
+
+    assert task_counters.main(["verify"]) == 1
+    out = capsys.readouterr().out.splitlines()
+    assert "acme: * status=pending: stored 0, expected 1" in out
+    assert "globex: Task counters are consistent" in out
+    assert task_counters.main(["rebuild", "--tenant", "acme"]) == 0
+    assert capsys.readouterr().out.startswith("acme: Rebuilt task counters")
+    assert task_counters.main(["verify"]) == 0
+
+
+def test_bulk_import_into_a_tenant(registry, monkeypatch, tmp_path, capsys):
+    """Test that the import command writes into the tenant named, and needs one to be named."""
+    import json
+    from app.db import bulk_import
+
+    monkeypatch.setattr(settings, "TENANCY_MODE", "schema")
+    monkeypatch.setattr(tenancy, "registry", registry)
+    _add_user(registry, "acme", "a@example.com")
+    path = tmp_path / "tasks.ndjson"
+    path.write_text(json.dumps({
+        "title": "Imported", "start_date": "2025-01-01T00:00:00Z", "due_date": "2025-01-08T00:00:00Z",
+        "priority": "low", "status": "pending", "created_by": "a@example.com", "assigned_to": "a@example.com",
+    }) + "\n")
+
+    assert bulk_import.main(["tasks", str(path)]) == 2
+    assert bulk_import.main(["tasks", str(path), "--tenant", "acme"]) == 0
+    assert "Imported 1 of 1 tasks (0 failed)" in capsys.readouterr().out
+    for tenant, titles in (("acme", ["Imported"]), ("globex", [])):
+        with tenancy.command_session(tenant) as db:
+            assert db.execute(select(Task.title)).scalars().all() == titles
+
+
+def test_search_install_runs_in_every_tenant(registry, monkeypatch, capsys):
+    """Test that installing the search index covers every tenant's tables."""
+    from app.db import task_search
+
+    monkeypatch.setattr(settings, "TENANCY_MODE", "schema")
+    monkeypatch.setattr(tenancy, "registry", registry)
+    assert task_search.main(["install"]) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        "acme: Search index installed for sqlite", "globex: Search index installed for sqlite",
+    ]
+    assert task_search.main(["install", "--tenant", "globex"]) == 0
+    assert task_search.main(["install", "--tenant", "initech"]) == 1
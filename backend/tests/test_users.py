@@ -107,6 +107,19 @@ def test_admin_can_see_any_user(client, test_user, admin_auth_headers):
 
 
 
+def test_get_users_batch(client, test_user, test_user2, auth_headers, admin_auth_headers):
+    """Test that a batch read reports each id like get_user would, in request order."""
+    ids = [test_user.id, test_user2.id, "missing-id"]
+    body = client.get("/users/batch", params={"ids": ids}, headers=auth_headers).json()
+    assert (body["succeeded"], body["failed"]) == (1, 2)
+    assert [item["status_code"] for item in body["results"]] == [200, 403, 404]
+    assert body["results"][0]["user"]["user_email"] == test_user.user_email
+
+    body = client.get("/users/batch", params={"ids": ids}, headers=admin_auth_headers).json()
+    assert [item["status_code"] for item in body["results"]] == [200, 200, 404]
+    assert "pwd" not in body["results"][1]["user"]
+
+
 def test_update_user(client, test_user, auth_headers):
     """Test updating a user."""
     response = client.put(
@@ -152,3 +165,32 @@ def test_delete_user(client, test_user2, auth_headers):
     get_response = client.get(f"/users/{test_user2.id}", headers=auth_headers)
     assert get_response.status_code == status.HTTP_404_NOT_FOUND
 
+
+
+def test_list_users_paginates_with_cursor(client, test_user, test_user2, test_admin, admin_auth_headers):
+    """Test that admin user listing walks all pages through the next cursor."""
+    first = client.get("/users/", params={"limit": 2}, headers=admin_auth_headers)
+    assert first.status_code == status.HTTP_200_OK
+    assert len(first.json()) == 2
+    cursor = first.headers.get("X-Next-Cursor")
+    assert cursor
+
+    second = client.get("/users/", params={"limit": 2, "cursor": cursor}, headers=admin_auth_headers)
+    assert second.status_code == status.HTTP_200_OK
+    assert len(second.json()) == 1
+    assert "X-Next-Cursor" not in second.headers
+
+    user_ids = [u["id"] for u in first.json() + second.json()]
+    assert sorted(user_ids) == sorted([test_user.id, test_user2.id, test_admin.id])
+
+
+def test_get_user_etag(client, test_user, auth_headers):
+    """Test that get_user answers a matching If-None-Match with 304 until the user changes."""
+    etag = client.get(f"/users/{test_user.id}", headers=auth_headers).headers["ETag"]
+    conditional = {**auth_headers, "If-None-Match": etag}
+    assert client.get(f"/users/{test_user.id}", headers=conditional).status_code == 304
+
+    client.put(f"/users/{test_user.id}", json={"user_name": "Renamed"}, headers=auth_headers)
+    response = client.get(f"/users/{test_user.id}", headers=conditional)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["user_name"] == "Renamed"
@@ -1,6 +1,6 @@
 'use client';
 
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { useRouter } from 'next/navigation';
 import { taskApi, userApi, Task, TaskStats, User } from '@/lib/api';
 import { isAuthenticated, getStoredUser, clearAuth } from '@/lib/auth';
@@ -20,8 +20,10 @@ type StatusFilter = 'all' | 'pending' | 'in_progress' | 'completed';
 export default function DashboardPage() {
   const router = useRouter();
   const [tasks, setTasks] = useState<Task[]>([]);
-  const [filteredTasks, setFilteredTasks] = useState<Task[]>([]);
+  const [tasksCursor, setTasksCursor] = useState<string | undefined>();
+  const [loadingMoreTasks, setLoadingMoreTasks] = useState(false);
   const [users, setUsers] = useState<User[]>([]);
+  const [usersCursor, setUsersCursor] = useState<string | undefined>();
   const [user, setUser] = useState<User | null>(null);
   const [stats, setStats] = useState<TaskStats>({
     total: 0,
@@ -37,6 +39,8 @@ export default function DashboardPage() {
   const [searchQuery, setSearchQuery] = useState('');
   const [statusFilter, setStatusFilter] = useState<StatusFilter>('all');
   const [toasts, setToasts] = useState<ToastProps[]>([]);
+  // Bumped on every first-page load, so pages of an older search are dropped
+  const tasksQuery = useRef(0);
 
   useEffect(() => {
     if (!isAuthenticated()) {
@@ -46,19 +50,37 @@ export default function DashboardPage() {
 
     // Load user data client-side only to avoid hydration mismatch
     setUser(getStoredUser());
-    loadTasks();
+    loadStats();
     loadUsers();
   }, [router]);
 
+  // Filtering and search run on the server; debounce so typing doesn't fire a request per keystroke
   useEffect(() => {
-    filterTasks();
-  }, [tasks, searchQuery, statusFilter]);
+    if (!isAuthenticated()) {
+      return;
+    }
+    const timer = setTimeout(() => {
+      loadTasks();
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [searchQuery, statusFilter]);
+
+  const taskQuery = () => {
+    const query = searchQuery.trim();
+    return {
+      status: statusFilter !== 'all' ? statusFilter : undefined,
+      q: query || undefined,
+    };
+  };
 
+  // Only the first page is loaded; further pages are fetched with "Load more"
   const loadTasks = async () => {
+    const generation = ++tasksQuery.current;
     try {
-      const data = await taskApi.getTasks();
-      setTasks(data);
-      calculateStats(data);
+      const page = await taskApi.getTasks(taskQuery());
+      if (generation !== tasksQuery.current) return;
+      setTasks(page.items);
+      setTasksCursor(page.nextCursor);
     } catch (error) {
       console.error('Failed to load tasks:', error);
     } finally {
@@ -66,58 +88,39 @@ export default function DashboardPage() {
     }
   };
 
-  const loadUsers = async () => {
+  const loadMoreTasks = async () => {
+    if (!tasksCursor || loadingMoreTasks) return;
+    const generation = tasksQuery.current;
+    setLoadingMoreTasks(true);
     try {
-      const data = await userApi.getUsers();
-      setUsers(data);
+      const page = await taskApi.getTasks(taskQuery(), tasksCursor);
+      if (generation !== tasksQuery.current) return;
+      setTasks((prev) => [...prev, ...page.items]);
+      setTasksCursor(page.nextCursor);
     } catch (error) {
-      console.error('Failed to load users:', error);
+      console.error('Failed to load more tasks:', error);
+    } finally {
+      setLoadingMoreTasks(false);
     }
   };
 
-  const calculateStats = (taskList: Task[]) => {
-    const now = new Date();
-    const overdue = taskList.filter((task) => {
-      const dueDate = new Date(task.due_date);
-      return dueDate < now && task.status !== 'completed';
-    }).length;
-
-    const newStats: TaskStats = {
-      total: taskList.length,
-      pending: taskList.filter((t) => t.status === 'pending').length,
-      in_progress: taskList.filter((t) => t.status === 'in_progress').length,
-      completed: taskList.filter((t) => t.status === 'completed').length,
-      high_priority: taskList.filter((t) => t.priority === 'high').length,
-      overdue,
-    };
-    setStats(newStats);
-  };
-
-  const filterTasks = () => {
-    let filtered = [...tasks];
-
-    // Apply status filter
-    if (statusFilter !== 'all') {
-      filtered = filtered.filter((task) => {
-        if (statusFilter === 'pending') return task.status === 'pending';
-        if (statusFilter === 'in_progress') return task.status === 'in_progress';
-        if (statusFilter === 'completed') return task.status === 'completed';
-        return true;
-      });
+  const loadStats = async () => {
+    try {
+      const data = await taskApi.getStats();
+      setStats(data);
+    } catch (error) {
+      console.error('Failed to load task statistics:', error);
     }
+  };
 
-    // Apply search filter
-    if (searchQuery.trim()) {
-      const query = searchQuery.toLowerCase();
-      filtered = filtered.filter(
-        (task) =>
-          task.title.toLowerCase().includes(query) ||
-          task.description?.toLowerCase().includes(query) ||
-          task.assigned_to.toLowerCase().includes(query)
-      );
+  const loadUsers = async (cursor?: string) => {
+    try {
+      const page = await userApi.getUsers(cursor);
+      setUsers((prev) => (cursor ? [...prev, ...page.items] : page.items));
+      setUsersCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Failed to load users:', error);
     }
-
-    setFilteredTasks(filtered);
   };
 
   const handleTaskClick = (task: Task) => {
@@ -142,7 +145,7 @@ export default function DashboardPage() {
 
     try {
       await taskApi.deleteTask(task.id);
-      await loadTasks();
+      await Promise.all([loadTasks(), loadStats()]);
       showToast('Task deleted', 'The task has been successfully deleted.', 'success');
     } catch (error) {
       console.error('Failed to delete task:', error);
@@ -184,7 +187,7 @@ export default function DashboardPage() {
         showToast('Task added', 'The task has been successfully created.', 'success');
       }
 
-      await loadTasks();
+      await Promise.all([loadTasks(), loadStats()]);
       setShowForm(false);
       setSelectedTask(null);
     } catch (error) {
@@ -282,6 +285,7 @@ export default function DashboardPage() {
                 <TaskForm
                   task={selectedTask}
                   users={users}
+                  onLoadMoreUsers={usersCursor ? () => loadUsers(usersCursor) : undefined}
                   currentUserEmail={user?.user_email || ''}
                   onSave={handleSaveTask}
                   onCancel={handleCancelForm}
@@ -334,11 +338,18 @@ export default function DashboardPage() {
 
                   {/* Tasks Table */}
                   <TaskTable
-                    tasks={filteredTasks}
+                    tasks={tasks}
                     onTaskClick={handleTaskClick}
                     onEdit={handleEditTask}
                     onDelete={handleDeleteTask}
                   />
+                  {tasksCursor && (
+                    <div className="flex justify-center">
+                      <Button variant="outline" onClick={loadMoreTasks} disabled={loadingMoreTasks}>
+                        {loadingMoreTasks ? 'Loading...' : 'Load more'}
+                      </Button>
+                    </div>
+                  )}
                 </div>
               </>
             )}
@@ -4,7 +4,7 @@ import { useState } from 'react';
 import { useRouter } from 'next/navigation';
 import Link from 'next/link';
 import { authApi } from '@/lib/api';
-import { setStoredToken, setStoredUser } from '@/lib/auth';
+import { setStoredRefreshToken, setStoredToken, setStoredUser } from '@/lib/auth';
 
 export default function SignInPage() {
   const router = useRouter();
@@ -27,6 +27,9 @@ export default function SignInPage() {
       }
 
       setStoredToken(response.access_token);
+      if (response.refresh_token) {
+        setStoredRefreshToken(response.refresh_token);
+      }
 
       // Get user info - make this optional, don't block login if it fails
       try {
@@ -13,6 +13,8 @@ import { X } from 'lucide-react';
 interface TaskFormProps {
   task?: Task | null;
   users: { id: string; user_email: string; user_name: string }[];
+  // Fetches the next page of users; absent once every user is loaded
+  onLoadMoreUsers?: () => void;
   currentUserEmail: string;
   onSave: (taskData: TaskFormData) => Promise<void>;
   onCancel: () => void;
@@ -28,7 +30,7 @@ export interface TaskFormData {
   assigned_to: string;
 }
 
-export function TaskForm({ task, users, currentUserEmail, onSave, onCancel }: TaskFormProps) {
+export function TaskForm({ task, users, onLoadMoreUsers, currentUserEmail, onSave, onCancel }: TaskFormProps) {
   const [formData, setFormData] = useState<TaskFormData>({
     title: '',
     description: '',
@@ -199,12 +201,21 @@ export function TaskForm({ task, users, currentUserEmail, onSave, onCancel }: Ta
               onChange={(e) => handleChange('assigned_to', e.target.value)}
               required
             >
+              {/* Keep the current assignee selectable when their page isn't loaded yet */}
+              {formData.assigned_to && !users.some((user) => user.user_email === formData.assigned_to) && (
+                <option value={formData.assigned_to}>{formData.assigned_to}</option>
+              )}
               {users.map((user) => (
                 <option key={user.id} value={user.user_email}>
                   {user.user_name} ({user.user_email})
                 </option>
               ))}
             </Select>
+            {onLoadMoreUsers && (
+              <Button type="button" variant="link" size="sm" className="px-0" onClick={onLoadMoreUsers}>
+                Load more users
+              </Button>
+            )}
           </div>
 
           <div className="flex justify-end gap-2 pt-4">
@@ -25,6 +25,33 @@ api.interceptors.request.use(
   }
 );
 
+// Exchange the stored refresh token for a new token pair; shared by concurrent 401s
+let refreshInFlight: Promise<string | null> | null = null;
+
+const refreshAccessToken = (): Promise<string | null> => {
+  if (!refreshInFlight) {
+    refreshInFlight = (async () => {
+      const refreshToken = localStorage.getItem('refresh_token');
+      if (!refreshToken) return null;
+      try {
+        const response = await axios.post<LoginResponse>(`${API_BASE_URL}/auth/refresh`, {
+          refresh_token: refreshToken,
+        });
+        localStorage.setItem('token', response.data.access_token);
+        if (response.data.refresh_token) {
+          localStorage.setItem('refresh_token', response.data.refresh_token);
+        }
+        return response.data.access_token;
+      } catch {
+        return null;
+      } finally {
+        refreshInFlight = null;
+      }
+    })();
+  }
+  return refreshInFlight;
+};
+
 // Handle 401 errors
 api.interceptors.response.use(
   (response) => {
@@ -34,7 +61,23 @@ api.interceptors.response.use(
     }
     return response;
   },
-  (error) => {
+  async (error) => {
+    // An expired access token is renewed once with the refresh token before giving up
+    const original = error.config;
+    if (
+      error.response?.status === 401 &&
+      typeof window !== 'undefined' &&
+      original &&
+      !original._retried
+    ) {
+      original._retried = true;
+      const accessToken = await refreshAccessToken();
+      if (accessToken) {
+        original.headers.Authorization = `Bearer ${accessToken}`;
+        return api(original);
+      }
+    }
+
     // Log errors for debugging
     console.error('API Error:', {
       url: error.config?.url,
@@ -46,6 +89,7 @@ api.interceptors.response.use(
     if (error.response?.status === 401) {
       if (typeof window !== 'undefined') {
         localStorage.removeItem('token');
+        localStorage.removeItem('refresh_token');
         localStorage.removeItem('user');
         // Only redirect if not already on signin page
         if (window.location.pathname !== '/signin') {
@@ -79,6 +123,7 @@ export interface Task {
 export interface LoginResponse {
   access_token: string;
   token_type: string;
+  refresh_token?: string;
 }
 
 export interface TaskStats {
@@ -90,6 +135,39 @@ export interface TaskStats {
   overdue?: number;
 }
 
+export interface TaskQuery {
+  status?: string;
+  priority?: string;
+  assigned_to?: string;
+  created_by?: string;
+  due_from?: string;
+  due_to?: string;
+  q?: string;
+  sort?: string;
+}
+
+export const PAGE_SIZE = 50;
+
+export interface Page<T> {
+  items: T[];
+  // Pass back to fetch the next page; absent on the last page
+  nextCursor?: string;
+}
+
+// List endpoints are cursor-paginated; the next page cursor comes back in X-Next-Cursor.
+// Only one page is fetched per call, so callers load more on demand.
+const fetchPage = async <T>(
+  url: string,
+  params: object = {},
+  cursor?: string,
+  pageSize = PAGE_SIZE
+): Promise<Page<T>> => {
+  const response = await api.get<T[]>(url, {
+    params: { ...params, limit: pageSize, ...(cursor ? { cursor } : {}) },
+  });
+  return { items: response.data, nextCursor: response.headers['x-next-cursor'] || undefined };
+};
+
 export const authApi = {
   login: async (email: string, password: string): Promise<LoginResponse> => {
     const params = new URLSearchParams();
@@ -158,15 +236,18 @@ export const userApi = {
     return response.data;
   },
 
-  getUsers: async (): Promise<User[]> => {
-    const response = await api.get<User[]>('/users/');
-    return response.data;
+  getUsers: async (cursor?: string): Promise<Page<User>> => {
+    return fetchPage<User>('/users/', {}, cursor);
   },
 };
 
 export const taskApi = {
-  getTasks: async (): Promise<Task[]> => {
-    const response = await api.get<Task[]>('/tasks/');
+  getTasks: async (query: TaskQuery = {}, cursor?: string): Promise<Page<Task>> => {
+    return fetchPage<Task>('/tasks/', query, cursor);
+  },
+
+  getStats: async (): Promise<TaskStats> => {
+    const response = await api.get<TaskStats>('/tasks/stats');
     return response.data;
   },
 
@@ -28,9 +28,20 @@ export const setStoredToken = (token: string): void => {
   localStorage.setItem('token', token);
 };
 
+export const getStoredRefreshToken = (): string | null => {
+  if (typeof window === 'undefined') return null;
+  return localStorage.getItem('refresh_token');
+};
+
+export const setStoredRefreshToken = (token: string): void => {
+  if (typeof window === 'undefined') return;
+  localStorage.setItem('refresh_token', token);
+};
+
 export const clearAuth = (): void => {
   if (typeof window === 'undefined') return;
   localStorage.removeItem('token');
+  localStorage.removeItem('refresh_token');
   localStorage.removeItem('user');
 };
 